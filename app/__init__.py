@@ -1,22 +1,45 @@
 from __future__ import annotations
 
+import atexit
 import os
 
 from flask import Flask
 
-from .database import init_db
+from .database import db_session, engine, init_db, replicas
+from .instrumentation import QueryLog, SqlInstrumentation
+from .json_provider import FastJSONProvider
+from .read_routing import ReadYourWrites
 
 
 def create_app() -> Flask:
     app = Flask(__name__, template_folder="../templates", static_folder="../static")
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret-key")
+    app.json = FastJSONProvider.from_env(app)
 
     init_db()
 
     from .api import api_bp
+    from .container import ServiceRegistry
+    from .services import TableVersions
     from .web import web_bp
 
+    TableVersions.ensure(engine)
+    services = ServiceRegistry.from_env()
+    app.extensions["services"] = services
+    atexit.register(services.close)
+    SqlInstrumentation.from_env().init_app(app, engine, *replicas.engines)
+    query_log = QueryLog.from_env()
+    if query_log is not None:
+        query_log.attach(engine, *replicas.engines)
+    ReadYourWrites.from_env().init_app(app)
+
     app.register_blueprint(api_bp, url_prefix="/api")
     app.register_blueprint(web_bp)
 
+    relay_interval = float(os.getenv("OUTBOX_RELAY_INTERVAL", "0"))
+    if relay_interval > 0:
+        from .services.outbox import OutboxRelay, start_relay_thread
+
+        start_relay_thread(OutboxRelay(db_session, publisher_for=services.relay_publisher), poll_interval=relay_interval)
+
     return app
@@ -1,25 +1,47 @@
 from __future__ import annotations
 
+import base64
+import math
 from dataclasses import asdict, dataclass
-from decimal import Decimal
+from datetime import datetime, timedelta
 from http import HTTPStatus
-from typing import Any
+from typing import Any, Iterable, Iterator
 
-from flask import Blueprint, Response, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context, url_for
+from sqlalchemy import Row
 
+from .container import get_services
 from .database import db_session
-from .models import Customer, Order
+from .http_cache import make_etag, not_modified, with_etag
+from .models import Order, OrderItem
+from .read_routing import replica_reads
 from .services import (
+    BulkOrderResult,
+    ConcurrentUpdateError,
     CreditLimitExceededError,
-    CreditService,
+    CreditSummaryService,
+    CustomerCredit,
     DomainError,
-    KafkaService,
+    IdempotencyKeyReusedError,
+    IdempotencyService,
     OrderService,
     ResourceNotFoundError,
+    StoredResponse,
+    TableVersions,
+    ValidationError,
 )
+from .services.versions import CUSTOMERS, ORDERS
 
 api_bp = Blueprint("api", __name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BULK_ORDERS = 50_000
+MAX_BATCH_SHIP = 50_000
+NDJSON_MIMETYPE = "application/x-ndjson"
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
 
 @dataclass
 class ApiError:
@@ -32,76 +54,257 @@ class ApiError:
         return jsonify(payload), status
 
 
-def _serialize_decimal(value: Decimal | None) -> str | None:
-    return format(value, "f") if value is not None else None
+# Decimal and datetime values are passed through as-is: the app's JSON provider renders them as
+# fixed-point and ISO 8601 strings while encoding (see app.json_provider).
+def _serialize_order(order: Order) -> dict[str, Any]:
+    return _serialize_order_row(order, order.items)
 
 
-def _serialize_order(order: Order) -> dict[str, Any]:
+def _serialize_order_row(order: Order | Row, items: Iterable[OrderItem | Row]) -> dict[str, Any]:
+    """Payload for an ORM order or a ``list_order_rows`` row; both expose the same attributes."""
     return {
         "id": order.id,
         "customer_id": order.customer_id,
-        "amount_total": _serialize_decimal(order.amount_total),
+        "amount_total": order.amount_total,
         "notes": order.notes,
-        "date_created": order.date_created.isoformat() if order.date_created else None,
-        "date_shipped": order.date_shipped.isoformat() if order.date_shipped else None,
-        "items": [
-            {
-                "id": item.id,
-                "product_id": item.product_id,
-                "quantity": item.quantity,
-                "unit_price": _serialize_decimal(item.unit_price),
-                "amount": _serialize_decimal(item.amount),
-            }
-            for item in order.items
-        ],
+        "date_created": order.date_created,
+        "date_shipped": order.date_shipped,
+        "items": [_serialize_item(item) for item in items],
     }
 
 
-def _serialize_customer(customer: Customer, credit_service: CreditService) -> dict[str, Any]:
-    balance = credit_service.balance(customer.id)
-    available_credit = customer.credit_limit - balance
+def _serialize_item(item: OrderItem | Row) -> dict[str, Any]:
+    return {
+        "id": item.id,
+        "product_id": item.product_id,
+        "quantity": item.quantity,
+        "unit_price": item.unit_price,
+        "amount": item.amount,
+    }
+
+
+def _serialize_customer(entry: CustomerCredit) -> dict[str, Any]:
+    customer = entry.customer
     return {
         "id": customer.id,
         "name": customer.name,
         "email": customer.email,
-        "credit_limit": _serialize_decimal(customer.credit_limit),
-        "balance": _serialize_decimal(balance),
-        "available_credit": _serialize_decimal(available_credit),
+        "credit_limit": customer.credit_limit,
+        "balance": entry.balance,
+        "available_credit": entry.available_credit,
+    }
+
+
+def _serialize_customer_row(row: Row) -> dict[str, Any]:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "email": row.email,
+        "credit_limit": row.credit_limit,
+        "balance": row.balance,
+        "available_credit": row.credit_limit - row.balance,
+    }
+
+
+def _serialize_credit_summary(row: Row, now: datetime) -> dict[str, Any]:
+    oldest = row.oldest_open_order_at
+    return {
+        "customer_id": row.customer_id,
+        "name": row.name,
+        "credit_limit": row.credit_limit,
+        "open_balance": row.open_balance,
+        "utilisation": round(row.utilisation, 4) if row.utilisation is not None else None,
+        "open_orders": row.open_orders,
+        "oldest_open_order_at": oldest,
+        "oldest_open_order_age_days": round((now - oldest).total_seconds() / 86400, 2) if oldest else None,
+        "refreshed_at": row.refreshed_at,
     }
 
 
+def _parse_order_ids(payload: Any) -> list[int]:
+    """``{"order_ids": [...]}`` or a bare list of ids, for the batch ship endpoint."""
+    order_ids = payload.get("order_ids") if isinstance(payload, dict) else payload
+    if not isinstance(order_ids, list) or not order_ids:
+        raise ValidationError("order_ids must be a non-empty list")
+    try:
+        return [int(order_id) for order_id in order_ids]
+    except (TypeError, ValueError):
+        raise ValidationError("order_ids must be integers") from None
+
+
+def _serialize_bulk_result(result: BulkOrderResult) -> dict[str, Any]:
+    if result.accepted:
+        return {"index": result.index, "status": "accepted", "order_id": result.order_id}
+    error = {"message": str(result.error), "code": result.error.__class__.__name__}
+    return {"index": result.index, "status": "rejected", "error": error}
+
+
+# The argument parsers read Flask's ``request.args`` unless given another mapping (the ASGI app
+# passes Starlette's query parameters).
+def _int_arg(
+    name: str, default: int | None = None, minimum: int = 0, maximum: int | None = None, args: Any = None
+) -> int | None:
+    raw = (request.args if args is None else args).get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValidationError(f"{name} must be an integer") from None
+    if value < minimum or (maximum is not None and value > maximum):
+        raise ValidationError(f"{name} must be between {minimum} and {maximum}")
+    return value
+
+
+def _float_arg(name: str, minimum: float = 0.0, args: Any = None) -> float | None:
+    raw = (request.args if args is None else args).get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValidationError(f"{name} must be a number") from None
+    if not math.isfinite(value) or value < minimum:
+        raise ValidationError(f"{name} must be a number of at least {minimum}")
+    return value
+
+
+def _bool_arg(name: str, args: Any = None) -> bool | None:
+    raw = (request.args if args is None else args).get(name)
+    if raw in (None, ""):
+        return None
+    if raw.lower() in ("1", "true", "yes"):
+        return True
+    if raw.lower() in ("0", "false", "no"):
+        return False
+    raise ValidationError(f"{name} must be true or false")
+
+
+def _encode_cursor(order: Order | Row) -> str:
+    raw = f"{order.date_created.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    if not cursor:
+        return None
+    try:
+        created, order_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created), int(order_id)
+    except ValueError:
+        raise ValidationError("cursor is malformed") from None
+
+
 def _service_factory(session) -> OrderService:
-    credit = CreditService(session)
-    kafka = KafkaService(topic="order_shipping")
-    return OrderService(session, credit, kafka)
+    return get_services().order_service(session)
+
+
+def _collection_etag(session, table: str, *parts: Any) -> str:
+    """Validator for a listing: the table's change counter plus everything that shapes the response."""
+    (version,) = TableVersions(session).current([table])
+    return make_etag(request.endpoint, version, sorted(request.args.items(multi=True)), *parts)
+
+
+def _replay_or_claim(session) -> Response | None:
+    """The stored response for a repeated ``Idempotency-Key``; otherwise claims the key and returns None."""
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return None
+    fingerprint = IdempotencyService.fingerprint(request.method, request.path, request.get_data())
+    stored = get_services().idempotency_service(session).claim(key, fingerprint)
+    return _replayed(stored) if stored is not None else None
+
+
+def _replayed(stored: StoredResponse) -> Response:
+    response = Response(stored.body, status=stored.status_code, mimetype="application/json")
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _remember(session, response: Response, status: HTTPStatus = HTTPStatus.OK) -> Response:
+    """Set ``status`` and store the response under the request's ``Idempotency-Key``, if it sent one."""
+    response.status_code = status
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is not None:
+        get_services().idempotency_service(session).store(key, response.status_code, response.get_data())
+    return response
+
+
+def _error_status(error: DomainError) -> HTTPStatus:
+    if isinstance(error, ResourceNotFoundError):
+        return HTTPStatus.NOT_FOUND
+    if isinstance(error, (CreditLimitExceededError, ConcurrentUpdateError)):
+        return HTTPStatus.CONFLICT
+    if isinstance(error, IdempotencyKeyReusedError):
+        return HTTPStatus.UNPROCESSABLE_ENTITY
+    return HTTPStatus.BAD_REQUEST
 
 
 @api_bp.errorhandler(DomainError)
 def handle_domain_error(error: DomainError):  # type: ignore[override]
-    status = HTTPStatus.BAD_REQUEST
-    if isinstance(error, ResourceNotFoundError):
-        status = HTTPStatus.NOT_FOUND
-    if isinstance(error, CreditLimitExceededError):
-        status = HTTPStatus.CONFLICT
     api_error = ApiError(message=str(error), code=error.__class__.__name__)
-    return api_error.to_response(status)
+    return api_error.to_response(_error_status(error))
 
 
 @api_bp.route("/customers", methods=["GET"])
 def list_customers():
-    with db_session() as session:
+    after_id = _int_arg("after_id")
+    limit = _int_arg("limit", default=DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+    with db_session(replica=replica_reads()) as session:
+        etag = _collection_etag(session, CUSTOMERS)
+        if cached := not_modified(etag):
+            return cached
         service = _service_factory(session)
-        customers = service.list_customers()
-        credit = service.credit_service
-        return jsonify([_serialize_customer(customer, credit) for customer in customers])
+        page = service.credit_service.list_customer_credit_rows(after_id=after_id, limit=limit)
+        response = jsonify([_serialize_customer_row(row) for row in page])
+        if len(page) == limit:
+            next_url = url_for("api.list_customers", after_id=page[-1].id, limit=limit)
+            response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return with_etag(response, etag)
 
 
 @api_bp.route("/orders", methods=["GET"])
 def list_orders():
-    with db_session() as session:
+    filters = {
+        "customer_id": _int_arg("customer_id", minimum=1),
+        "shipped": _bool_arg("shipped"),
+        "cursor": _decode_cursor(request.args.get("cursor")),
+    }
+    ndjson = _wants_ndjson()
+    limit = None if ndjson else _int_arg("limit", default=DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+    replica = replica_reads()
+    with db_session(replica=replica) as session:
+        etag = _collection_etag(session, ORDERS, ndjson)
+        if cached := not_modified(etag):
+            return cached
+        if ndjson:
+            return with_etag(_stream_orders(filters, replica), etag)
+
         service = _service_factory(session)
-        orders = service.list_orders()
-        return jsonify([_serialize_order(order) for order in orders])
+        orders = service.list_order_rows(limit=limit, **filters)
+        response = jsonify([_serialize_order_row(order, items) for order, items in orders])
+        if len(orders) == limit:
+            args = {key: value for key, value in request.args.items() if key != "cursor"}
+            next_url = url_for("api.list_orders", **args, cursor=_encode_cursor(orders[-1][0]))
+            response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return with_etag(response, etag)
+
+
+def _wants_ndjson() -> bool:
+    if request.args.get("format") == "ndjson":
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def _stream_orders(filters: dict[str, Any], replica: bool = False) -> Response:
+    def generate() -> Iterator[bytes]:
+        dumps = current_app.json.dumps_bytes
+        with db_session(replica=replica) as session:
+            service = _service_factory(session)
+            for order, items in service.iter_order_rows(**filters):
+                yield dumps(_serialize_order_row(order, items)) + b"\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
 
 
 @api_bp.route("/orders", methods=["POST"])
@@ -115,22 +318,148 @@ def create_order():
         return ApiError("customer_id is required", "ValidationError").to_response(HTTPStatus.BAD_REQUEST)
 
     with db_session() as session:
+        if replayed := _replay_or_claim(session):
+            return replayed
         service = _service_factory(session)
         order = service.create_order(int(customer_id), items, notes)
-        return jsonify(_serialize_order(order)), HTTPStatus.CREATED
+        return _remember(session, jsonify(_serialize_order(order)), HTTPStatus.CREATED)
+
+
+@api_bp.route("/orders/bulk", methods=["POST"])
+def create_orders_bulk():
+    payload = request.get_json(force=True)
+    orders = payload.get("orders") if isinstance(payload, dict) else payload
+    if not isinstance(orders, list):
+        return ApiError("orders must be a list", "ValidationError").to_response(HTTPStatus.BAD_REQUEST)
+    if len(orders) > MAX_BULK_ORDERS:
+        return ApiError(
+            f"at most {MAX_BULK_ORDERS} orders may be submitted per request", "ValidationError"
+        ).to_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+    with db_session() as session:
+        service = _service_factory(session)
+        results = service.create_orders_bulk(orders)
+        accepted = sum(1 for result in results if result.accepted)
+        return jsonify(
+            {
+                "accepted": accepted,
+                "rejected": len(results) - accepted,
+                "results": [_serialize_bulk_result(result) for result in results],
+            }
+        )
 
 
 @api_bp.route("/orders/<int:order_id>", methods=["GET"])
 def get_order(order_id: int):
+    with db_session(replica=replica_reads()) as session:
+        service = _service_factory(session)
+        # The row version changes with every write to the order or its items, so polling clients
+        # holding the current ETag are answered from one indexed lookup without loading items.
+        version = service.order_version(order_id)
+        if version is not None:
+            etag = make_etag("order", order_id, version)
+            if cached := not_modified(etag):
+                return cached
+        order = service.get_order(order_id, load="items")
+        return with_etag(jsonify(_serialize_order(order)), make_etag("order", order_id, order.version))
+
+
+@api_bp.route("/orders/<int:order_id>/items", methods=["POST"])
+def add_order_items(order_id: int):
+    payload = request.get_json(force=True) or {}
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        return ApiError("items must be a non-empty list", "ValidationError").to_response(HTTPStatus.BAD_REQUEST)
+
     with db_session() as session:
         service = _service_factory(session)
-        order = service.get_order(order_id)
-        return jsonify(_serialize_order(order))
+        order = service.add_items(order_id, items)
+        return jsonify(_serialize_order(order)), HTTPStatus.CREATED
+
+
+@api_bp.route("/orders/<int:order_id>/items/<int:item_id>", methods=["PATCH"])
+def update_order_item(order_id: int, item_id: int):
+    payload = request.get_json(force=True) or {}
+    product_id = payload.get("product_id")
+    quantity = payload.get("quantity")
+    if product_id is None and quantity is None:
+        return ApiError("quantity or product_id is required", "ValidationError").to_response(HTTPStatus.BAD_REQUEST)
+
+    with db_session() as session:
+        service = _service_factory(session)
+        if product_id is not None:
+            try:
+                product_id = int(product_id)
+            except (TypeError, ValueError):
+                raise ValidationError("product_id must be an integer") from None
+            item = service.replace_product(order_id, item_id, product_id, quantity)
+        else:
+            item = service.update_item(order_id, item_id, quantity)
+        order = session.get(Order, order_id)
+        return jsonify(
+            {"order_id": order_id, "amount_total": order.amount_total, "item": _serialize_item(item)}
+        )
+
+
+@api_bp.route("/orders/<int:order_id>/items/<int:item_id>", methods=["DELETE"])
+def remove_order_item(order_id: int, item_id: int):
+    with db_session() as session:
+        service = _service_factory(session)
+        order = service.remove_item(order_id, item_id)
+        return jsonify({"order_id": order_id, "amount_total": order.amount_total})
 
 
 @api_bp.route("/orders/<int:order_id>/ship", methods=["POST"])
 def ship_order(order_id: int):
     with db_session() as session:
+        if replayed := _replay_or_claim(session):
+            return replayed
         service = _service_factory(session)
         order = service.ship_order(order_id)
-        return jsonify(_serialize_order(order))
+        return _remember(session, jsonify(_serialize_order(order)))
+
+
+@api_bp.route("/orders/ship", methods=["POST"])
+def ship_orders():
+    order_ids = _parse_order_ids(request.get_json(force=True))
+    if len(order_ids) > MAX_BATCH_SHIP:
+        return ApiError(
+            f"at most {MAX_BATCH_SHIP} orders may be shipped per request", "ValidationError"
+        ).to_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+    with db_session() as session:
+        if replayed := _replay_or_claim(session):
+            return replayed
+        service = _service_factory(session)
+        return _remember(session, jsonify(asdict(service.ship_orders(order_ids))))
+
+
+@api_bp.route("/credit/summary", methods=["GET"])
+def credit_summary():
+    """Per-customer open balance, open order count, oldest open order and utilisation, from the summary table."""
+    limit = _int_arg("limit", default=DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+    offset = _int_arg("offset", default=0)
+    older_than_days = _float_arg("older_than_days")
+    now = datetime.utcnow()
+    with db_session(replica=replica_reads()) as session:
+        rows = CreditSummaryService(session).list_summaries(
+            min_utilisation=_float_arg("min_utilisation"),
+            max_utilisation=_float_arg("max_utilisation"),
+            min_open_orders=_int_arg("min_open_orders"),
+            opened_before=now - timedelta(days=older_than_days) if older_than_days is not None else None,
+            sort=request.args.get("sort", "-utilisation"),
+            limit=limit,
+            offset=offset,
+        )
+        response = jsonify([_serialize_credit_summary(row, now) for row in rows])
+        if len(rows) == limit:
+            args = {key: value for key, value in request.args.items() if key != "offset"}
+            next_url = url_for("api.credit_summary", **args, offset=offset + limit)
+            response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return response
+
+
+@api_bp.route("/_metrics", methods=["GET"])
+def metrics():
+    instrumentation = current_app.extensions["sql_instrumentation"]
+    return Response(instrumentation.render_prometheus(), content_type=PROMETHEUS_MIMETYPE)
@@ -0,0 +1,77 @@
+"""ASGI entry point: the REST API (``/api``) on asyncio, for I/O-bound, high-concurrency deployments.
+
+    uvicorn app.asgi:app --workers 4
+
+Requires ``pip install starlette uvicorn aiosqlite greenlet`` (``asyncpg`` instead of ``aiosqlite``
+on PostgreSQL). ``python -m app.asgi`` serves it with uvicorn on ``BIND``. Requests wait on the
+database without holding a thread, so one worker keeps many requests in flight; the HTML pages
+stay on the WSGI app (``app.wsgi``).
+"""
+
+from __future__ import annotations
+
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.routing import Mount
+
+from .async_api import handle_domain_error, routes
+from .async_database import async_engine
+from .container import ServiceRegistry
+from .database import db_session, engine, init_db
+from .instrumentation import QueryLog, ServerTimingMiddleware, SqlInstrumentation
+from .services import DomainError, TableVersions
+
+API_PREFIX = "/api"
+
+
+def create_asgi_app() -> Starlette:
+    init_db()
+    TableVersions.ensure(engine)
+    services = ServiceRegistry.from_env()
+    instrumentation = SqlInstrumentation.from_env()
+    instrumentation.instrument(async_engine.sync_engine)
+    query_log = QueryLog.from_env()
+    if query_log is not None:
+        query_log.attach(async_engine.sync_engine)
+
+    @asynccontextmanager
+    async def lifespan(_app: Starlette) -> AsyncIterator[None]:
+        relay_interval = float(os.getenv("OUTBOX_RELAY_INTERVAL", "0"))
+        relay_stop = None
+        if relay_interval > 0:
+            from .services.outbox import OutboxRelay, start_relay_thread
+
+            relay = OutboxRelay(db_session, publisher_for=services.relay_publisher)
+            _, relay_stop = start_relay_thread(relay, poll_interval=relay_interval)
+        try:
+            yield
+        finally:
+            if relay_stop is not None:
+                relay_stop.set()
+            services.close()
+            await async_engine.dispose()
+
+    rules = {route.endpoint: API_PREFIX + route.path for route in routes}
+    app = Starlette(
+        routes=[Mount(API_PREFIX, routes=routes)],
+        middleware=[Middleware(ServerTimingMiddleware, instrumentation=instrumentation, rules=rules)],
+        exception_handlers={DomainError: handle_domain_error},
+        lifespan=lifespan,
+    )
+    app.state.services = services
+    app.state.sql_instrumentation = instrumentation
+    return app
+
+
+app = create_asgi_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    host, _, port = os.getenv("BIND", "0.0.0.0:8000").rpartition(":")
+    uvicorn.run(app, host=host, port=int(port), log_level=os.getenv("LOG_LEVEL", "info"))
@@ -0,0 +1,358 @@
+"""The REST API of ``app.api`` as Starlette routes over ``AsyncSession`` (served by ``app.asgi``).
+
+Paths, payloads, status codes, ``Link`` headers and ETags match the Flask blueprint, so clients
+can be pointed at either deployment. Serializers and argument parsing are shared with it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from typing import Any, AsyncIterator
+from urllib.parse import urlencode
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header, parse_etags
+
+from .api import (
+    DEFAULT_PAGE_SIZE,
+    IDEMPOTENCY_HEADER,
+    MAX_BATCH_SHIP,
+    MAX_BULK_ORDERS,
+    MAX_PAGE_SIZE,
+    NDJSON_MIMETYPE,
+    PROMETHEUS_MIMETYPE,
+    ApiError,
+    _bool_arg,
+    _decode_cursor,
+    _encode_cursor,
+    _error_status,
+    _float_arg,
+    _int_arg,
+    _parse_order_ids,
+    _serialize_bulk_result,
+    _serialize_credit_summary,
+    _serialize_customer_row,
+    _serialize_item,
+    _serialize_order,
+    _serialize_order_row,
+)
+from .async_database import async_db_session
+from .http_cache import make_etag
+from .json_provider import ENCODERS, dumps_bytes
+from .models import Order
+from .services import DomainError, IdempotencyService, StoredResponse, TableVersions, ValidationError
+from .services.async_orders import AsyncOrderService
+from .services.versions import CUSTOMERS, ORDERS
+
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson")
+if JSON_ENCODER not in ENCODERS:
+    raise ValueError(f"Unknown JSON encoder {JSON_ENCODER!r}; expected one of {', '.join(ENCODERS)}")
+
+
+class JSONResponse(Response):
+    """Encodes with ``FastJSONProvider``'s encoder, so bodies are byte-identical to the Flask app's."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content, JSON_ENCODER)
+
+
+def _error(message: str, status: HTTPStatus, code: str = "ValidationError") -> JSONResponse:
+    return JSONResponse({"error": asdict(ApiError(message, code))}, status_code=status)
+
+
+async def handle_domain_error(request: Request, error: DomainError) -> JSONResponse:
+    return _error(str(error), _error_status(error), error.__class__.__name__)
+
+
+def _service_factory(request: Request, session: AsyncSession) -> AsyncOrderService:
+    return request.app.state.services.async_order_service(session)
+
+
+async def _json_body(request: Request) -> Any:
+    try:
+        return json.loads(await request.body())
+    except ValueError:
+        raise ValidationError("request body must be valid JSON") from None
+
+
+async def _collection_etag(request: Request, session: AsyncSession, endpoint: str, table: str, *parts: Any) -> str:
+    """``app.api._collection_etag``; ``endpoint`` is the blueprint endpoint name so both apps agree."""
+    (version,) = await session.run_sync(lambda sync_session: TableVersions(sync_session).current([table]))
+    return make_etag(endpoint, version, sorted(request.query_params.multi_items()), *parts)
+
+
+def _not_modified(request: Request, etag: str) -> Response | None:
+    if parse_etags(request.headers.get("if-none-match")).contains(etag):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={"ETag": f'"{etag}"'})
+    return None
+
+
+def _with_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = f'"{etag}"'
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+async def _replay_or_claim(request: Request, session: AsyncSession) -> Response | None:
+    """``app.api._replay_or_claim``."""
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return None
+    fingerprint = IdempotencyService.fingerprint(request.method, request.url.path, await request.body())
+    services = request.app.state.services
+    stored = await session.run_sync(
+        lambda sync_session: services.idempotency_service(sync_session).claim(key, fingerprint)
+    )
+    return _replayed(stored) if stored is not None else None
+
+
+def _replayed(stored: StoredResponse) -> Response:
+    return Response(
+        stored.body,
+        status_code=stored.status_code,
+        headers={"Idempotent-Replayed": "true"},
+        media_type=JSONResponse.media_type,
+    )
+
+
+async def _remember(request: Request, session: AsyncSession, response: Response) -> Response:
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is not None:
+        services = request.app.state.services
+        status, body = response.status_code, response.body
+        await session.run_sync(lambda sync_session: services.idempotency_service(sync_session).store(key, status, body))
+    return response
+
+
+def _next_link(request: Request, args: dict[str, Any]) -> str:
+    return f'<{request.url.path}?{urlencode(args)}>; rel="next"'
+
+
+async def list_customers(request: Request) -> Response:
+    args = request.query_params
+    after_id = _int_arg("after_id", args=args)
+    limit = _int_arg("limit", default=DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE, args=args)
+    async with async_db_session() as session:
+        etag = await _collection_etag(request, session, "api.list_customers", CUSTOMERS)
+        if cached := _not_modified(request, etag):
+            return cached
+        service = _service_factory(request, session)
+        page = await service.credit_service.list_customer_credit_rows(after_id=after_id, limit=limit)
+        response = JSONResponse([_serialize_customer_row(row) for row in page])
+        if len(page) == limit:
+            response.headers["Link"] = _next_link(request, {"after_id": page[-1].id, "limit": limit})
+        return _with_etag(response, etag)
+
+
+async def list_orders(request: Request) -> Response:
+    args = request.query_params
+    filters = {
+        "customer_id": _int_arg("customer_id", minimum=1, args=args),
+        "shipped": _bool_arg("shipped", args=args),
+        "cursor": _decode_cursor(args.get("cursor")),
+    }
+    ndjson = _wants_ndjson(request)
+    limit = None if ndjson else _int_arg("limit", default=DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE, args=args)
+    async with async_db_session() as session:
+        etag = await _collection_etag(request, session, "api.list_orders", ORDERS, ndjson)
+        if cached := _not_modified(request, etag):
+            return cached
+        if ndjson:
+            return _with_etag(StreamingResponse(_stream_orders(request, filters), media_type=NDJSON_MIMETYPE), etag)
+
+        service = _service_factory(request, session)
+        orders = await service.list_order_rows(limit=limit, **filters)
+        response = JSONResponse([_serialize_order_row(order, items) for order, items in orders])
+        if len(orders) == limit:
+            next_args = {key: value for key, value in args.items() if key != "cursor"}
+            response.headers["Link"] = _next_link(request, {**next_args, "cursor": _encode_cursor(orders[-1][0])})
+        return _with_etag(response, etag)
+
+
+def _wants_ndjson(request: Request) -> bool:
+    if request.query_params.get("format") == "ndjson":
+        return True
+    return parse_accept_header(request.headers.get("accept"), MIMEAccept).best == NDJSON_MIMETYPE
+
+
+async def _stream_orders(request: Request, filters: dict[str, Any]) -> AsyncIterator[bytes]:
+    async with async_db_session() as session:
+        service = _service_factory(request, session)
+        async for order, items in service.iter_order_rows(**filters):
+            yield dumps_bytes(_serialize_order_row(order, items), JSON_ENCODER) + b"\n"
+
+
+async def create_order(request: Request) -> Response:
+    payload = await _json_body(request) or {}
+    customer_id = payload.get("customer_id")
+    items = payload.get("items", [])
+    notes = payload.get("notes")
+
+    if not customer_id:
+        return _error("customer_id is required", HTTPStatus.BAD_REQUEST)
+
+    async with async_db_session(write=True) as session:
+        if replayed := await _replay_or_claim(request, session):
+            return replayed
+        service = _service_factory(request, session)
+        order = await service.create_order(int(customer_id), items, notes)
+        return await _remember(request, session, JSONResponse(_serialize_order(order), status_code=HTTPStatus.CREATED))
+
+
+async def create_orders_bulk(request: Request) -> Response:
+    payload = await _json_body(request)
+    orders = payload.get("orders") if isinstance(payload, dict) else payload
+    if not isinstance(orders, list):
+        return _error("orders must be a list", HTTPStatus.BAD_REQUEST)
+    if len(orders) > MAX_BULK_ORDERS:
+        return _error(
+            f"at most {MAX_BULK_ORDERS} orders may be submitted per request", HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        )
+
+    async with async_db_session(write=True) as session:
+        service = _service_factory(request, session)
+        results = await service.create_orders_bulk(orders)
+        accepted = sum(1 for result in results if result.accepted)
+        return JSONResponse(
+            {
+                "accepted": accepted,
+                "rejected": len(results) - accepted,
+                "results": [_serialize_bulk_result(result) for result in results],
+            }
+        )
+
+
+async def get_order(request: Request) -> Response:
+    order_id = request.path_params["order_id"]
+    async with async_db_session() as session:
+        service = _service_factory(request, session)
+        version = await service.order_version(order_id)
+        if version is not None:
+            etag = make_etag("order", order_id, version)
+            if cached := _not_modified(request, etag):
+                return cached
+        order = await service.get_order(order_id, load="items")
+        return _with_etag(JSONResponse(_serialize_order(order)), make_etag("order", order_id, order.version))
+
+
+async def add_order_items(request: Request) -> Response:
+    order_id = request.path_params["order_id"]
+    payload = await _json_body(request) or {}
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        return _error("items must be a non-empty list", HTTPStatus.BAD_REQUEST)
+
+    async with async_db_session(write=True) as session:
+        service = _service_factory(request, session)
+        order = await service.add_items(order_id, items)
+        return JSONResponse(_serialize_order(order), status_code=HTTPStatus.CREATED)
+
+
+async def update_order_item(request: Request) -> Response:
+    order_id, item_id = request.path_params["order_id"], request.path_params["item_id"]
+    payload = await _json_body(request) or {}
+    product_id = payload.get("product_id")
+    quantity = payload.get("quantity")
+    if product_id is None and quantity is None:
+        return _error("quantity or product_id is required", HTTPStatus.BAD_REQUEST)
+
+    async with async_db_session(write=True) as session:
+        service = _service_factory(request, session)
+        if product_id is not None:
+            try:
+                product_id = int(product_id)
+            except (TypeError, ValueError):
+                raise ValidationError("product_id must be an integer") from None
+            item = await service.replace_product(order_id, item_id, product_id, quantity)
+        else:
+            item = await service.update_item(order_id, item_id, quantity)
+        amount_total = (await session.execute(select(Order.amount_total).where(Order.id == order_id))).scalar_one()
+        return JSONResponse({"order_id": order_id, "amount_total": amount_total, "item": _serialize_item(item)})
+
+
+async def remove_order_item(request: Request) -> Response:
+    order_id, item_id = request.path_params["order_id"], request.path_params["item_id"]
+    async with async_db_session(write=True) as session:
+        service = _service_factory(request, session)
+        order = await service.remove_item(order_id, item_id)
+        return JSONResponse({"order_id": order_id, "amount_total": order.amount_total})
+
+
+async def ship_order(request: Request) -> Response:
+    order_id = request.path_params["order_id"]
+    async with async_db_session(write=True) as session:
+        if replayed := await _replay_or_claim(request, session):
+            return replayed
+        service = _service_factory(request, session)
+        order = await service.ship_order(order_id)
+        return await _remember(request, session, JSONResponse(_serialize_order(order)))
+
+
+async def ship_orders(request: Request) -> Response:
+    order_ids = _parse_order_ids(await _json_body(request))
+    if len(order_ids) > MAX_BATCH_SHIP:
+        return _error(
+            f"at most {MAX_BATCH_SHIP} orders may be shipped per request", HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        )
+
+    async with async_db_session(write=True) as session:
+        if replayed := await _replay_or_claim(request, session):
+            return replayed
+        service = _service_factory(request, session)
+        return await _remember(request, session, JSONResponse(asdict(await service.ship_orders(order_ids))))
+
+
+async def credit_summary(request: Request) -> Response:
+    args = request.query_params
+    limit = _int_arg("limit", default=DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE, args=args)
+    offset = _int_arg("offset", default=0, args=args)
+    older_than_days = _float_arg("older_than_days", args=args)
+    now = datetime.utcnow()
+    async with async_db_session() as session:
+        service = _service_factory(request, session)
+        rows = await service.credit_service.list_summaries(
+            min_utilisation=_float_arg("min_utilisation", args=args),
+            max_utilisation=_float_arg("max_utilisation", args=args),
+            min_open_orders=_int_arg("min_open_orders", args=args),
+            opened_before=now - timedelta(days=older_than_days) if older_than_days is not None else None,
+            sort=args.get("sort", "-utilisation"),
+            limit=limit,
+            offset=offset,
+        )
+        response = JSONResponse([_serialize_credit_summary(row, now) for row in rows])
+        if len(rows) == limit:
+            next_args = {key: value for key, value in args.items() if key != "offset"}
+            response.headers["Link"] = _next_link(request, {**next_args, "offset": offset + limit})
+        return response
+
+
+async def metrics(request: Request) -> Response:
+    instrumentation = request.app.state.sql_instrumentation
+    return Response(instrumentation.render_prometheus(), headers={"Content-Type": PROMETHEUS_MIMETYPE})
+
+
+routes = [
+    Route("/customers", list_customers, methods=["GET"]),
+    Route("/orders", list_orders, methods=["GET"]),
+    Route("/orders", create_order, methods=["POST"]),
+    Route("/orders/bulk", create_orders_bulk, methods=["POST"]),
+    Route("/orders/ship", ship_orders, methods=["POST"]),
+    Route("/orders/{order_id:int}", get_order, methods=["GET"]),
+    Route("/orders/{order_id:int}/items", add_order_items, methods=["POST"]),
+    Route("/orders/{order_id:int}/items/{item_id:int}", update_order_item, methods=["PATCH"]),
+    Route("/orders/{order_id:int}/items/{item_id:int}", remove_order_item, methods=["DELETE"]),
+    Route("/orders/{order_id:int}/ship", ship_order, methods=["POST"]),
+    Route("/credit/summary", credit_summary, methods=["GET"]),
+    Route("/_metrics", metrics, methods=["GET"]),
+]
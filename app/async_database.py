@@ -0,0 +1,88 @@
+"""Async engine and sessions for the ASGI deployment (``app.asgi``).
+
+The URL is ``ASYNC_DATABASE_URL`` or, by default, ``DATABASE_URL`` with its driver swapped for
+the asyncio one (``sqlite`` -> ``aiosqlite``, ``postgresql`` -> ``asyncpg``, ``mysql`` ->
+``aiomysql``). Pool sizing and SQLite pragmas are the ones ``app.database`` applies.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from .database import (
+    DATABASE_URL,
+    MAX_OVERFLOW,
+    POOL_PRE_PING,
+    POOL_RECYCLE,
+    POOL_SIZE,
+    POOL_TIMEOUT,
+    _apply_sqlite_pragmas,
+    _is_sqlite_memory,
+)
+
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+
+def async_url(url: str) -> str:
+    """``url`` with its driver replaced by the asyncio driver for the same database."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No asyncio driver known for {parsed.get_backend_name()!r}; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+
+
+def _create_async_engine(url: str = ASYNC_DATABASE_URL) -> AsyncEngine:
+    options = {}
+    if not _is_sqlite_memory(url):
+        options = {
+            "pool_size": POOL_SIZE,
+            "max_overflow": MAX_OVERFLOW,
+            "pool_timeout": POOL_TIMEOUT,
+            "pool_recycle": POOL_RECYCLE,
+            "pool_pre_ping": POOL_PRE_PING,
+        }
+    created = create_async_engine(url, echo=False, **options)
+    if url.startswith("sqlite"):
+        event.listen(created.sync_engine, "connect", _apply_sqlite_pragmas)
+    return created
+
+
+async_engine = _create_async_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# SQLite takes one writer at a time. Write transactions queue on this lock in the event loop
+# instead of each holding a pooled connection while polling for the database lock, where a busy
+# loop can push waiters past busy_timeout ("database is locked").
+_sqlite_writer = asyncio.Lock() if async_engine.dialect.name == "sqlite" else None
+
+
+@asynccontextmanager
+async def async_db_session(write: bool = False) -> AsyncIterator[AsyncSession]:
+    """Transactional scope, the asyncio counterpart of ``db_session``; pass ``write=True`` for commands."""
+    async with _writer_turn(write), AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+
+
+@asynccontextmanager
+async def _writer_turn(write: bool) -> AsyncIterator[None]:
+    if write and _sqlite_writer is not None:
+        async with _sqlite_writer:
+            yield
+    else:
+        yield
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import TYPE_CHECKING
+
+from flask import current_app
+from sqlalchemy.orm import Session
+
+from .http_cache import FragmentCache
+from .services import CreditService, IdempotencyService, KafkaService, OrderService, ProductCatalog
+
+if TYPE_CHECKING:  # the asyncio services need greenlet, which only the ASGI deployment installs
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from .services.async_orders import AsyncOrderService
+
+ORDER_SHIPPING_TOPIC = "order_shipping"
+
+
+class ServiceRegistry:
+    """Application-wide home for long-lived collaborators; only the session is bound per request.
+
+    Kafka publishers (and the producer behind them) are created once per topic and reused, as are
+    the product price cache and the rendered fragment cache, so a request pays for constructing
+    the thin, session-bound ``CreditService``/``OrderService`` only.
+    """
+
+    def __init__(
+        self,
+        producer=None,
+        storage_dir: str = "data",
+        background: bool = False,
+        catalog: ProductCatalog | None = None,
+        fragments: FragmentCache | None = None,
+        idempotency_ttl: float = 24 * 3600.0,
+    ):
+        self.producer = producer
+        self.storage_dir = storage_dir
+        self.background = background
+        self.catalog = catalog if catalog is not None else ProductCatalog()
+        self.fragments = fragments if fragments is not None else FragmentCache()
+        self.idempotency_ttl = idempotency_ttl
+        self._publishers: dict[str, KafkaService] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ServiceRegistry":
+        return cls(
+            storage_dir=os.getenv("KAFKA_STORAGE_DIR", "data"),
+            background=os.getenv("KAFKA_BACKGROUND", "0") == "1",
+            catalog=ProductCatalog(
+                max_entries=int(os.getenv("PRODUCT_CACHE_SIZE", "10000")),
+                ttl=float(os.getenv("PRODUCT_CACHE_TTL", "300")),
+            ),
+            fragments=FragmentCache(max_entries=int(os.getenv("FRAGMENT_CACHE_SIZE", "256"))),
+            idempotency_ttl=float(os.getenv("IDEMPOTENCY_KEY_TTL", "86400")),
+        )
+
+    def publisher(self, topic: str) -> KafkaService:
+        publisher = self._publishers.get(topic)
+        if publisher is None:
+            with self._lock:
+                publisher = self._publishers.get(topic)
+                if publisher is None:
+                    publisher = KafkaService(
+                        topic, producer=self.producer, storage_dir=self.storage_dir, background=self.background
+                    )
+                    self._publishers[topic] = publisher
+        return publisher
+
+    def relay_publisher(self, topic: str) -> KafkaService:
+        """A new synchronous publisher for the outbox relay, which owns and closes it."""
+        return KafkaService(topic, producer=self.producer, storage_dir=self.storage_dir)
+
+    def order_service(self, session: Session) -> OrderService:
+        return OrderService(session, CreditService(session), self.publisher(ORDER_SHIPPING_TOPIC), self.catalog)
+
+    def idempotency_service(self, session: Session) -> IdempotencyService:
+        return IdempotencyService(session, ttl=self.idempotency_ttl)
+
+    def async_order_service(self, session: AsyncSession) -> AsyncOrderService:
+        from .services.async_credit import AsyncCreditService
+        from .services.async_orders import AsyncOrderService
+
+        return AsyncOrderService(
+            session, AsyncCreditService(session), self.publisher(ORDER_SHIPPING_TOPIC), self.catalog
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            publishers, self._publishers = list(self._publishers.values()), {}
+        for publisher in publishers:
+            publisher.close()
+
+
+def get_services() -> ServiceRegistry:
+    return current_app.extensions["services"]
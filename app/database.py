@@ -1,23 +1,172 @@
 from __future__ import annotations
 
+import itertools
+import logging
+import threading
+import time
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Iterator, Sequence
 import os
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, scoped_session, sessionmaker
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import DeclarativeBase, Session, scoped_session, sessionmaker
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///app.db")
+# Comma-separated replica URLs; sessions opened with ``db_session(replica=True)`` read from them.
+DATABASE_READ_URLS = [url.strip() for url in os.getenv("DATABASE_READ_URLS", "").split(",") if url.strip()]
+# A replica is probed before use once its last successful check is this old, and skipped for
+# REPLICA_RETRY_SECONDS after a failed probe or a dropped connection.
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "10"))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+
+# Pool sizing applies per process; keep DB_POOL_SIZE at least as large as the worker's thread count.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+
+# Applied to every new SQLite connection: WAL lets readers run alongside the single writer,
+# busy_timeout makes writers wait for the lock instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+}
+
 
+def _is_sqlite_memory(url: str) -> bool:
+    return url.startswith("sqlite") and (url.endswith(":memory:") or url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:"))
 
-def _create_engine(url: str = DATABASE_URL):
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _create_engine(url: str = DATABASE_URL) -> Engine:
     connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
-    return create_engine(url, future=True, echo=False, connect_args=connect_args)
+    options = {}
+    if not _is_sqlite_memory(url):
+        options = {
+            "pool_size": POOL_SIZE,
+            "max_overflow": MAX_OVERFLOW,
+            "pool_timeout": POOL_TIMEOUT,
+            "pool_recycle": POOL_RECYCLE,
+            "pool_pre_ping": POOL_PRE_PING,
+        }
+    created = create_engine(url, future=True, echo=False, connect_args=connect_args, **options)
+    if url.startswith("sqlite"):
+        event.listen(created, "connect", _apply_sqlite_pragmas)
+    return created
+
+
+class ReplicaSet:
+    """Round-robin selection over read replicas, skipping the ones that fail health checks.
+
+    A replica is probed with ``SELECT 1`` when it is picked and its last good check is older
+    than ``check_interval``; a failed probe, or a disconnect reported while a query runs on it,
+    takes it out of rotation for ``retry_after`` seconds. ``choose`` returns None when no
+    replica is usable, and callers read from the primary instead.
+    """
+
+    def __init__(self, engines: Sequence[Engine], check_interval: float = 10.0, retry_after: float = 30.0):
+        self.engines = list(engines)
+        self.check_interval = check_interval
+        self.retry_after = retry_after
+        self._next = itertools.count()
+        self._checked_at = [float("-inf")] * len(self.engines)
+        self._down_until = [0.0] * len(self.engines)
+        self._lock = threading.Lock()
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    @classmethod
+    def from_urls(cls, urls: Sequence[str]) -> "ReplicaSet":
+        return cls(
+            [_create_engine(url) for url in urls], check_interval=REPLICA_CHECK_INTERVAL, retry_after=REPLICA_RETRY_SECONDS
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def choose(self) -> Engine | None:
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            index = next(self._next) % len(self.engines)
+            with self._lock:
+                if self._down_until[index] > now:
+                    continue
+                due = now - self._checked_at[index] >= self.check_interval
+            if not due or self._probe(index):
+                return self.engines[index]
+        return None
+
+    def _probe(self, index: int) -> bool:
+        try:
+            with self.engines[index].connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            logger.warning("Read replica %s failed its health check", self.engines[index].url, exc_info=True)
+            self._mark_down(index)
+            return False
+        with self._lock:
+            self._checked_at[index] = time.monotonic()
+        return True
+
+    def _mark_down(self, index: int) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_after
+            self._checked_at[index] = float("-inf")
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect and context.engine in self.engines:
+            self._mark_down(self.engines.index(context.engine))
+
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a replica when ``info["replica"]`` is set.
+
+    Everything else goes to the primary: flushes, DML, ``SELECT ... FOR UPDATE`` and textual
+    statements. The first statement routed to the primary pins the rest of the session there,
+    so a unit of work never reads older data than it has just written. One replica is picked
+    per session, so all reads in a request see the same snapshot.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("replica") and replicas:
+            if (
+                not self._flushing
+                and getattr(clause, "is_select", False)
+                and getattr(clause, "_for_update_arg", None) is None
+            ):
+                if "replica_engine" not in self.info:
+                    self.info["replica_engine"] = replicas.choose()
+                if self.info["replica_engine"] is not None:
+                    return self.info["replica_engine"]
+            self.info["replica"] = False
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
 
 
 engine = _create_engine()
+replicas = ReplicaSet.from_urls(DATABASE_READ_URLS)
 SessionLocal = scoped_session(
-    sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True)
+    sessionmaker(
+        bind=engine,
+        class_=RoutingSession,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+        future=True,
+    )
 )
 
 
@@ -26,8 +175,10 @@ class Base(DeclarativeBase):
 
 
 @contextmanager
-def db_session() -> Iterator[sessionmaker]:
+def db_session(replica: bool = False) -> Iterator[sessionmaker]:
+    """Transactional scope; ``replica=True`` lets its SELECTs go to a read replica (see ``RoutingSession``)."""
     session = SessionLocal()
+    session.info["replica"] = replica
     try:
         yield session
         session.commit()
@@ -36,10 +187,28 @@ def db_session() -> Iterator[sessionmaker]:
         raise
     finally:
         session.close()
+        session.info.pop("replica", None)
+        session.info.pop("replica_engine", None)
 
 
 def init_db() -> None:
     """Create all tables for the metadata if they do not exist."""
     from . import models  # noqa: F401  # ensure models are imported
 
+    _check_columns()
     Base.metadata.create_all(bind=engine)
+
+
+def _check_columns() -> None:
+    """Fail fast when existing tables lack columns the models declare; ``create_all`` never alters tables."""
+    inspector = inspect(engine)
+    missing: list[str] = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(f"{table.name}.{column.name}" for column in table.columns if column.name not in existing)
+    if missing:
+        raise RuntimeError(
+            f"Database schema is out of date (missing {', '.join(missing)}); run `alembic upgrade head`"
+        )
@@ -0,0 +1,26 @@
+"""Gunicorn settings for ``app.wsgi:app``; every value can be overridden from the environment.
+
+Each worker is a separate process with its own SQLAlchemy pool, so size ``DB_POOL_SIZE`` to at
+least ``GUNICORN_THREADS``. SQLite allows one writer at a time; extra workers mostly add read
+capacity there, while PostgreSQL scales with both.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Recycle workers periodically to cap memory growth; jitter avoids restarting them all at once.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+# The app starts engines and publisher threads at import, so load it inside each worker.
+preload_app = False
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+errorlog = "-"
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from flask import Response, current_app, request
+from markupsafe import Markup
+
+
+class FragmentCache:
+    """Size-bounded LRU of rendered HTML fragments.
+
+    Keys carry the ``TableVersions`` counters the fragment was rendered from, so a write makes
+    the old entries unreachable instead of requiring explicit invalidation; they age out of
+    the LRU.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Markup] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> Markup:
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+        fragment = Markup(render())
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = fragment
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return fragment
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong validator (unquoted) for a response determined entirely by ``parts``."""
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def template_stamp(*names: str) -> tuple[int, ...]:
+    """Modification times of templates, so edited templates change the ETags of pages using them."""
+    stamps = []
+    for name in names:
+        filename = current_app.jinja_env.get_template(name).filename
+        stamps.append(os.stat(filename).st_mtime_ns if filename else 0)
+    return tuple(stamps)
+
+
+def not_modified(etag: str) -> Response | None:
+    """A bodiless 304 when the client's ``If-None-Match`` already holds ``etag``, else None."""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Attach ``etag`` and ask caches to revalidate on every use."""
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
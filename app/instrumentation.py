@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from flask import Flask, Response, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request duration histogram exported at /api/_metrics.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class RequestStats:
+    """SQL activity attributed to one request."""
+
+    statements: int = 0
+    db_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.statements += 1
+        self.db_seconds += elapsed
+        if elapsed > self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+
+
+@dataclass
+class _EndpointMetrics:
+    requests: int = 0
+    errors: int = 0
+    request_seconds: float = 0.0
+    statements: int = 0
+    db_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("sql_request_stats", default=None)
+
+
+class SqlInstrumentation:
+    """Per-request SQL statement counts and timings from engine cursor events.
+
+    Statements executed while a request is active are attributed to it (the stats live in a
+    context variable, so each worker thread tracks its own request). ``after_request`` adds a
+    ``Server-Timing`` header; ``teardown_request`` folds the request into per-endpoint totals
+    that ``render_prometheus`` exports. Totals are per process.
+    """
+
+    def __init__(self, slow_query_ms: float | None = None):
+        self.slow_query_seconds = (slow_query_ms or 0) / 1000
+        self._metrics: dict[tuple[str, str], _EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SqlInstrumentation":
+        return cls(slow_query_ms=float(os.getenv("SLOW_QUERY_MS", "0")))
+
+    # -------- Wiring ---------
+    def init_app(self, app: Flask, *engines: Engine) -> None:
+        """Instrument ``engines`` (the primary and any read replicas) and install the request hooks."""
+        self.instrument(*engines)
+        app.extensions["sql_instrumentation"] = self
+        app.before_request(self._start)
+        app.after_request(self._add_server_timing)
+        app.teardown_request(self._finish)
+
+    @staticmethod
+    def instrument(*engines: Engine) -> None:
+        """Attribute statements run on ``engines`` to the active request (async engines: pass ``.sync_engine``)."""
+        for engine in engines:
+            if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+                event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    def _start(self) -> None:
+        request.environ["app.started"] = time.perf_counter()
+        request.environ["app.sql_token"] = start_request()[1]
+
+    def _add_server_timing(self, response: Response) -> Response:
+        stats = _current.get()
+        started = request.environ.get("app.started")
+        if stats is None or started is None:
+            return response
+        response.headers.add("Server-Timing", server_timing(stats, time.perf_counter() - started))
+        request.environ["app.status"] = response.status_code
+        return response
+
+    def _finish(self, error: BaseException | None) -> None:
+        token = request.environ.pop("app.sql_token", None)
+        started = request.environ.get("app.started")
+        stats = _current.get()
+        if token is None or stats is None or started is None:
+            return
+        end_request(token)
+        status = 500 if error is not None else request.environ.get("app.status", 200)
+        rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+        self.observe(request.method, rule, status, time.perf_counter() - started, stats)
+
+    def observe(self, method: str, rule: str, status: int, elapsed: float, stats: RequestStats) -> None:
+        """Fold one finished request into the per-endpoint totals."""
+        if self.slow_query_seconds and stats.slowest_seconds >= self.slow_query_seconds:
+            logger.warning(
+                "Slow SQL (%.1f ms) during %s %s: %s",
+                stats.slowest_seconds * 1000,
+                method,
+                rule,
+                stats.slowest_statement,
+            )
+        with self._lock:
+            metrics = self._metrics.setdefault((method, rule), _EndpointMetrics())
+            metrics.requests += 1
+            metrics.errors += status >= 500
+            metrics.request_seconds += elapsed
+            metrics.statements += stats.statements
+            metrics.db_seconds += stats.db_seconds
+            metrics.slowest_seconds = max(metrics.slowest_seconds, stats.slowest_seconds)
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if elapsed <= bound:
+                    metrics.buckets[index] += 1
+
+    # -------- Export ---------
+    def render_prometheus(self) -> str:
+        """Aggregated metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            snapshot = {key: (value, list(value.buckets)) for key, value in self._metrics.items()}
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def labels(method: str, rule: str, **extra: str) -> str:
+            pairs = {"method": method, "endpoint": rule, **extra}
+            rendered = ",".join(f'{key}="{_escape(value)}"' for key, value in pairs.items())
+            return "{" + rendered + "}"
+
+        family("app_http_requests_total", "counter", "HTTP requests handled.")
+        for (method, rule), (metrics, _) in sorted(snapshot.items()):
+            lines.append(f"app_http_requests_total{labels(method, rule)} {metrics.requests}")
+        family("app_http_request_errors_total", "counter", "HTTP requests that ended in a 5xx response.")
+        for (method, rule), (metrics, _) in sorted(snapshot.items()):
+            lines.append(f"app_http_request_errors_total{labels(method, rule)} {metrics.errors}")
+        family("app_http_request_duration_seconds", "histogram", "Wall time spent handling requests.")
+        for (method, rule), (metrics, buckets) in sorted(snapshot.items()):
+            for bound, count in zip(DURATION_BUCKETS, buckets):
+                lines.append(f"app_http_request_duration_seconds_bucket{labels(method, rule, le=str(bound))} {count}")
+            lines.append(f'app_http_request_duration_seconds_bucket{labels(method, rule, le="+Inf")} {metrics.requests}')
+            lines.append(f"app_http_request_duration_seconds_sum{labels(method, rule)} {metrics.request_seconds:.6f}")
+            lines.append(f"app_http_request_duration_seconds_count{labels(method, rule)} {metrics.requests}")
+        family("app_db_statements_total", "counter", "SQL statements executed while handling requests.")
+        for (method, rule), (metrics, _) in sorted(snapshot.items()):
+            lines.append(f"app_db_statements_total{labels(method, rule)} {metrics.statements}")
+        family("app_db_duration_seconds_total", "counter", "Time spent executing SQL while handling requests.")
+        for (method, rule), (metrics, _) in sorted(snapshot.items()):
+            lines.append(f"app_db_duration_seconds_total{labels(method, rule)} {metrics.db_seconds:.6f}")
+        family("app_db_slowest_statement_seconds", "gauge", "Slowest single SQL statement observed per endpoint.")
+        for (method, rule), (metrics, _) in sorted(snapshot.items()):
+            lines.append(f"app_db_slowest_statement_seconds{labels(method, rule)} {metrics.slowest_seconds:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+class ServerTimingMiddleware:
+    """ASGI counterpart of ``SqlInstrumentation.init_app`` for the asyncio deployment (``app.asgi``).
+
+    Tracks SQL per request through the same context variable (SQLAlchemy runs async statements
+    in greenlets that share the request task's context), adds ``Server-Timing`` to the response
+    start and folds the request into ``instrumentation``'s totals. ``rules`` maps endpoint
+    functions to the route path reported as the ``endpoint`` label.
+    """
+
+    def __init__(self, app: Any, instrumentation: SqlInstrumentation, rules: dict[Callable, str] | None = None):
+        self.app = app
+        self.instrumentation = instrumentation
+        self.rules = rules or {}
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        stats, token = start_request()
+        status = 500
+
+        async def send_with_timing(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = server_timing(stats, time.perf_counter() - started).encode("latin-1")
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(token)
+            rule = self.rules.get(scope.get("endpoint"), "<unmatched>")
+            self.instrumentation.observe(scope["method"], rule, status, time.perf_counter() - started, stats)
+
+
+class QueryLog:
+    """Append each distinct SELECT an engine runs, with its first parameters, to a JSON Lines file.
+
+    Enabled with ``SQL_QUERY_LOG=<path>``; ``python -m scripts.index_advisor`` replays the file
+    against a database and reports the statements that scan whole tables. A statement is written
+    once per process, so the file grows with the number of distinct queries, not with traffic.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._seen: set[str] = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "QueryLog | None":
+        path = os.getenv("SQL_QUERY_LOG")
+        return cls(path) if path else None
+
+    def attach(self, *engines: Engine) -> None:
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if executemany or not statement.lstrip()[:6].upper() == "SELECT":
+            return
+        with self._lock:
+            if statement in self._seen:
+                return
+            self._seen.add(statement)
+            line = json.dumps({"statement": statement, "parameters": parameters}, default=str)
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+
+
+def start_request() -> tuple[RequestStats, Token]:
+    """Begin attributing statements in this context to a new request; reset the token when it ends."""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token: Token) -> None:
+    try:
+        _current.reset(token)
+    except ValueError:  # finished in a different context than it started (e.g. a streamed body)
+        _current.set(None)
+
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    """``Server-Timing`` header value: SQL time and count, slowest statement, total handler time."""
+    return (
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+        f"db-slowest;dur={stats.slowest_seconds * 1000:.2f}, "
+        f"app;dur={elapsed * 1000:.2f}"
+    )
+
+
+def current_stats() -> RequestStats | None:
+    """Stats for the request running in this context, or ``None`` outside a request."""
+    return _current.get()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Kept on the execution context, which is discarded with the statement even when it raises.
+    if context is not None and _current.get() is not None:
+        context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = getattr(context, "query_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
@@ -4,7 +4,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import List
 
-from sqlalchemy import DateTime, ForeignKey, Numeric, String, Text, func
+from sqlalchemy import JSON, DateTime, Float, ForeignKey, Index, LargeBinary, Numeric, String, Text, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
@@ -17,6 +17,11 @@ class Customer(Base):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     credit_limit: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    balance: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), default=Decimal("0.00"), server_default="0", nullable=False
+    )
+    # Bumped by every balance write; CreditService.reserve_credit uses it as a compare-and-set guard.
+    version: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
@@ -25,6 +30,7 @@ class Customer(Base):
     orders: Mapped[List["Order"]] = relationship("Order", back_populates="customer", cascade="all, delete-orphan")
 
     def compute_balance(self) -> Decimal:
+        """Recompute the open balance from orders; ``balance`` holds the maintained value."""
         return sum((order.amount_total or Decimal("0")) for order in self.open_orders)
 
     @property
@@ -34,6 +40,10 @@ class Customer(Base):
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Active product listing: WHERE is_active ORDER BY name.
+        Index("ix_products_active_name", "is_active", "name"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     sku: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
@@ -47,6 +57,21 @@ class Product(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Newest-first listing and its (date_created, id) keyset cursor.
+        Index("ix_orders_created", "date_created", "id"),
+        # The same listing filtered by customer.
+        Index("ix_orders_customer_created", "customer_id", "date_created", "id"),
+        # Open orders per customer (balance reconciliation); partial where the dialect supports
+        # it, so it holds only unshipped rows, and carrying amount_total for the sums.
+        Index(
+            "ix_orders_open_customer",
+            "customer_id",
+            "amount_total",
+            sqlite_where=text("date_shipped IS NULL"),
+            postgresql_where=text("date_shipped IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"), nullable=False)
@@ -54,11 +79,12 @@ class Order(Base):
     notes: Mapped[str | None] = mapped_column(Text)
     date_created: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     date_shipped: Mapped[datetime | None] = mapped_column(DateTime)
+    # Bumped by every OrderService change to the order or its items; the API derives ETags from it.
+    version: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
 
-    customer: Mapped[Customer] = relationship("Customer", back_populates="orders", lazy="joined")
-    items: Mapped[List["OrderItem"]] = relationship(
-        "OrderItem", back_populates="order", cascade="all, delete-orphan", lazy="joined"
-    )
+    # Loading is chosen per query through OrderService load plans rather than eagerly here.
+    customer: Mapped[Customer] = relationship("Customer", back_populates="orders")
+    items: Mapped[List["OrderItem"]] = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
     def update_amount_total(self) -> None:
         self.amount_total = sum((item.amount for item in self.items), Decimal("0"))
@@ -66,6 +92,10 @@ class Order(Base):
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+        Index("ix_order_items_product_id", "product_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), nullable=False)
@@ -75,7 +105,66 @@ class OrderItem(Base):
     amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
 
     order: Mapped[Order] = relationship("Order", back_populates="items")
-    product: Mapped[Product] = relationship("Product", back_populates="items", lazy="joined")
+    product: Mapped[Product] = relationship("Product", back_populates="items")
 
     def recalculate_amount(self) -> None:
         self.amount = (self.unit_price or Decimal("0")) * Decimal(self.quantity or 0)
+
+
+class CustomerCreditSummary(Base):
+    """Open-order aggregates per customer, maintained by ``OrderService`` commands.
+
+    Commands adjust rows by deltas (``CreditSummaryService.apply``); ``refresh`` and the full
+    ``CreditSummaryService.rebuild`` recompute them from ``orders`` and converge on the truth.
+    """
+
+    __tablename__ = "customer_credit_summary"
+    __table_args__ = (Index("ix_customer_credit_summary_utilisation", "utilisation"),)
+
+    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"), primary_key=True)
+    credit_limit: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    open_balance: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    open_orders: Mapped[int] = mapped_column(nullable=False)
+    oldest_open_order_at: Mapped[datetime | None] = mapped_column(DateTime)
+    # open_balance / credit_limit; NULL for customers without a credit limit.
+    utilisation: Mapped[float | None] = mapped_column(Float)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class TableVersion(Base):
+    """Change counter per logical table, used to key caches and collection ETags."""
+
+    __tablename__ = "table_versions"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(default=0, nullable=False)
+
+
+class OutboxEvent(Base):
+    """Integration event written in the same transaction as the change that produced it."""
+
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    topic: Mapped[str] = mapped_column(String(255), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime)
+    attempts: Mapped[int] = mapped_column(default=0, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text)
+
+
+class IdempotencyRecord(Base):
+    """Response stored for an ``Idempotency-Key``, so a retried command is answered without re-running it."""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # SHA-256 of method, path and body; a key replayed with a different request is rejected.
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    # NULL while the claiming transaction is still running the command.
+    status_code: Mapped[int | None] = mapped_column()
+    response_body: Mapped[bytes | None] = mapped_column(LargeBinary)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+
+from flask import Flask, Response, current_app, request
+
+from .database import replicas
+
+STICKY_COOKIE = "read_primary_until"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReadYourWrites:
+    """Keep a client's reads on the primary for a short while after it writes.
+
+    Replicas apply the primary's changes with some delay, so a client that has just placed or
+    shipped an order could read the previous state back. After a successful write request the
+    response sets a short-lived cookie; while it is valid, ``replica_allowed`` is false and the
+    client's reads go to the primary. Clients that drop cookies get no such guarantee.
+    """
+
+    def __init__(self, sticky_seconds: float = 5.0):
+        self.sticky_seconds = sticky_seconds
+
+    @classmethod
+    def from_env(cls) -> "ReadYourWrites":
+        return cls(sticky_seconds=float(os.getenv("REPLICA_STICKY_SECONDS", "5")))
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions["read_your_writes"] = self
+        app.after_request(self._remember_write)
+
+    def replica_allowed(self) -> bool:
+        if not replicas or request.method not in SAFE_METHODS:
+            return False
+        try:
+            primary_until = float(request.cookies.get(STICKY_COOKIE, "0"))
+        except ValueError:
+            return True
+        return time.time() >= primary_until
+
+    def _remember_write(self, response: Response) -> Response:
+        if replicas and self.sticky_seconds > 0 and request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                STICKY_COOKIE,
+                f"{time.time() + self.sticky_seconds:.3f}",
+                max_age=math.ceil(self.sticky_seconds),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+def replica_reads() -> bool:
+    """Whether the current request may read from a replica; pass it to ``db_session(replica=...)``."""
+    policy = current_app.extensions.get("read_your_writes")
+    return policy is not None and policy.replica_allowed()
@@ -1,16 +1,48 @@
 """Business services for the order management system."""
 
-from .credit import CreditService
-from .orders import OrderService
-from .kafka import KafkaService, KafkaMessage
-from .exceptions import DomainError, CreditLimitExceededError, ResourceNotFoundError
+from .catalog import ProductCatalog, ProductPrice
+from .credit import CreditService, CustomerCredit
+from .credit_summary import CreditSummaryService
+from .idempotency import IdempotencyService, StoredResponse
+from .orders import BulkOrderResult, OrderService, ShipOrdersResult
+from .kafka import FakeProducer, KafkaService, KafkaMessage, PublisherMetrics, PublishQueueFullError
+from .outbox import OutboxRelay, OutboxService
+from .topic_log import LogRecord, TopicLog
+from .versions import TableVersions
+from .exceptions import (
+    ConcurrentUpdateError,
+    CreditLimitExceededError,
+    DomainError,
+    IdempotencyKeyReusedError,
+    ResourceNotFoundError,
+    ValidationError,
+)
 
 __all__ = [
     "CreditService",
+    "CustomerCredit",
+    "CreditSummaryService",
+    "IdempotencyService",
+    "StoredResponse",
+    "ProductCatalog",
+    "ProductPrice",
     "OrderService",
+    "BulkOrderResult",
+    "ShipOrdersResult",
     "KafkaService",
     "KafkaMessage",
+    "FakeProducer",
+    "PublisherMetrics",
+    "PublishQueueFullError",
+    "OutboxService",
+    "OutboxRelay",
+    "TopicLog",
+    "LogRecord",
+    "TableVersions",
     "DomainError",
     "CreditLimitExceededError",
+    "ConcurrentUpdateError",
+    "IdempotencyKeyReusedError",
     "ResourceNotFoundError",
+    "ValidationError",
 ]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Customer
+from .credit import CreditService
+from .credit_summary import CreditSummaryService
+
+
+class AsyncCreditService:
+    """``CreditService`` over an ``AsyncSession``.
+
+    Listings run their statements directly on the async session. Everything else runs the
+    synchronous service through ``AsyncSession.run_sync``: it executes on the event loop in a
+    greenlet and every statement awaits the asyncio driver, so credit rules live in one place
+    and no thread is held while the database answers.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.sync = CreditService(session.sync_session)
+
+    async def get_customer(self, customer_id: int) -> Customer:
+        return await self.session.run_sync(lambda _: self.sync.get_customer(customer_id))
+
+    async def balance(self, customer_id: int) -> Decimal:
+        return await self.session.run_sync(lambda _: self.sync.balance(customer_id))
+
+    async def balances_for(self, customer_ids: Iterable[int]) -> dict[int, Decimal]:
+        ids = list(customer_ids)
+        return await self.session.run_sync(lambda _: self.sync.balances_for(ids))
+
+    async def list_customer_credit_rows(self, after_id: Optional[int] = None, limit: Optional[int] = None) -> Sequence[Row]:
+        return (await self.session.execute(CreditService._customer_credit_rows_query(after_id, limit))).all()
+
+    async def list_summaries(
+        self,
+        min_utilisation: float | None = None,
+        max_utilisation: float | None = None,
+        min_open_orders: int | None = None,
+        opened_before: datetime | None = None,
+        sort: str = "-utilisation",
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Sequence[Row]:
+        """``CreditSummaryService.list_summaries`` on the async session."""
+        query = CreditSummaryService._summaries_query(
+            min_utilisation, max_utilisation, min_open_orders, opened_before, sort, limit, offset
+        )
+        return (await self.session.execute(query)).all()
+
+    async def reserve_credit(self, customer_id: int, amount: Decimal) -> Decimal:
+        return await self.session.run_sync(lambda _: self.sync.reserve_credit(customer_id, amount))
+
+    async def adjust_balance(self, customer_id: int, delta: Decimal) -> None:
+        await self.session.run_sync(lambda _: self.sync.adjust_balance(customer_id, delta))
+
+    async def adjust_balances(self, deltas: dict[int, Decimal]) -> None:
+        await self.session.run_sync(lambda _: self.sync.adjust_balances(deltas))
+
+    async def reconcile_balances(self) -> int:
+        return await self.session.run_sync(lambda _: self.sync.reconcile_balances())
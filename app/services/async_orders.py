@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, Iterable, Sequence
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.util import await_only
+
+from ..models import Customer, Order, OrderItem, Product
+from .async_credit import AsyncCreditService
+from .catalog import ProductCatalog
+from .exceptions import ResourceNotFoundError
+from .kafka import KafkaService
+from .orders import (
+    _ITEM_ROWS_QUERY,
+    ORDER_ROW_COLUMNS,
+    BulkOrderResult,
+    OrderRows,
+    OrderService,
+    ShipOrdersResult,
+    _chunked,
+)
+
+
+class _GreenletOrderService(OrderService):
+    """``OrderService`` as run by ``AsyncSession.run_sync``: retry backoff yields to the event loop."""
+
+    @staticmethod
+    def _sleep(seconds: float) -> None:
+        await_only(asyncio.sleep(seconds))
+
+
+class AsyncOrderService:
+    """``OrderService`` over an ``AsyncSession``, for the ASGI deployment (``app.asgi``).
+
+    Reads the API serves (order lookups, row listings and the NDJSON stream) are awaited on the
+    session directly. Commands run the synchronous ``OrderService`` through ``run_sync``, so
+    validation, credit reservation, table version bumps, summary refreshes and the outbox
+    write are the same code in both stacks; each statement still awaits the asyncio driver.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        credit_service: AsyncCreditService,
+        kafka_service: KafkaService | None = None,
+        catalog: ProductCatalog | None = None,
+    ):
+        self.session = session
+        self.credit_service = credit_service
+        self.sync = _GreenletOrderService(session.sync_session, credit_service.sync, kafka_service, catalog)
+
+    # -------- Retrieval helpers ---------
+    async def order_version(self, order_id: int) -> int | None:
+        """Row version of an order (None if it does not exist), for cheap conditional requests."""
+        query = select(Order.version).where(Order.id == order_id)
+        return (await self.session.execute(query)).scalar_one_or_none()
+
+    async def get_order(self, order_id: int, load: str = "full") -> Order:
+        order = (await self.session.execute(self.sync._order_query(order_id, load))).scalar_one_or_none()
+        if not order:
+            raise ResourceNotFoundError("Order", order_id)
+        return order
+
+    async def list_orders(
+        self,
+        customer_id: int | None = None,
+        shipped: bool | None = None,
+        cursor: tuple[datetime, int] | None = None,
+        limit: int | None = None,
+        load: str = "summary",
+    ) -> Sequence[Order]:
+        return await self.session.run_sync(lambda _: self.sync.list_orders(customer_id, shipped, cursor, limit, load))
+
+    async def list_order_rows(
+        self,
+        customer_id: int | None = None,
+        shipped: bool | None = None,
+        cursor: tuple[datetime, int] | None = None,
+        limit: int | None = None,
+    ) -> list[OrderRows]:
+        query = self.sync._orders_listing_query(customer_id, shipped, cursor, columns=ORDER_ROW_COLUMNS)
+        if limit is not None:
+            query = query.limit(limit)
+        return await self._with_item_rows((await self.session.execute(query)).all())
+
+    async def iter_order_rows(
+        self,
+        customer_id: int | None = None,
+        shipped: bool | None = None,
+        cursor: tuple[datetime, int] | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[OrderRows]:
+        """Server-side cursor over the listing; items are fetched once per ``batch_size`` orders."""
+        query = self.sync._orders_listing_query(customer_id, shipped, cursor, columns=ORDER_ROW_COLUMNS).execution_options(
+            yield_per=batch_size
+        )
+        result = await self.session.stream(query)
+        async for batch in result.partitions():
+            for entry in await self._with_item_rows(batch):
+                yield entry
+
+    async def _with_item_rows(self, orders: Sequence[Row]) -> list[OrderRows]:
+        items: dict[int, list[Row]] = {order.id: [] for order in orders}
+        for chunk in _chunked(list(items)):
+            for item in await self.session.execute(_ITEM_ROWS_QUERY, {"order_ids": chunk}):
+                items[item.order_id].append(item)
+        return [(order, items[order.id]) for order in orders]
+
+    async def list_customers(self) -> Sequence[Customer]:
+        return await self.session.run_sync(lambda _: self.sync.list_customers())
+
+    async def list_products(self) -> Sequence[Product]:
+        return await self.session.run_sync(lambda _: self.sync.list_products())
+
+    # -------- Commands ---------
+    async def create_product(self, sku: str, name: str, unit_price: Decimal, is_active: bool = True) -> Product:
+        return await self.session.run_sync(lambda _: self.sync.create_product(sku, name, unit_price, is_active))
+
+    async def update_product(
+        self, product_id: int, unit_price: Decimal | None = None, is_active: bool | None = None
+    ) -> Product:
+        return await self.session.run_sync(lambda _: self.sync.update_product(product_id, unit_price, is_active))
+
+    async def create_customer(self, name: str, email: str, credit_limit: Decimal) -> Customer:
+        return await self.session.run_sync(lambda _: self.sync.create_customer(name, email, credit_limit))
+
+    async def create_order(self, customer_id: int, items_data: Iterable[dict], notes: str | None = None) -> Order:
+        items = list(items_data)
+        return await self.session.run_sync(lambda _: self._loaded(self.sync.create_order(customer_id, items, notes)))
+
+    async def create_orders_bulk(self, orders_data: Iterable[dict]) -> list[BulkOrderResult]:
+        orders = list(orders_data)
+        return await self.session.run_sync(lambda _: self.sync.create_orders_bulk(orders))
+
+    async def add_items(self, order_id: int, items_data: Iterable[dict]) -> Order:
+        items = list(items_data)
+        return await self.session.run_sync(lambda _: self._loaded(self.sync.add_items(order_id, items)))
+
+    async def update_item(self, order_id: int, item_id: int, quantity: int) -> OrderItem:
+        return await self.session.run_sync(lambda _: self.sync.update_item(order_id, item_id, quantity))
+
+    async def replace_product(
+        self, order_id: int, item_id: int, product_id: int, quantity: int | None = None
+    ) -> OrderItem:
+        return await self.session.run_sync(lambda _: self.sync.replace_product(order_id, item_id, product_id, quantity))
+
+    async def remove_item(self, order_id: int, item_id: int) -> Order:
+        return await self.session.run_sync(lambda _: self._loaded(self.sync.remove_item(order_id, item_id), items=False))
+
+    async def ship_order(self, order_id: int, shipped_at: datetime | None = None) -> Order:
+        return await self.session.run_sync(lambda _: self._loaded(self.sync.ship_order(order_id, shipped_at)))
+
+    async def ship_orders(self, order_ids: Iterable[int], shipped_at: datetime | None = None) -> ShipOrdersResult:
+        ids = list(order_ids)
+        return await self.session.run_sync(lambda _: self.sync.ship_orders(ids, shipped_at))
+
+    @staticmethod
+    def _loaded(order: Order, items: bool = True) -> Order:
+        """Load what the payloads read while still in the greenlet; lazy loads cannot run once back in asyncio."""
+        order.amount_total  # pylint: disable=pointless-statement
+        if items:
+            order.items  # pylint: disable=pointless-statement
+        return order
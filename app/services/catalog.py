@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Iterable
+
+from sqlalchemy import bindparam, event, select
+from sqlalchemy.orm import Session
+
+from ..models import Product
+
+# Built once so every lookup reuses the same compiled statement; the expanding parameter takes
+# any number of ids.
+_PRICE_QUERY = select(Product.id, Product.sku, Product.name, Product.unit_price, Product.is_active).where(
+    Product.id.in_(bindparam("ids", expanding=True))
+)
+
+# Upper bound on ids per IN clause so large batches stay under driver parameter limits.
+_LOOKUP_CHUNK = 5000
+
+# Session.info key: {catalog: product ids} written by the session's open transaction.
+_PENDING = "catalog_invalidations"
+
+
+@dataclass(frozen=True)
+class ProductPrice:
+    id: int
+    sku: str
+    name: str
+    unit_price: Decimal
+    is_active: bool
+
+
+class ProductCatalog:
+    """Process-wide, size-bounded LRU of product prices with a time-to-live per entry.
+
+    ``prices`` answers from the cache and resolves every miss in one query. Writers call
+    ``invalidate`` (``OrderService`` does this for product creation and price changes, again
+    after the transaction commits); other processes see a change once their entry's ``ttl``
+    expires, so keep it short where prices change often. A session with uncommitted product
+    writes reads prices straight from the database and never fills the cache.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, tuple[float, ProductPrice]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def prices(self, session: Session, product_ids: Iterable[int]) -> dict[int, ProductPrice]:
+        """Return prices for ``product_ids``; unknown ids are omitted."""
+        wanted = set(product_ids)
+        found: dict[int, ProductPrice] = {}
+        if self in session.info.get(_PENDING, {}):
+            return self._load(session, sorted(wanted))
+        now = self.clock()
+        with self._lock:
+            for product_id in wanted:
+                entry = self._entries.get(product_id)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._entries[product_id]
+                    continue
+                self._entries.move_to_end(product_id)
+                found[product_id] = entry[1]
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+
+        loaded = self._load(session, sorted(wanted - found.keys()))
+        if loaded:
+            self._store(list(loaded.values()))
+            found.update(loaded)
+        return found
+
+    @staticmethod
+    def _load(session: Session, product_ids: list[int]) -> dict[int, ProductPrice]:
+        loaded: dict[int, ProductPrice] = {}
+        for start in range(0, len(product_ids), _LOOKUP_CHUNK):
+            rows = session.execute(_PRICE_QUERY, {"ids": product_ids[start : start + _LOOKUP_CHUNK]})
+            loaded.update((price.id, price) for price in (ProductPrice(*row) for row in rows))
+        return loaded
+
+    def get(self, session: Session, product_id: int) -> ProductPrice | None:
+        return self.prices(session, [product_id]).get(product_id)
+
+    def invalidate(self, product_id: int | None = None) -> None:
+        """Drop one product, or everything when ``product_id`` is None."""
+        with self._lock:
+            if product_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(product_id, None)
+
+    def invalidate_on_commit(self, session: Session, product_id: int) -> None:
+        """Invalidate now and again once ``session`` commits, so a concurrent miss cannot re-cache the old row."""
+        self.invalidate(product_id)
+        session.info.setdefault(_PENDING, {}).setdefault(self, set()).add(product_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, prices: list[ProductPrice]) -> None:
+        if self.max_entries <= 0:
+            return
+        expires = self.clock() + self.ttl
+        with self._lock:
+            for price in prices:
+                self._entries[price.id] = (expires, price)
+                self._entries.move_to_end(price.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for catalog, product_ids in session.info.pop(_PENDING, {}).items():
+        for product_id in product_ids:
+            catalog.invalidate(product_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session: Session, transaction) -> None:
+    if transaction.parent is None:  # rolled back; a commit already invalidated and cleared them
+        session.info.pop(_PENDING, None)
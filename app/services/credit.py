@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from decimal import Decimal
-from typing import Optional
+from typing import Iterable, Optional, Sequence
 
-from sqlalchemy import Select, func, select
+from sqlalchemy import Row, Select, bindparam, func, select, update
 from sqlalchemy.orm import Session
 
 from ..models import Customer, Order
-from .exceptions import CreditLimitExceededError, ResourceNotFoundError
+from .exceptions import ConcurrentUpdateError, CreditLimitExceededError, ResourceNotFoundError
+from .versions import CUSTOMERS, TableVersions
+
+
+@dataclass
+class CustomerCredit:
+    customer: Customer
+    balance: Decimal
+    available_credit: Decimal
 
 
 class CreditService:
@@ -15,32 +24,60 @@ class CreditService:
 
     def __init__(self, session: Session):
         self.session = session
+        self.versions = TableVersions(session)
 
     def _customer_query(self, customer_id: int) -> Select[tuple[Customer]]:
         return select(Customer).where(Customer.id == customer_id)
 
     def get_customer(self, customer_id: int) -> Customer:
-        customer = self.session.execute(self._customer_query(customer_id)).scalar_one_or_none()
+        customer = self.session.get(Customer, customer_id)
         if not customer:
             raise ResourceNotFoundError("Customer", customer_id)
         return customer
 
     def balance(self, customer_id: int) -> Decimal:
-        balance_value = (
-            self.session.execute(
-                select(func.coalesce(func.sum(Order.amount_total), 0))
-                .where(Order.customer_id == customer_id)
-                .where(Order.date_shipped.is_(None))
-            ).scalar_one()
+        return self.get_customer(customer_id).balance
+
+    def balances_for(self, customer_ids: Iterable[int]) -> dict[int, Decimal]:
+        """Return balances for many customers in one query; unknown ids are omitted."""
+        ids = set(customer_ids)
+        if not ids:
+            return {}
+        rows = self.session.execute(select(Customer.id, Customer.balance).where(Customer.id.in_(ids)))
+        return {customer_id: balance for customer_id, balance in rows}
+
+    def list_customers_with_balances(
+        self, after_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> Sequence[CustomerCredit]:
+        """Keyset-paginated customer listing ordered by id, with balances loaded in the same query."""
+        query = select(Customer).order_by(Customer.id)
+        if after_id is not None:
+            query = query.where(Customer.id > after_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return [
+            CustomerCredit(customer, customer.balance, customer.credit_limit - customer.balance)
+            for customer in self.session.execute(query).scalars()
+        ]
+
+    def list_customer_credit_rows(self, after_id: Optional[int] = None, limit: Optional[int] = None) -> Sequence[Row]:
+        """``list_customers_with_balances`` as Core rows (id, name, email, credit_limit, balance) for read-only payloads."""
+        return self.session.execute(self._customer_credit_rows_query(after_id, limit)).all()
+
+    @staticmethod
+    def _customer_credit_rows_query(after_id: Optional[int] = None, limit: Optional[int] = None) -> Select:
+        query = select(Customer.id, Customer.name, Customer.email, Customer.credit_limit, Customer.balance).order_by(
+            Customer.id
         )
-        if isinstance(balance_value, Decimal):
-            return balance_value
-        return Decimal(balance_value)
+        if after_id is not None:
+            query = query.where(Customer.id > after_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
 
     def can_place_order(self, customer_id: int, new_order_total: Decimal) -> bool:
         customer = self.get_customer(customer_id)
-        current_balance = self.balance(customer_id)
-        attempted_balance = current_balance + new_order_total
+        attempted_balance = customer.balance + new_order_total
         if attempted_balance > customer.credit_limit:
             raise CreditLimitExceededError(customer.id, customer.credit_limit, attempted_balance)
         return True
@@ -50,8 +87,93 @@ class CreditService:
 
     def open_credit(self, customer_id: int) -> Decimal:
         customer = self.get_customer(customer_id)
-        return customer.credit_limit - self.balance(customer_id)
+        return customer.credit_limit - customer.balance
 
     def mark_credit(self, customer_id: int, delta: Decimal) -> Decimal:
-        """Utility helper kept for completeness; recompute using persisted data."""
+        """Utility helper kept for completeness; returns the balance after applying ``delta``."""
         return self.balance(customer_id) + delta
+
+    def reserve_credit(self, customer_id: int, amount: Decimal) -> Decimal:
+        """Check ``amount`` against the credit limit and add it to the balance; returns the new balance.
+
+        The row is read ``FOR UPDATE`` on dialects that support it (PostgreSQL, MySQL) and written
+        back with a compare-and-set on ``version``, so elsewhere (SQLite) a writer that committed
+        in between makes this raise ``ConcurrentUpdateError`` instead of overdrawing the limit.
+        Nothing is written when it raises, so callers can simply retry.
+        """
+        row = self.session.execute(
+            select(Customer.credit_limit, Customer.balance, Customer.version)
+            .where(Customer.id == customer_id)
+            .with_for_update()
+        ).one_or_none()
+        if row is None:
+            raise ResourceNotFoundError("Customer", customer_id)
+        attempted = row.balance + amount
+        if amount > 0 and attempted > row.credit_limit:
+            raise CreditLimitExceededError(customer_id, row.credit_limit, attempted)
+        if not amount:
+            return row.balance
+        result = self.session.execute(
+            update(Customer)
+            .where(Customer.id == customer_id, Customer.version == row.version)
+            .values(balance=Customer.balance + amount, version=Customer.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            raise ConcurrentUpdateError("Customer", customer_id)
+        self._expire_balances({customer_id})
+        self.versions.bump(CUSTOMERS)
+        return attempted
+
+    def adjust_balance(self, customer_id: int, delta: Decimal) -> None:
+        """Apply ``delta`` to the materialized balance inside the current transaction."""
+        if not delta:
+            return
+        self.session.execute(
+            update(Customer)
+            .where(Customer.id == customer_id)
+            .values(balance=Customer.balance + delta, version=Customer.version + 1)
+        )
+        self.versions.bump(CUSTOMERS)
+
+    def adjust_balances(self, deltas: dict[int, Decimal]) -> None:
+        """Apply many per-customer deltas with a single executemany UPDATE."""
+        params = [{"customer_id": customer_id, "delta": delta} for customer_id, delta in deltas.items() if delta]
+        if not params:
+            return
+        customers = Customer.__table__
+        self.session.execute(
+            update(customers)
+            .where(customers.c.id == bindparam("customer_id"))
+            .values(balance=customers.c.balance + bindparam("delta"), version=customers.c.version + 1),
+            params,
+        )
+        self._expire_balances(deltas.keys())
+        self.versions.bump(CUSTOMERS)
+
+    def _expire_balances(self, customer_ids: Iterable[int]) -> None:
+        """Make loaded customers re-read balances written behind the identity map's back."""
+        ids = set(customer_ids)
+        for customer in self.session.identity_map.values():
+            if isinstance(customer, Customer) and customer.id in ids:
+                self.session.expire(customer, ["balance", "version"])
+
+    def reconcile_balances(self) -> int:
+        """Recompute every materialized balance from open orders and return the number of rows repaired."""
+        self.session.flush()
+        open_total = (
+            select(func.coalesce(func.sum(Order.amount_total), 0))
+            .where(Order.customer_id == Customer.id)
+            .where(Order.date_shipped.is_(None))
+            .scalar_subquery()
+        )
+        result = self.session.execute(
+            update(Customer)
+            .where(Customer.balance != open_total)
+            .values(balance=open_total, version=Customer.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        self.session.expire_all()
+        if result.rowcount:
+            self.versions.bump(CUSTOMERS)
+        return result.rowcount
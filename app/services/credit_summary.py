@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Mapping, Sequence
+
+from sqlalchemy import (
+    DateTime,
+    Float,
+    Integer,
+    Numeric,
+    Row,
+    Select,
+    and_,
+    bindparam,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.sql.dml import Update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models import Customer, CustomerCreditSummary, Order
+from .exceptions import ValidationError
+
+# Upper bound on ids per IN clause so large batches stay under driver parameter limits.
+_REFRESH_CHUNK = 5000
+
+_COLUMNS = (
+    "customer_id",
+    "credit_limit",
+    "open_balance",
+    "open_orders",
+    "oldest_open_order_at",
+    "utilisation",
+    "refreshed_at",
+)
+
+SORT_KEYS = {
+    "customer_id": CustomerCreditSummary.customer_id,
+    "utilisation": CustomerCreditSummary.utilisation,
+    "open_balance": CustomerCreditSummary.open_balance,
+    "open_orders": CustomerCreditSummary.open_orders,
+    "oldest_open_order_at": CustomerCreditSummary.oldest_open_order_at,
+}
+
+
+@dataclass
+class SummaryDelta:
+    """How one command changed a customer's open orders.
+
+    ``opened_at`` is the earliest ``date_created`` among orders it opened and ``closed_at`` the
+    earliest among orders it shipped or removed; either is None when there were none.
+    """
+
+    balance: Decimal = Decimal("0")
+    orders: int = 0
+    opened_at: datetime | None = None
+    closed_at: datetime | None = None
+
+    def add(
+        self, balance: Decimal, orders: int = 0, opened_at: datetime | None = None, closed_at: datetime | None = None
+    ) -> "SummaryDelta":
+        self.balance += balance
+        self.orders += orders
+        if opened_at is not None and (self.opened_at is None or opened_at < self.opened_at):
+            self.opened_at = opened_at
+        if closed_at is not None and (self.closed_at is None or closed_at < self.closed_at):
+            self.closed_at = closed_at
+        return self
+
+
+def _delta_update() -> Update:
+    """Executemany UPDATE applying one ``SummaryDelta`` per row; SET expressions see the old values."""
+    summary = CustomerCreditSummary.__table__
+    balance = summary.c.open_balance + bindparam("balance", type_=Numeric(12, 2))
+    opened_at = bindparam("opened_at", type_=DateTime)
+    closed_at = bindparam("closed_at", type_=DateTime)
+    oldest = summary.c.oldest_open_order_at
+    open_orders = Order.__table__
+    recomputed_oldest = (
+        select(func.min(open_orders.c.date_created))
+        .where(open_orders.c.customer_id == summary.c.customer_id, open_orders.c.date_shipped.is_(None))
+        .scalar_subquery()
+    )
+    return (
+        update(summary)
+        .where(summary.c.customer_id == bindparam("summary_customer_id"))
+        .values(
+            open_balance=balance,
+            open_orders=summary.c.open_orders + bindparam("orders", type_=Integer),
+            utilisation=case((summary.c.credit_limit > 0, cast(balance, Float) / summary.c.credit_limit), else_=None),
+            # Only a command that closed the oldest open order pays for finding the next one.
+            oldest_open_order_at=case(
+                (and_(closed_at.is_not(None), oldest >= closed_at), recomputed_oldest),
+                (and_(opened_at.is_not(None), (oldest.is_(None)) | (oldest > opened_at)), opened_at),
+                else_=oldest,
+            ),
+            refreshed_at=bindparam("now", type_=DateTime),
+        )
+    )
+
+
+_DELTA_UPDATE = _delta_update()
+
+
+def _summary_rows(customer_ids: Sequence[int] | None = None) -> Select:
+    """One summary row per customer, aggregated from open orders in a single grouped pass."""
+    open_orders = select(
+        Order.customer_id,
+        func.sum(Order.amount_total).label("open_balance"),
+        func.count().label("open_orders"),
+        func.min(Order.date_created).label("oldest_open_order_at"),
+    ).where(Order.date_shipped.is_(None))
+    if customer_ids is not None:
+        open_orders = open_orders.where(Order.customer_id.in_(customer_ids))
+    open_orders = open_orders.group_by(Order.customer_id).subquery()
+
+    open_balance = func.coalesce(open_orders.c.open_balance, 0)
+    query = select(
+        Customer.id,
+        Customer.credit_limit,
+        open_balance,
+        func.coalesce(open_orders.c.open_orders, 0),
+        open_orders.c.oldest_open_order_at,
+        # CAST keeps the division in floating point where NUMERIC values are stored as integers (SQLite).
+        case((Customer.credit_limit > 0, cast(open_balance, Float) / Customer.credit_limit), else_=None),
+        literal(datetime.utcnow()),
+    ).outerjoin(open_orders, open_orders.c.customer_id == Customer.id)
+    if customer_ids is not None:
+        query = query.where(Customer.id.in_(customer_ids))
+    return query
+
+
+class CreditSummaryService:
+    """Maintain and query ``customer_credit_summary``.
+
+    ``OrderService`` commands pass what they changed to ``apply`` in the same transaction, which
+    moves the stored totals by those deltas instead of re-aggregating the customer's orders.
+    ``refresh`` recomputes rows from ``orders``; ``rebuild`` recomputes every row with one
+    ``INSERT ... SELECT`` and is the repair path after writes that bypass the services
+    (``python -m scripts.rebuild_credit_summary``).
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def apply(self, deltas: Mapping[int, SummaryDelta]) -> None:
+        """Apply per-customer deltas with one executemany UPDATE; customers without a row are refreshed."""
+        if not deltas:
+            return
+        now = datetime.utcnow()
+        params = [
+            {
+                "summary_customer_id": customer_id,
+                "balance": delta.balance,
+                "orders": delta.orders,
+                "opened_at": delta.opened_at,
+                "closed_at": delta.closed_at,
+                "now": now,
+            }
+            for customer_id, delta in sorted(deltas.items())
+        ]
+        result = self.session.execute(_DELTA_UPDATE, params)
+        if self.session.get_bind().dialect.supports_sane_multi_rowcount and result.rowcount == len(params):
+            return
+        ids = sorted(deltas)
+        existing: set[int] = set()
+        for start in range(0, len(ids), _REFRESH_CHUNK):
+            chunk = ids[start : start + _REFRESH_CHUNK]
+            existing.update(
+                self.session.scalars(
+                    select(CustomerCreditSummary.customer_id).where(CustomerCreditSummary.customer_id.in_(chunk))
+                )
+            )
+        self.refresh(customer_id for customer_id in ids if customer_id not in existing)
+
+    def refresh(self, customer_ids: Iterable[int]) -> None:
+        ids = sorted(set(customer_ids))
+        if not ids:
+            return
+        self.session.flush()
+        dialect = self.session.get_bind().dialect.name
+        for start in range(0, len(ids), _REFRESH_CHUNK):
+            chunk = ids[start : start + _REFRESH_CHUNK]
+            if dialect in ("sqlite", "postgresql"):
+                upsert = (sqlite if dialect == "sqlite" else postgresql).insert(CustomerCreditSummary)
+                upsert = upsert.from_select(_COLUMNS, _summary_rows(chunk))
+                self.session.execute(
+                    upsert.on_conflict_do_update(
+                        index_elements=["customer_id"],
+                        set_={column: upsert.excluded[column] for column in _COLUMNS[1:]},
+                    )
+                )
+            else:
+                self.session.execute(
+                    delete(CustomerCreditSummary).where(CustomerCreditSummary.customer_id.in_(chunk))
+                )
+                self.session.execute(insert(CustomerCreditSummary).from_select(_COLUMNS, _summary_rows(chunk)))
+
+    def rebuild(self) -> int:
+        """Recompute every customer's row; returns the number of rows written."""
+        self.session.flush()
+        self.session.execute(delete(CustomerCreditSummary))
+        self.session.execute(insert(CustomerCreditSummary).from_select(_COLUMNS, _summary_rows()))
+        return self.session.execute(select(func.count()).select_from(CustomerCreditSummary)).scalar_one()
+
+    def list_summaries(
+        self,
+        min_utilisation: float | None = None,
+        max_utilisation: float | None = None,
+        min_open_orders: int | None = None,
+        opened_before: datetime | None = None,
+        sort: str = "-utilisation",
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Sequence[Row]:
+        """Summary rows with the customer name; ``sort`` is a ``SORT_KEYS`` name, ``-`` prefixed for descending."""
+        query = self._summaries_query(min_utilisation, max_utilisation, min_open_orders, opened_before, sort, limit, offset)
+        return self.session.execute(query).all()
+
+    @staticmethod
+    def _summaries_query(
+        min_utilisation: float | None = None,
+        max_utilisation: float | None = None,
+        min_open_orders: int | None = None,
+        opened_before: datetime | None = None,
+        sort: str = "-utilisation",
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Select:
+        column = SORT_KEYS.get(sort.lstrip("-"))
+        if column is None:
+            raise ValidationError(f"sort must be one of {', '.join(SORT_KEYS)} (prefix - for descending)")
+        descending = sort.startswith("-")
+        query = select(*CustomerCreditSummary.__table__.columns, Customer.name).join(
+            Customer, Customer.id == CustomerCreditSummary.customer_id
+        )
+        if min_utilisation is not None:
+            query = query.where(CustomerCreditSummary.utilisation >= min_utilisation)
+        if max_utilisation is not None:
+            query = query.where(CustomerCreditSummary.utilisation <= max_utilisation)
+        if min_open_orders is not None:
+            query = query.where(CustomerCreditSummary.open_orders >= min_open_orders)
+        if opened_before is not None:
+            query = query.where(CustomerCreditSummary.oldest_open_order_at < opened_before)
+        query = query.order_by(
+            column.desc() if descending else column.asc(),
+            CustomerCreditSummary.customer_id.desc() if descending else CustomerCreditSummary.customer_id.asc(),
+        )
+        if limit is not None:
+            query = query.limit(limit).offset(offset)
+        return query
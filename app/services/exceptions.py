@@ -5,6 +5,27 @@ class DomainError(Exception):
     """Base class for domain-specific exceptions."""
 
 
+class ValidationError(DomainError):
+    """Raised when caller-supplied input is malformed."""
+
+
+class ConcurrentUpdateError(DomainError):
+    """Raised when a row changed between being read and written and retries were exhausted."""
+
+    def __init__(self, resource: str, identifier: str | int):
+        super().__init__(f"{resource} '{identifier}' was modified concurrently; please retry")
+        self.resource = resource
+        self.identifier = identifier
+
+
+class IdempotencyKeyReusedError(DomainError):
+    """Raised when an ``Idempotency-Key`` already answered a different request."""
+
+    def __init__(self, key: str):
+        super().__init__(f"Idempotency-Key '{key}' was already used for a different request")
+        self.key = key
+
+
 class CreditLimitExceededError(DomainError):
     def __init__(self, customer_id: int, credit_limit: Decimal, attempted: Decimal):
         message = (
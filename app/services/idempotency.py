@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import IdempotencyRecord
+from .exceptions import ConcurrentUpdateError, IdempotencyKeyReusedError, ValidationError
+
+MAX_KEY_LENGTH = 255
+DEFAULT_TTL = 24 * 3600.0
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: bytes
+
+
+class IdempotencyService:
+    """Remember the response to each ``Idempotency-Key`` so retried commands are not run twice.
+
+    ``claim`` inserts the key in the caller's transaction before the command runs and ``store``
+    attaches the response, so the key commits (or rolls back) with the command's writes. A
+    concurrent retry waits on the uncommitted key row, then replays what the first request
+    stored. Failed commands roll the claim back, so the key can be retried. Keys expire after
+    ``ttl`` seconds; ``purge_expired`` deletes them (``python -m scripts.purge_idempotency_keys``).
+    """
+
+    def __init__(self, session: Session, ttl: float = DEFAULT_TTL):
+        self.session = session
+        self.ttl = ttl
+
+    @staticmethod
+    def fingerprint(method: str, path: str, body: bytes) -> str:
+        digest = hashlib.sha256(f"{method} {path}\n".encode("utf-8"))
+        digest.update(body)
+        return digest.hexdigest()
+
+    def claim(self, key: str, fingerprint: str) -> StoredResponse | None:
+        """Reserve ``key`` for this transaction, or return the response already stored for it."""
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValidationError(f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+        now = datetime.utcnow()
+        values = {
+            "key": key,
+            "fingerprint": fingerprint,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl),
+        }
+        if self._insert_new(values):
+            return None
+
+        record = self.session.execute(select(IdempotencyRecord).where(IdempotencyRecord.key == key)).scalar_one()
+        if record.expires_at <= now:
+            # Expired keys are reused in place rather than deleted and re-inserted.
+            self.session.execute(
+                update(IdempotencyRecord)
+                .where(IdempotencyRecord.key == key)
+                .values(status_code=None, response_body=None, **values)
+                .execution_options(synchronize_session=False)
+            )
+            self.session.expire(record)
+            return None
+        if record.fingerprint != fingerprint:
+            raise IdempotencyKeyReusedError(key)
+        if record.status_code is None:  # committed without a response (not written by the API)
+            raise ConcurrentUpdateError("Idempotency-Key", key)
+        return StoredResponse(record.status_code, record.response_body)
+
+    def _insert_new(self, values: dict) -> bool:
+        """Insert the key unless it exists; True when this call inserted it."""
+        dialect = self.session.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            statement = (sqlite if dialect == "sqlite" else postgresql).insert(IdempotencyRecord).values(values)
+            return self.session.execute(statement.on_conflict_do_nothing(index_elements=["key"])).rowcount == 1
+        try:
+            self.session.execute(insert(IdempotencyRecord).values(values))
+        except IntegrityError:
+            return False
+        return True
+
+    def store(self, key: str, status_code: int, body: bytes) -> None:
+        self.session.execute(
+            update(IdempotencyRecord)
+            .where(IdempotencyRecord.key == key)
+            .values(status_code=status_code, response_body=body)
+            .execution_options(synchronize_session=False)
+        )
+
+    def purge_expired(self, now: datetime | None = None) -> int:
+        result = self.session.execute(
+            delete(IdempotencyRecord)
+            .where(IdempotencyRecord.expires_at <= (now or datetime.utcnow()))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
@@ -1,17 +1,28 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, Protocol
+from typing import Any, Callable, Iterable, Iterator, Protocol, Sequence
 
-from ..models import Order
+from sqlalchemy import Row
+
+from ..models import Order, OrderItem
+from .topic_log import TopicLog, open_topic_log
+
+logger = logging.getLogger(__name__)
+
+DeliveryCallback = Callable[[Any, Any], None]
 
 
 class ProducerProtocol(Protocol):
-    def produce(self, topic: str, value: bytes) -> Any: ...
+    def produce(self, topic: str, value: bytes, on_delivery: DeliveryCallback | None = None) -> Any: ...
 
     def flush(self, timeout: float | None = None) -> Any: ...
 
@@ -22,44 +33,302 @@ class KafkaMessage:
     payload: dict[str, Any]
 
 
+@dataclass
+class PublisherMetrics:
+    """Counters maintained by the background publisher; ``delivered``/``failed`` come from delivery callbacks."""
+
+    enqueued: int = 0
+    delivered: int = 0
+    failed: int = 0
+    dropped: int = 0
+    batches: int = 0
+    last_error: str | None = None
+
+
+class PublishQueueFullError(RuntimeError):
+    """Raised when the background publisher cannot accept a message within the enqueue timeout."""
+
+
+class FakeProducer:
+    """In-process producer for tests and local runs; records messages and reports delivery on flush."""
+
+    def __init__(self, fail: Callable[[bytes], bool] | None = None, latency: float = 0.0):
+        self.fail = fail
+        self.latency = latency
+        self.messages: list[tuple[str, bytes]] = []
+        self.flushes = 0
+        self._pending: list[tuple[bytes, DeliveryCallback | None]] = []
+        self._lock = threading.Lock()
+
+    def produce(self, topic: str, value: bytes, on_delivery: DeliveryCallback | None = None) -> None:
+        with self._lock:
+            self._pending.append((value, on_delivery))
+            if not (self.fail and self.fail(value)):
+                self.messages.append((topic, value))
+
+    def flush(self, timeout: float | None = None) -> int:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self.flushes += 1
+        for value, callback in pending:
+            if callback:
+                error = "delivery failed" if self.fail and self.fail(value) else None
+                callback(error, value)
+        return 0
+
+
+@dataclass
+class _Stop:
+    done: threading.Event = field(default_factory=threading.Event)
+
+
 class KafkaService:
-    """Minimal Kafka publisher with fallback to filesystem storage."""
+    """Minimal Kafka publisher with fallback to filesystem storage.
+
+    With ``background=True`` messages are placed on a bounded in-process queue and a worker thread
+    sends them in batches of up to ``batch_size``, waiting at most ``linger_ms`` for a batch to fill.
+    Call ``close()`` (or use the service as a context manager) to drain the queue on shutdown.
+    """
 
-    def __init__(self, topic: str, producer: ProducerProtocol | None = None, storage_dir: str = "data"):
+    def __init__(
+        self,
+        topic: str,
+        producer: ProducerProtocol | None = None,
+        storage_dir: str = "data",
+        background: bool = False,
+        batch_size: int = 500,
+        linger_ms: float = 50,
+        max_queue: int = 10_000,
+        enqueue_timeout: float = 1.0,
+        log_options: dict[str, Any] | None = None,
+    ):
         self.topic = topic
         self.producer = producer
-        self.storage_path = Path(storage_dir) / f"{topic}.jsonl"
-        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self.storage_dir = Path(storage_dir)
+        self.log_options = log_options or {}
+        self._log: TopicLog | None = None
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000
+        self.enqueue_timeout = enqueue_timeout
+        self.metrics = PublisherMetrics()
+        self._metrics_lock = threading.Lock()
+        self._queue: queue.Queue[dict[str, Any] | _Stop] | None = None
+        self._worker: threading.Thread | None = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_queue)
+            self._worker = threading.Thread(target=self._run, name=f"kafka-publisher-{topic}", daemon=True)
+            self._worker.start()
+
+    def __enter__(self) -> "KafkaService":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def publish(self, payload: dict[str, Any]) -> KafkaMessage:
         message = KafkaMessage(topic=self.topic, payload=payload)
-        if self.producer:
-            self.producer.produce(self.topic, json.dumps(payload, default=self._serialize).encode("utf-8"))
-            self.producer.flush()
+        if self._queue is not None:
+            try:
+                self._queue.put(payload, timeout=self.enqueue_timeout)
+            except queue.Full:
+                self._count(dropped=1)
+                raise PublishQueueFullError(f"Publish queue for topic '{self.topic}' is full") from None
+            self._count(enqueued=1)
         else:
-            with self.storage_path.open("a", encoding="utf-8") as handle:
-                handle.write(json.dumps(payload, default=self._serialize) + "\n")
+            self._send([payload])
         return message
 
+    def publish_batch(self, payloads: Iterable[dict[str, Any]]) -> list[KafkaMessage]:
+        """Publish several payloads with a single producer flush (or file append) when not in background mode."""
+        payloads = list(payloads)
+        if self._queue is not None:
+            return [self.publish(payload) for payload in payloads]
+        if payloads:
+            self._send(payloads)
+        return [KafkaMessage(topic=self.topic, payload=payload) for payload in payloads]
+
+    def deliver_batch(self, payloads: Sequence[dict[str, Any]], timeout: float | None = None) -> list[str | None]:
+        """Send ``payloads`` now, bypassing any background queue, and wait for the outcome of each.
+
+        Returns one entry per payload: ``None`` once the producer's delivery callback confirmed it,
+        otherwise the error (including "not acknowledged" when ``flush`` returned before the callback
+        fired). The file fallback confirms a batch once it is appended and flushed to the log.
+        """
+        encoded = [json.dumps(payload, default=self._serialize).encode("utf-8") for payload in payloads]
+        if not self.producer:
+            self.log.append_many(encoded)
+            self.log.flush()
+            return [None] * len(encoded)
+
+        outcomes: list[str | None] = ["not acknowledged by the producer"] * len(encoded)
+
+        def confirm(index: int) -> DeliveryCallback:
+            def on_delivery(error: Any, _message: Any) -> None:
+                outcomes[index] = None if error is None else str(error)
+
+            return on_delivery
+
+        for index, value in enumerate(encoded):
+            self.producer.produce(self.topic, value, on_delivery=confirm(index))
+        self.producer.flush(timeout)
+        return outcomes
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every queued message has been handed to the producer; returns False on timeout."""
+        if self._queue is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self, timeout: float | None = None) -> None:
+        """Drain the background queue, stop the worker and flush the local log."""
+        if self._queue is not None and self._worker is not None:
+            stop = _Stop()
+            self._queue.put(stop)
+            stop.done.wait(timeout)
+            self._worker.join(timeout)
+            self._queue = None
+            self._worker = None
+        if self._log is not None:
+            self._log.flush()
+
     def publish_order(self, order: Order) -> KafkaMessage:
-        payload = {
+        return self.publish(self.order_payload(order))
+
+    @classmethod
+    def order_payload(cls, order: Order) -> dict[str, Any]:
+        """JSON-ready shipping event for ``order``; also what the outbox stores."""
+        return cls.order_row_payload(order, order.items)
+
+    @classmethod
+    def order_row_payload(cls, order: Order | Row, items: Iterable[OrderItem | Row]) -> dict[str, Any]:
+        """``order_payload`` for Core rows, as written by ``OrderService.ship_orders``."""
+        return {
             "order_id": order.id,
             "customer_id": order.customer_id,
-            "amount_total": self._decimal_to_str(order.amount_total),
+            "amount_total": cls._decimal_to_str(order.amount_total),
             "notes": order.notes,
-            "date_created": self._datetime_to_str(order.date_created),
-            "date_shipped": self._datetime_to_str(order.date_shipped),
+            "date_created": cls._datetime_to_str(order.date_created),
+            "date_shipped": cls._datetime_to_str(order.date_shipped),
             "items": [
                 {
                     "product_id": item.product_id,
                     "quantity": item.quantity,
-                    "unit_price": self._decimal_to_str(item.unit_price),
-                    "amount": self._decimal_to_str(item.amount),
+                    "unit_price": cls._decimal_to_str(item.unit_price),
+                    "amount": cls._decimal_to_str(item.amount),
                 }
-                for item in order.items
+                for item in items
             ],
         }
-        return self.publish(payload)
+
+    # -------- File fallback ---------
+    @property
+    def log(self) -> TopicLog:
+        """Segmented local log under ``<storage_dir>/<topic>/`` used when no producer is configured."""
+        if self._log is None:
+            self._log = open_topic_log(self.storage_dir / self.topic, **self.log_options)
+            legacy = self.storage_dir / f"{self.topic}.jsonl"
+            if self._log.next_offset == 0 and legacy.exists():
+                # Carry over events written by the single-file fallback before segments existed.
+                with legacy.open("rb") as handle:
+                    self._log.append_many(line.rstrip(b"\n") for line in handle if line.strip())
+        return self._log
+
+    def read_from(self, offset: int = 0, max_records: int | None = None) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Replay ``(offset, payload)`` pairs from the local log."""
+        for record in self.log.read_from(offset, max_records):
+            yield record.offset, json.loads(record.value)
+
+    # -------- Sending ---------
+    def _send(self, payloads: list[dict[str, Any]]) -> None:
+        encoded = [json.dumps(payload, default=self._serialize) for payload in payloads]
+        if self.producer:
+            on_delivery = self._on_delivery if self._queue is not None else None
+            for value in encoded:
+                if on_delivery:
+                    self.producer.produce(self.topic, value.encode("utf-8"), on_delivery=on_delivery)
+                else:
+                    self.producer.produce(self.topic, value.encode("utf-8"))
+            self.producer.flush()
+        else:
+            self.log.append_many(encoded)
+            if self._queue is not None:
+                self._count(delivered=len(encoded))
+
+    def _on_delivery(self, error: Any, message: Any) -> None:
+        if error is None:
+            self._count(delivered=1)
+        else:
+            self._count(failed=1, last_error=str(error))
+
+    def _count(self, last_error: str | None = None, **deltas: int) -> None:
+        with self._metrics_lock:
+            for name, delta in deltas.items():
+                setattr(self.metrics, name, getattr(self.metrics, name) + delta)
+            if last_error is not None:
+                self.metrics.last_error = last_error
+
+    def _run(self) -> None:
+        assert self._queue is not None
+        work = self._queue
+        stop: _Stop | None = None
+        while stop is None:
+            try:
+                first = work.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if isinstance(first, _Stop):
+                stop = first
+                work.task_done()
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = work.get(timeout=remaining) if remaining > 0 else work.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, _Stop):
+                    stop = item
+                    work.task_done()
+                    break
+                batch.append(item)
+            self._send_batch(work, batch)
+
+        # Drain anything enqueued after the stop request was observed.
+        leftovers: list[dict[str, Any]] = []
+        while True:
+            try:
+                item = work.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Stop):
+                work.task_done()
+                item.done.set()
+                continue
+            leftovers.append(item)
+        for start in range(0, len(leftovers), self.batch_size):
+            self._send_batch(work, leftovers[start : start + self.batch_size])
+        stop.done.set()
+
+    def _send_batch(self, work: queue.Queue, batch: list[dict[str, Any]]) -> None:
+        try:
+            self._send(batch)
+        except Exception as exc:  # keep the worker alive; failures are visible through metrics
+            logger.exception("Failed to publish batch of %d messages to %s", len(batch), self.topic)
+            self._count(failed=len(batch), last_error=str(exc))
+        else:
+            self._count(batches=1)
+        finally:
+            for _ in batch:
+                work.task_done()
 
     @staticmethod
     def _decimal_to_str(value: Decimal | None) -> str | None:
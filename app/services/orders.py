@@ -1,42 +1,210 @@
 from __future__ import annotations
 
+import random
+import time
+from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
-from typing import Iterable, Sequence
+from typing import Iterable, Iterator, Sequence
 
-from sqlalchemy import Select, select
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, Select, and_, bindparam, insert, or_, select, update
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
 
 from ..models import Customer, Order, OrderItem, Product
-from .exceptions import DomainError, ResourceNotFoundError
+from .exceptions import (
+    ConcurrentUpdateError,
+    CreditLimitExceededError,
+    DomainError,
+    ResourceNotFoundError,
+    ValidationError,
+)
+from .catalog import ProductCatalog, ProductPrice
 from .credit import CreditService
+from .credit_summary import CreditSummaryService, SummaryDelta
+from .versions import CUSTOMERS, ORDERS, PRODUCTS, TableVersions
+
+
+# Named loader strategies: "summary" for listings (customer, never items), "items" for payloads that
+# only need line items, "full" for the detail page (customer, items and their products).
+LOAD_PLANS: dict[str, tuple[ORMOption, ...]] = {
+    "summary": (joinedload(Order.customer), raiseload(Order.items)),
+    "items": (raiseload(Order.customer), selectinload(Order.items).raiseload(OrderItem.product)),
+    "full": (joinedload(Order.customer), selectinload(Order.items).joinedload(OrderItem.product)),
+}
+
+
+# Upper bound on ids per IN clause so large batches stay under driver parameter limits.
+IN_CLAUSE_CHUNK = 5000
+
+# Column sets for read-only listings served as plain rows (no identity map, no attribute
+# instrumentation); they carry exactly the fields the API payloads use.
+ORDER_ROW_COLUMNS = (Order.id, Order.customer_id, Order.amount_total, Order.notes, Order.date_created, Order.date_shipped)
+_ITEM_ROWS_QUERY = (
+    select(OrderItem.order_id, OrderItem.id, OrderItem.product_id, OrderItem.quantity, OrderItem.unit_price, OrderItem.amount)
+    .where(OrderItem.order_id.in_(bindparam("order_ids", expanding=True)))
+    .order_by(OrderItem.order_id, OrderItem.id)
+)
+
+# An order row paired with its item rows.
+OrderRows = tuple[Row, list[Row]]
+
+# Credit reservations that lose a compare-and-set race are retried this many times before
+# ConcurrentUpdateError reaches the caller. The first retry is immediate (on SQLite the failed
+# UPDATE already holds the write lock, so it succeeds); later ones back off with jitter.
+CREDIT_RESERVE_ATTEMPTS = 8
+CREDIT_RETRY_BACKOFF = 0.002
+
+
+@dataclass
+class BulkOrderResult:
+    index: int
+    order_id: int | None = None
+    error: DomainError | None = None
+
+    @property
+    def accepted(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class ShipOrdersResult:
+    shipped: list[int]
+    already_shipped: list[int]
+    not_found: list[int]
+
+
+def _chunked(values: Sequence[int], size: int = IN_CLAUSE_CHUNK) -> Iterator[Sequence[int]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
 
 
 class OrderService:
     """Application service encapsulating order workflows."""
 
-    def __init__(self, session: Session, credit_service: CreditService, kafka_service: "KafkaService | None" = None):
+    # Retry backoff; the asyncio stack swaps in a sleep that yields to the event loop.
+    _sleep = staticmethod(time.sleep)
+
+    def __init__(
+        self,
+        session: Session,
+        credit_service: CreditService,
+        kafka_service: "KafkaService | None" = None,
+        catalog: ProductCatalog | None = None,
+    ):
         self.session = session
         self.credit_service = credit_service
         self.kafka_service = kafka_service
+        # Without a shared catalog, lookups are still batched but only cached for this service's lifetime.
+        self.catalog = catalog if catalog is not None else ProductCatalog()
+        self.versions = TableVersions(session)
+        self.credit_summary = CreditSummaryService(session)
 
     # -------- Retrieval helpers ---------
-    def _order_query(self, order_id: int) -> Select[tuple[Order]]:
-        return select(Order).where(Order.id == order_id)
+    @staticmethod
+    def _load_options(load: str) -> tuple[ORMOption, ...]:
+        try:
+            return LOAD_PLANS[load]
+        except KeyError:
+            raise ValueError(f"Unknown order load plan {load!r}") from None
 
-    def get_order(self, order_id: int) -> Order:
-        order = self.session.execute(self._order_query(order_id)).unique().scalar_one_or_none()
+    def _order_query(self, order_id: int, load: str = "full") -> Select[tuple[Order]]:
+        return select(Order).where(Order.id == order_id).options(*self._load_options(load))
+
+    def order_version(self, order_id: int) -> int | None:
+        """Row version of an order (None if it does not exist), for cheap conditional requests."""
+        return self.session.execute(select(Order.version).where(Order.id == order_id)).scalar_one_or_none()
+
+    def get_order(self, order_id: int, load: str = "full") -> Order:
+        order = self.session.execute(self._order_query(order_id, load)).scalar_one_or_none()
         if not order:
             raise ResourceNotFoundError("Order", order_id)
         return order
 
-    def list_orders(self) -> Sequence[Order]:
-        return (
-            self.session.execute(select(Order).order_by(Order.date_created.desc()))
-            .unique()
-            .scalars()
-            .all()
+    def _orders_listing_query(
+        self,
+        customer_id: int | None = None,
+        shipped: bool | None = None,
+        cursor: tuple[datetime, int] | None = None,
+        columns: Sequence = (Order,),
+    ) -> Select:
+        """Newest-first order query; ``cursor`` is the ``(date_created, id)`` of the last row already seen."""
+        query = select(*columns).order_by(Order.date_created.desc(), Order.id.desc())
+        if customer_id is not None:
+            query = query.where(Order.customer_id == customer_id)
+        if shipped is True:
+            query = query.where(Order.date_shipped.is_not(None))
+        elif shipped is False:
+            query = query.where(Order.date_shipped.is_(None))
+        if cursor is not None:
+            created, last_id = cursor
+            query = query.where(
+                or_(Order.date_created < created, and_(Order.date_created == created, Order.id < last_id))
+            )
+        return query
+
+    def list_orders(
+        self,
+        customer_id: int | None = None,
+        shipped: bool | None = None,
+        cursor: tuple[datetime, int] | None = None,
+        limit: int | None = None,
+        load: str = "summary",
+    ) -> Sequence[Order]:
+        query = self._orders_listing_query(customer_id, shipped, cursor).options(*self._load_options(load))
+        if limit is not None:
+            query = query.limit(limit)
+        return self.session.execute(query).scalars().all()
+
+    def iter_orders(
+        self,
+        customer_id: int | None = None,
+        shipped: bool | None = None,
+        cursor: tuple[datetime, int] | None = None,
+        batch_size: int = 1000,
+        load: str = "items",
+    ) -> Iterator[Order]:
+        """Stream orders in ``batch_size`` chunks so memory stays bounded regardless of table size."""
+        query = (
+            self._orders_listing_query(customer_id, shipped, cursor)
+            .options(*self._load_options(load))
+            .execution_options(yield_per=batch_size)
         )
+        yield from self.session.scalars(query)
+
+    def list_order_rows(
+        self,
+        customer_id: int | None = None,
+        shipped: bool | None = None,
+        cursor: tuple[datetime, int] | None = None,
+        limit: int | None = None,
+    ) -> list[OrderRows]:
+        """``list_orders(load="items")`` as Core rows, for read-only payloads: two queries, no ORM objects."""
+        query = self._orders_listing_query(customer_id, shipped, cursor, columns=ORDER_ROW_COLUMNS)
+        if limit is not None:
+            query = query.limit(limit)
+        return self._with_item_rows(self.session.execute(query).all())
+
+    def iter_order_rows(
+        self,
+        customer_id: int | None = None,
+        shipped: bool | None = None,
+        cursor: tuple[datetime, int] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[OrderRows]:
+        """Row counterpart of ``iter_orders``: items are fetched once per ``batch_size`` orders."""
+        query = self._orders_listing_query(customer_id, shipped, cursor, columns=ORDER_ROW_COLUMNS).execution_options(
+            yield_per=batch_size
+        )
+        for batch in self.session.execute(query).partitions():
+            yield from self._with_item_rows(batch)
+
+    def _with_item_rows(self, orders: Sequence[Row]) -> list[OrderRows]:
+        items: dict[int, list[Row]] = {order.id: [] for order in orders}
+        for chunk in _chunked(list(items)):
+            for item in self.session.execute(_ITEM_ROWS_QUERY, {"order_ids": chunk}):
+                items[item.order_id].append(item)
+        return [(order, items[order.id]) for order in orders]
 
     def list_customers(self) -> Sequence[Customer]:
         return self.session.execute(select(Customer).order_by(Customer.name)).scalars().all()
@@ -62,6 +230,24 @@ class OrderService:
         product = Product(sku=sku, name=name, unit_price=unit_price, is_active=is_active)
         self.session.add(product)
         self.session.flush()
+        self.catalog.invalidate_on_commit(self.session, product.id)
+        self.versions.bump(PRODUCTS)
+        return product
+
+    def update_product(self, product_id: int, unit_price: Decimal | None = None, is_active: bool | None = None) -> Product:
+        """Change a product's price or availability; existing order items keep the price they captured."""
+        product = self.session.get(Product, product_id)
+        if not product:
+            raise ResourceNotFoundError("Product", product_id)
+        if unit_price is not None:
+            if unit_price <= Decimal("0"):
+                raise DomainError("Unit price must be greater than zero")
+            product.unit_price = unit_price
+        if is_active is not None:
+            product.is_active = is_active
+        self.session.flush()
+        self.catalog.invalidate_on_commit(self.session, product.id)
+        self.versions.bump(PRODUCTS)
         return product
 
     def create_customer(self, name: str, email: str, credit_limit: Decimal) -> Customer:
@@ -81,6 +267,8 @@ class OrderService:
         customer = Customer(name=name, email=email, credit_limit=credit_limit)
         self.session.add(customer)
         self.session.flush()
+        self.versions.bump(CUSTOMERS)
+        self.credit_summary.refresh([customer.id])
         return customer
 
     def create_order(self, customer_id: int, items_data: Iterable[dict], notes: str | None = None) -> Order:
@@ -89,14 +277,7 @@ class OrderService:
             raise DomainError("Cannot create an order without items")
 
         customer = self.credit_service.get_customer(customer_id)
-        product_ids = {int(item["product_id"]) for item in items_payload}
-        products = {
-            product.id: product
-            for product in self.session.execute(select(Product).where(Product.id.in_(product_ids))).scalars().all()
-        }
-        missing = product_ids - products.keys()
-        if missing:
-            raise ResourceNotFoundError("Product", next(iter(missing)))
+        products = self._products(int(item["product_id"]) for item in items_payload)
 
         order = Order(customer=customer, notes=notes)
         total = Decimal("0")
@@ -106,47 +287,365 @@ class OrderService:
             if quantity <= 0:
                 raise DomainError("Item quantity must be greater than zero")
             product = products[int(item["product_id"])]
-            unit_price: Decimal = product.unit_price
-            amount = unit_price * Decimal(quantity)
+            amount = product.unit_price * Decimal(quantity)
             total += amount
             order_items.append(
-                OrderItem(product=product, quantity=quantity, unit_price=unit_price, amount=amount)
+                OrderItem(product_id=product.id, quantity=quantity, unit_price=product.unit_price, amount=amount)
             )
 
-        self.credit_service.ensure_credit(customer.id, total)
+        self._reserve_credit(customer.id, total)
         order.items = order_items
         order.update_amount_total()
         self.session.add(order)
         self.session.flush()
+        self.versions.bump(ORDERS)
+        self.credit_summary.apply({customer.id: SummaryDelta(total, orders=1, opened_at=order.date_created)})
         return order
 
+    def create_orders_bulk(self, orders_data: Iterable[dict]) -> list[BulkOrderResult]:
+        """Create many orders with set-based lookups, inserts and balance updates.
+
+        Customers and products are resolved in chunked ``IN`` queries, credit is checked in memory
+        against each customer's running balance (so it is cumulative across the batch), and rows are
+        written with executemany inserts. Rejected rows are reported per index and never inserted.
+        """
+        payloads = list(orders_data)
+        results = [BulkOrderResult(index) for index in range(len(payloads))]
+        parsed: list[tuple[int, int, list[tuple[int, int]], str | None]] = []
+        for result, payload in zip(results, payloads):
+            try:
+                parsed.append((result.index, *self._parse_bulk_order(payload)))
+            except DomainError as exc:
+                result.error = exc
+
+        customer_ids = sorted({customer_id for _, customer_id, _, _ in parsed})
+        product_ids = sorted({product_id for _, _, items, _ in parsed for product_id, _ in items})
+        customers: dict[int, tuple[Decimal, Decimal]] = {}
+        for chunk in _chunked(customer_ids):
+            query = (
+                select(Customer.id, Customer.credit_limit, Customer.balance)
+                .where(Customer.id.in_(chunk))
+                .with_for_update()
+            )
+            customers.update({row.id: (row.credit_limit, row.balance) for row in self.session.execute(query)})
+        prices = {product.id: product.unit_price for product in self.catalog.prices(self.session, product_ids).values()}
+
+        running_balance = {customer_id: balance for customer_id, (_, balance) in customers.items()}
+        accepted: list[tuple[BulkOrderResult, dict, list[dict]]] = []
+        for index, customer_id, items, notes in parsed:
+            result = results[index]
+            if customer_id not in customers:
+                result.error = ResourceNotFoundError("Customer", customer_id)
+                continue
+            missing = next((product_id for product_id, _ in items if product_id not in prices), None)
+            if missing is not None:
+                result.error = ResourceNotFoundError("Product", missing)
+                continue
+            item_rows = [
+                {
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "unit_price": prices[product_id],
+                    "amount": prices[product_id] * Decimal(quantity),
+                }
+                for product_id, quantity in items
+            ]
+            total = sum((row["amount"] for row in item_rows), Decimal("0"))
+            credit_limit = customers[customer_id][0]
+            attempted = running_balance[customer_id] + total
+            if attempted > credit_limit:
+                result.error = CreditLimitExceededError(customer_id, credit_limit, attempted)
+                continue
+            running_balance[customer_id] = attempted
+            accepted.append((result, {"customer_id": customer_id, "notes": notes, "amount_total": total}, item_rows))
+
+        if not accepted:
+            return results
+
+        self.session.flush()
+        inserted = self.session.execute(
+            insert(Order).returning(Order.id, Order.date_created, sort_by_parameter_order=True),
+            [order_row for _, order_row, _ in accepted],
+        ).all()
+        all_items = []
+        summary: dict[int, SummaryDelta] = {}
+        for (result, order_row, item_rows), (order_id, created) in zip(accepted, inserted):
+            result.order_id = order_id
+            all_items.extend({**row, "order_id": order_id} for row in item_rows)
+            summary.setdefault(order_row["customer_id"], SummaryDelta()).add(
+                order_row["amount_total"], orders=1, opened_at=created
+            )
+        self.session.execute(insert(OrderItem), all_items)
+        self.versions.bump(ORDERS)
+        self.credit_service.adjust_balances(
+            {customer_id: running_balance[customer_id] - customers[customer_id][1] for customer_id in running_balance}
+        )
+        self.credit_summary.apply(summary)
+        return results
+
+    def _reserve_credit(self, customer_id: int, amount: Decimal) -> None:
+        """``CreditService.reserve_credit`` with bounded, jittered retries on concurrent balance writes."""
+        for attempt in range(CREDIT_RESERVE_ATTEMPTS):
+            try:
+                self.credit_service.reserve_credit(customer_id, amount)
+                return
+            except ConcurrentUpdateError:
+                if attempt == CREDIT_RESERVE_ATTEMPTS - 1:
+                    raise
+                if attempt:
+                    self._sleep(random.uniform(0, CREDIT_RETRY_BACKOFF * 2**attempt))
+
+    @staticmethod
+    def _parse_bulk_order(payload: dict) -> tuple[int, list[tuple[int, int]], str | None]:
+        if not isinstance(payload, dict):
+            raise ValidationError("Each order must be an object")
+        try:
+            customer_id = int(payload["customer_id"])
+            items = [(int(item["product_id"]), int(item.get("quantity", 0))) for item in payload.get("items") or []]
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError("customer_id and items[].product_id must be integers") from None
+        if not items:
+            raise DomainError("Cannot create an order without items")
+        if any(quantity <= 0 for _, quantity in items):
+            raise DomainError("Item quantity must be greater than zero")
+        return customer_id, items, payload.get("notes")
+
     def add_items(self, order_id: int, items_data: Iterable[dict]) -> Order:
-        order = self.get_order(order_id)
-        for item in items_data:
-            product_id = int(item["product_id"])
-            quantity = int(item.get("quantity", 0))
-            if quantity <= 0:
-                raise DomainError("Item quantity must be greater than zero")
-            product = self.session.get(Product, product_id)
-            if not product:
-                raise ResourceNotFoundError("Product", product_id)
-            unit_price = product.unit_price
-            amount = unit_price * Decimal(quantity)
-            order.items.append(OrderItem(product=product, quantity=quantity, unit_price=unit_price, amount=amount))
+        order = self._editable_order(order_id, allow_shipped=True)
+        items_payload = list(items_data)
+        products = self._products(int(item["product_id"]) for item in items_payload)
+        new_items: list[OrderItem] = []
+        for item in items_payload:
+            product = products[int(item["product_id"])]
+            quantity = self._quantity(item.get("quantity", 0))
+            amount = product.unit_price * Decimal(quantity)
+            new_items.append(
+                OrderItem(order_id=order.id, product_id=product.id, quantity=quantity, unit_price=product.unit_price, amount=amount)
+            )
+        delta = sum((item.amount for item in new_items), Decimal("0"))
+        self._apply_item_delta(order, delta)
+        self.session.add_all(new_items)
+        self.session.flush()
+        self.versions.bump(ORDERS)
+        self._refresh_summary(order, delta)
+        self.session.expire(order, ["items"])
+        return order
 
-        order.update_amount_total()
-        self.credit_service.ensure_credit(order.customer_id, order.amount_total)
+    # Item edits touch only the edited row: the order total and the customer balance move by the
+    # item's amount delta, and credit is checked against that delta, so the cost of an edit does
+    # not grow with the number of lines on the order.
+    def update_item(self, order_id: int, item_id: int, quantity: int) -> OrderItem:
+        """Change an item's quantity, keeping the unit price captured when it was ordered."""
+        order = self._editable_order(order_id)
+        item = self._order_item(order_id, item_id)
+        quantity = self._quantity(quantity)
+        amount = item.unit_price * Decimal(quantity)
+        delta = amount - item.amount
+        self._apply_item_delta(order, delta)
+        item.quantity = quantity
+        item.amount = amount
+        self.session.flush()
+        self.versions.bump(ORDERS)
+        self._refresh_summary(order, delta)
+        return item
+
+    def replace_product(self, order_id: int, item_id: int, product_id: int, quantity: int | None = None) -> OrderItem:
+        """Point an item at another product at that product's current price."""
+        order = self._editable_order(order_id)
+        item = self._order_item(order_id, item_id)
+        product = self._products([product_id])[product_id]
+        quantity = self._quantity(item.quantity if quantity is None else quantity)
+        amount = product.unit_price * Decimal(quantity)
+        delta = amount - item.amount
+        self._apply_item_delta(order, delta)
+        item.product_id = product.id
+        self.session.expire(item, ["product"])
+        item.quantity = quantity
+        item.unit_price = product.unit_price
+        item.amount = amount
+        self.session.flush()
+        self.versions.bump(ORDERS)
+        self._refresh_summary(order, delta)
+        return item
+
+    def remove_item(self, order_id: int, item_id: int) -> Order:
+        order = self._editable_order(order_id)
+        item = self._order_item(order_id, item_id)
+        remaining = self.session.execute(
+            select(OrderItem.id).where(OrderItem.order_id == order_id, OrderItem.id != item_id).limit(1)
+        ).first()
+        if remaining is None:
+            raise DomainError("Cannot remove the last item from an order")
+        delta = -item.amount
+        self._apply_item_delta(order, delta)
+        self.session.delete(item)
         self.session.flush()
+        self.versions.bump(ORDERS)
+        self._refresh_summary(order, delta)
+        self.session.expire(order, ["items"])
         return order
 
+    def _editable_order(self, order_id: int, allow_shipped: bool = False) -> Order:
+        """Load the order for an item edit and bump its ``version``.
+
+        An open order is claimed with ``UPDATE ... WHERE date_shipped IS NULL``, which also takes
+        its row lock, so a concurrent ship either waits for the edit to commit (and ships the new
+        total) or has already shipped it and the edit raises ``ConcurrentUpdateError``.
+        """
+        order = self.session.get(Order, order_id)
+        if not order:
+            raise ResourceNotFoundError("Order", order_id)
+        if order.date_shipped is not None:
+            if not allow_shipped:
+                raise DomainError("Shipped orders cannot be edited")
+            order.version = Order.version + 1
+            return order
+        claimed = self.session.execute(
+            update(Order)
+            .where(Order.id == order_id, Order.date_shipped.is_(None))
+            .values(version=Order.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        self.session.expire(order, ["version", "date_shipped"])
+        if claimed.rowcount != 1:
+            raise ConcurrentUpdateError("Order", order_id)
+        return order
+
+    def _order_item(self, order_id: int, item_id: int) -> OrderItem:
+        item = self.session.execute(
+            select(OrderItem).where(OrderItem.id == item_id, OrderItem.order_id == order_id)
+        ).scalar_one_or_none()
+        if not item:
+            raise ResourceNotFoundError("Order item", item_id)
+        return item
+
+    def _products(self, product_ids: Iterable[int]) -> dict[int, ProductPrice]:
+        """Resolve prices through the catalog (one query for all misses); raises for unknown ids."""
+        ids = list(product_ids)
+        products = self.catalog.prices(self.session, ids)
+        missing = next((product_id for product_id in ids if product_id not in products), None)
+        if missing is not None:
+            raise ResourceNotFoundError("Product", missing)
+        return products
+
+    @staticmethod
+    def _quantity(value: object) -> int:
+        try:
+            quantity = int(value)  # type: ignore[arg-type]
+        except (TypeError, ValueError):
+            raise ValidationError("Item quantity must be an integer") from None
+        if quantity <= 0:
+            raise DomainError("Item quantity must be greater than zero")
+        return quantity
+
+    def _apply_item_delta(self, order: Order, delta: Decimal) -> None:
+        """Move the order total (in SQL, so concurrent edits compose) and, while open, the customer's balance."""
+        if not delta:
+            return
+        if order.date_shipped is None:
+            self._reserve_credit(order.customer_id, delta)
+        order.amount_total = Order.amount_total + delta
+
+    def _refresh_summary(self, order: Order, delta: Decimal) -> None:
+        """Shipped orders are not part of the credit summary, so only edits to open orders move it."""
+        if order.date_shipped is None and delta:
+            self.credit_summary.apply({order.customer_id: SummaryDelta(delta)})
+
     def ship_order(self, order_id: int, shipped_at: datetime | None = None) -> Order:
-        order = self.get_order(order_id)
-        order.date_shipped = shipped_at or datetime.utcnow()
+        """Ship an open order; shipping an order that is already shipped changes nothing.
+
+        The ship is a conditional ``UPDATE ... WHERE date_shipped IS NULL``, so when two requests
+        race only the one whose UPDATE matched moves the balance and credit summary and records
+        the shipping event.
+        """
+        order = self.get_order(order_id, load="items")
+        if order.date_shipped is not None:
+            return order
         self.session.flush()
+        result = self.session.execute(
+            update(Order)
+            .where(Order.id == order_id, Order.date_shipped.is_(None))
+            .values(date_shipped=shipped_at or datetime.utcnow(), version=Order.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        # Re-read what was written (and the total and items as of the ship) from the now-updated row.
+        self.session.expire(order, ["date_shipped", "version", "amount_total", "items"])
+        if result.rowcount != 1:  # shipped by a concurrent request since it was loaded
+            return order
+        self.versions.bump(ORDERS)
+        self.credit_service.adjust_balance(order.customer_id, -order.amount_total)
+        self.credit_summary.apply(
+            {order.customer_id: SummaryDelta(-order.amount_total, orders=-1, closed_at=order.date_created)}
+        )
         if self.kafka_service:
-            self.kafka_service.publish_order(order)
+            # Published by OutboxRelay after this transaction commits, never before.
+            OutboxService(self.session).enqueue(self.kafka_service.topic, KafkaService.order_payload(order))
         return order
 
+    def ship_orders(self, order_ids: Iterable[int], shipped_at: datetime | None = None) -> ShipOrdersResult:
+        """Ship many open orders with set-based statements; orders already shipped are left as they are.
+
+        Each chunk of ids is shipped by one ``UPDATE ... WHERE id IN (...) AND date_shipped IS NULL
+        RETURNING``, so concurrent shippers never ship an order twice. Items for every shipped order
+        come from one ``IN`` query per chunk. Balances move by one aggregate delta per customer, and
+        the shipping events go into the outbox with one executemany insert, which the relay
+        publishes as a batch.
+        """
+        ids = sorted(set(order_ids))
+        shipped_at = shipped_at or datetime.utcnow()
+        self.session.flush()
+        shipped: list[Row] = []
+        for chunk in _chunked(ids):
+            shipped.extend(self._ship_open(chunk, shipped_at))
+        shipped.sort(key=lambda order: order.id)
+        shipped_ids = {order.id for order in shipped}
+        remaining = [order_id for order_id in ids if order_id not in shipped_ids]
+        existing: set[int] = set()
+        for chunk in _chunked(remaining):
+            existing.update(self.session.scalars(select(Order.id).where(Order.id.in_(chunk))))
+        result = ShipOrdersResult(
+            shipped=[order.id for order in shipped],
+            already_shipped=[order_id for order_id in remaining if order_id in existing],
+            not_found=[order_id for order_id in remaining if order_id not in existing],
+        )
+        if not shipped:
+            return result
+
+        for order in self.session.identity_map.values():
+            if isinstance(order, Order) and order.id in shipped_ids:
+                self.session.expire(order, ["date_shipped", "version"])
+        self.versions.bump(ORDERS)
+        summary: dict[int, SummaryDelta] = {}
+        for order in shipped:
+            summary.setdefault(order.customer_id, SummaryDelta()).add(
+                -order.amount_total, orders=-1, closed_at=order.date_created
+            )
+        self.credit_service.adjust_balances({customer_id: delta.balance for customer_id, delta in summary.items()})
+        self.credit_summary.apply(summary)
+        if self.kafka_service:
+            OutboxService(self.session).enqueue_many(
+                self.kafka_service.topic,
+                (KafkaService.order_row_payload(order, items) for order, items in self._with_item_rows(shipped)),
+            )
+        return result
+
+    def _ship_open(self, order_ids: Sequence[int], shipped_at: datetime) -> Sequence[Row]:
+        """Mark the still-open orders among ``order_ids`` shipped and return their rows."""
+        is_open = and_(Order.id.in_(order_ids), Order.date_shipped.is_(None))
+        statement = (
+            update(Order)
+            .values(date_shipped=shipped_at, version=Order.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if self.session.get_bind().dialect.update_returning:
+            return self.session.execute(statement.where(is_open).returning(*ORDER_ROW_COLUMNS)).all()
+        # Without UPDATE ... RETURNING (MySQL): lock the open rows, update exactly those, read them back.
+        ids = self.session.scalars(select(Order.id).where(is_open).with_for_update()).all()
+        if not ids:
+            return []
+        self.session.execute(statement.where(Order.id.in_(ids)))
+        return self.session.execute(select(*ORDER_ROW_COLUMNS).where(Order.id.in_(ids))).all()
 
 # Import at bottom to avoid circular imports
 from .kafka import KafkaService  # noqa: E402  # pylint: disable=wrong-import-position
+from .outbox import OutboxService  # noqa: E402  # pylint: disable=wrong-import-position
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..models import OutboxEvent
+from .kafka import KafkaService
+
+logger = logging.getLogger(__name__)
+
+# Events that failed this many deliveries are parked: the relay stops picking them up.
+MAX_ATTEMPTS = 10
+
+
+class OutboxService:
+    """Record integration events in the caller's transaction so they commit or roll back with it."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def enqueue(self, topic: str, payload: dict[str, Any]) -> OutboxEvent:
+        event = OutboxEvent(topic=topic, payload=payload)
+        self.session.add(event)
+        return event
+
+    def enqueue_many(self, topic: str, payloads: Iterable[dict[str, Any]]) -> None:
+        """Record many events with one executemany INSERT; the relay publishes them as a batch."""
+        rows = [{"topic": topic, "payload": payload} for payload in payloads]
+        if rows:
+            self.session.execute(insert(OutboxEvent), rows)
+
+    def pending_count(self) -> int:
+        return self.session.execute(
+            select(func.count()).select_from(OutboxEvent).where(OutboxEvent.sent_at.is_(None))
+        ).scalar_one()
+
+    def parked_count(self, max_attempts: int = MAX_ATTEMPTS) -> int:
+        """Unsent events the relay has given up on after ``max_attempts`` failed deliveries."""
+        return self.session.execute(
+            select(func.count())
+            .select_from(OutboxEvent)
+            .where(OutboxEvent.sent_at.is_(None), OutboxEvent.attempts >= max_attempts)
+        ).scalar_one()
+
+
+class OutboxRelay:
+    """Poll unsent outbox rows in batches, publish them, then mark them sent (at-least-once).
+
+    Each batch goes through ``KafkaService.deliver_batch``, so only rows whose delivery the
+    producer confirmed get ``sent_at``; the rest keep their error in ``last_error`` and are
+    retried on later polls, after events that have failed fewer times. A row that fails
+    ``max_attempts`` times is parked (logged and no longer polled) so permanently failing events
+    cannot block the rest; reset its ``attempts`` to re-queue it. ``publisher_for`` must return synchronous publishers (see
+    ``ServiceRegistry.relay_publisher``), which the relay owns and closes.
+
+    A crash between publishing and committing the ``sent_at`` update re-sends that batch on the
+    next poll, so consumers must tolerate duplicates. Several relays can run side by side on
+    databases that support ``SKIP LOCKED``; on SQLite run a single relay.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AbstractContextManager[Session]],
+        publisher_for: Callable[[str], KafkaService] | None = None,
+        batch_size: int = 500,
+        max_per_second: float | None = None,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_per_second = max_per_second
+        self.max_attempts = max_attempts
+        self._publisher_for = publisher_for or KafkaService
+        self._publishers: dict[str, KafkaService] = {}
+
+    def publisher(self, topic: str) -> KafkaService:
+        if topic not in self._publishers:
+            self._publishers[topic] = self._publisher_for(topic)
+        return self._publishers[topic]
+
+    def run_once(self) -> int:
+        """Relay one batch; returns the number of events marked sent."""
+        with self.session_factory() as session:
+            events = (
+                session.execute(
+                    select(OutboxEvent)
+                    .where(OutboxEvent.sent_at.is_(None), OutboxEvent.attempts < self.max_attempts)
+                    .order_by(OutboxEvent.attempts, OutboxEvent.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                .scalars()
+                .all()
+            )
+            by_topic: dict[str, list[OutboxEvent]] = {}
+            for event in events:
+                by_topic.setdefault(event.topic, []).append(event)
+
+            sent_ids: list[int] = []
+            failures: list[dict[str, Any]] = []
+            parked: list[int] = []
+            for topic, topic_events in by_topic.items():
+                try:
+                    outcomes = self.publisher(topic).deliver_batch([event.payload for event in topic_events])
+                except Exception as exc:
+                    outcomes = [str(exc)] * len(topic_events)
+                for event, error in zip(topic_events, outcomes):
+                    if error is None:
+                        sent_ids.append(event.id)
+                    else:
+                        failures.append({"event_id": event.id, "error": error})
+                        if event.attempts + 1 >= self.max_attempts:
+                            parked.append(event.id)
+
+            if failures:
+                logger.warning(
+                    "Outbox relay could not confirm delivery of %d events: %s", len(failures), failures[-1]["error"]
+                )
+                outbox = OutboxEvent.__table__
+                session.execute(
+                    update(outbox)
+                    .where(outbox.c.id == bindparam("event_id"))
+                    .values(attempts=outbox.c.attempts + 1, last_error=bindparam("error")),
+                    failures,
+                )
+            if parked:
+                logger.error(
+                    "Outbox relay parked %d events after %d failed attempts: ids %s",
+                    len(parked),
+                    self.max_attempts,
+                    parked,
+                )
+            if sent_ids:
+                session.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_(sent_ids))
+                    .values(sent_at=datetime.utcnow(), attempts=OutboxEvent.attempts + 1)
+                    .execution_options(synchronize_session=False)
+                )
+            return len(sent_ids)
+
+    def run_forever(self, poll_interval: float = 1.0, stop: threading.Event | None = None) -> None:
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            started = time.monotonic()
+            try:
+                sent = self.run_once()
+            except Exception:
+                logger.exception("Outbox relay cycle failed")
+                sent = 0
+            if self.max_per_second and sent:
+                # Throttle so the relay never exceeds max_per_second events on average.
+                stop.wait(max(sent / self.max_per_second - (time.monotonic() - started), 0))
+            if sent < self.batch_size:
+                stop.wait(poll_interval)
+
+    def close(self) -> None:
+        for publisher in self._publishers.values():
+            publisher.close()
+
+
+def start_relay_thread(relay: OutboxRelay, poll_interval: float = 1.0) -> tuple[threading.Thread, threading.Event]:
+    """Run ``relay`` on a daemon thread; set the returned event to stop it."""
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=relay.run_forever, kwargs={"poll_interval": poll_interval, "stop": stop}, name="outbox-relay", daemon=True
+    )
+    thread.start()
+    return thread, stop
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only coordinated within one process
+    fcntl = None
+
+# Index entries map an absolute record offset to a byte position inside its segment.
+_INDEX_ENTRY = struct.Struct(">QQ")
+FSYNC_POLICIES = ("never", "interval", "always")
+
+
+@dataclass(frozen=True)
+class LogRecord:
+    offset: int
+    value: bytes
+
+
+class _Segment:
+    def __init__(self, directory: Path, base_offset: int):
+        self.base_offset = base_offset
+        self.log_path = directory / f"{base_offset:020d}.log"
+        self.index_path = directory / f"{base_offset:020d}.index"
+
+    def size(self) -> int:
+        return self.log_path.stat().st_size if self.log_path.exists() else 0
+
+    def read_index(self) -> tuple[list[int], list[int]]:
+        offsets: list[int] = []
+        positions: list[int] = []
+        if self.index_path.exists():
+            data = self.index_path.read_bytes()
+            usable = len(data) - len(data) % _INDEX_ENTRY.size
+            for offset, position in _INDEX_ENTRY.iter_unpack(data[:usable]):
+                offsets.append(offset)
+                positions.append(position)
+        return offsets, positions
+
+
+class TopicLog:
+    """Append-only JSONL topic log split into size-rotated segments with a sparse offset index.
+
+    Every record is one newline-terminated line and its offset is its position in the log.
+    Each segment ``<base offset>.log`` has a companion ``.index`` holding an entry every
+    ``index_interval`` bytes, so ``read_from`` seeks close to the requested offset and scans
+    the memory-mapped segment from there. Appends are buffered; ``fsync`` selects whether data
+    is forced to disk on every append ("always"), at most every ``fsync_interval`` seconds
+    ("interval") or left to the OS ("never").
+
+    Writers in different processes are serialised with an exclusive ``flock`` on ``.lock`` in
+    the log directory. Each append takes the lock, picks up records another process wrote since
+    (re-reading the active segment's tail), and writes its buffer out before releasing it.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        segment_bytes: int = 64 * 1024 * 1024,
+        index_interval: int = 4096,
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+        buffer_bytes: int = 64 * 1024,
+        max_segments: int | None = None,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.index_interval = index_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.buffer_bytes = buffer_bytes
+        self.max_segments = max_segments
+        self._lock = threading.RLock()
+        self._lock_file = (self.directory / ".lock").open("a+b")
+        self._log_handle = None
+        self._index_handle = None
+        self._last_fsync = time.monotonic()
+        with self._exclusive(refresh=False):
+            self._load()
+
+    # -------- Opening / recovery ---------
+    def _load(self) -> None:
+        self._segments = [_Segment(self.directory, base) for base in self._existing_bases()]
+        if not self._segments:
+            self._segments.append(_Segment(self.directory, 0))
+        self._next_offset, self._active_size, self._last_indexed = self._recover(self._segments[-1])
+
+    @contextmanager
+    def _exclusive(self, refresh: bool = True) -> Iterator[None]:
+        """Hold the thread lock and the directory's cross-process lock; buffered writes are flushed on exit."""
+        with self._lock:
+            if fcntl:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                if refresh and self._changed_on_disk():
+                    self._close_handles()
+                    self._load()
+                yield
+            finally:
+                if self._log_handle:
+                    self._log_handle.flush()
+                    self._index_handle.flush()
+                if fcntl:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _changed_on_disk(self) -> bool:
+        """True when another process appended, rolled or trimmed segments since this one last wrote."""
+        bases = self._existing_bases()
+        active = self._segments[-1]
+        return bases[-1:] != [active.base_offset] or bases[:1] != [self._segments[0].base_offset] or (
+            active.size() != self._active_size
+        )
+
+    def _existing_bases(self) -> list[int]:
+        return sorted(int(path.stem) for path in self.directory.glob("*.log") if path.stem.isdigit())
+
+    def _recover(self, segment: _Segment) -> tuple[int, int, int]:
+        """Find the next offset of the active segment, truncating a torn final record if present."""
+        size = segment.size()
+        offsets, positions = segment.read_index()
+        valid = [i for i, position in enumerate(positions) if position < size]
+        offset, position = (offsets[valid[-1]], positions[valid[-1]]) if valid else (segment.base_offset, 0)
+        if len(valid) != len(positions):
+            with segment.index_path.open("r+b") as handle:
+                handle.truncate(len(valid) * _INDEX_ENTRY.size)
+        if size:
+            with segment.log_path.open("rb") as handle:
+                handle.seek(position)
+                tail = handle.read()
+            complete = tail.rfind(b"\n") + 1
+            offset += tail.count(b"\n", 0, complete)
+            if complete != len(tail):
+                with segment.log_path.open("r+b") as handle:
+                    handle.truncate(position + complete)
+                size = position + complete
+        last_indexed = positions[valid[-1]] if valid else -self.index_interval
+        return offset, size, last_indexed
+
+    # -------- Writing ---------
+    @property
+    def next_offset(self) -> int:
+        return self._next_offset
+
+    def append(self, value: bytes | str) -> int:
+        """Append one record and return its offset."""
+        return self.append_many([value])[0]
+
+    def append_many(self, values: Iterable[bytes | str]) -> list[int]:
+        with self._exclusive():
+            offsets = []
+            for value in values:
+                data = value.encode("utf-8") if isinstance(value, str) else value
+                if b"\n" in data:
+                    raise ValueError("Records must not contain newlines")
+                record = data + b"\n"
+                if self._active_size and self._active_size + len(record) > self.segment_bytes:
+                    self._roll()
+                log_handle, index_handle = self._handles()
+                if self._active_size - self._last_indexed >= self.index_interval:
+                    index_handle.write(_INDEX_ENTRY.pack(self._next_offset, self._active_size))
+                    self._last_indexed = self._active_size
+                log_handle.write(record)
+                offsets.append(self._next_offset)
+                self._next_offset += 1
+                self._active_size += len(record)
+            if self.fsync == "always" or (
+                self.fsync == "interval" and time.monotonic() - self._last_fsync >= self.fsync_interval
+            ):
+                self._sync()
+            return offsets
+
+    def flush(self) -> None:
+        """Push buffered writes to the OS so other readers can see them."""
+        with self._lock:
+            if self._log_handle:
+                self._log_handle.flush()
+                self._index_handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log_handle and self.fsync != "never":
+                self._sync()
+            self._close_handles()
+
+    def _close_handles(self) -> None:
+        if self._log_handle:
+            self._log_handle.close()
+            self._index_handle.close()
+            self._log_handle = self._index_handle = None
+
+    def _handles(self):
+        if self._log_handle is None:
+            segment = self._segments[-1]
+            self._log_handle = segment.log_path.open("ab", buffering=self.buffer_bytes)
+            self._index_handle = segment.index_path.open("ab")
+        return self._log_handle, self._index_handle
+
+    def _sync(self) -> None:
+        if self._log_handle:
+            self.flush()
+            os.fsync(self._log_handle.fileno())
+            os.fsync(self._index_handle.fileno())
+        self._last_fsync = time.monotonic()
+
+    def _roll(self) -> None:
+        self.close()
+        self._segments.append(_Segment(self.directory, self._next_offset))
+        self._active_size = 0
+        self._last_indexed = -self.index_interval
+        if self.max_segments and len(self._segments) > self.max_segments:
+            for segment in self._segments[: -self.max_segments]:
+                segment.log_path.unlink(missing_ok=True)
+                segment.index_path.unlink(missing_ok=True)
+            self._segments = self._segments[-self.max_segments :]
+
+    # -------- Reading ---------
+    @property
+    def first_offset(self) -> int:
+        return self._segments[0].base_offset
+
+    def read_from(self, offset: int = 0, max_records: int | None = None) -> Iterator[LogRecord]:
+        """Yield records starting at ``offset`` (clamped to the oldest retained record)."""
+        with self._exclusive():
+            segments = list(self._segments)
+            end_offset = self._next_offset
+        offset = max(offset, segments[0].base_offset)
+        remaining = max_records
+        start = bisect.bisect_right([segment.base_offset for segment in segments], offset) - 1
+        for segment in segments[start:]:
+            for record in self._read_segment(segment, offset, end_offset):
+                yield record
+                offset = record.offset + 1
+                if remaining is not None:
+                    remaining -= 1
+                    if remaining <= 0:
+                        return
+            if offset >= end_offset:
+                return
+
+    def _read_segment(self, segment: _Segment, offset: int, end_offset: int) -> Iterator[LogRecord]:
+        size = segment.size()
+        if not size or offset >= end_offset:
+            return
+        offsets, positions = segment.read_index()
+        entry = bisect.bisect_right(offsets, offset) - 1
+        current, position = (offsets[entry], positions[entry]) if entry >= 0 else (segment.base_offset, 0)
+        with segment.log_path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            while position < size and current < end_offset:
+                newline = view.find(b"\n", position)
+                if newline < 0:
+                    return
+                if current >= offset:
+                    yield LogRecord(current, view[position:newline])
+                current += 1
+                position = newline + 1
+
+
+_open_logs: dict[Path, TopicLog] = {}
+_open_logs_lock = threading.Lock()
+
+
+def open_topic_log(directory: str | Path, **options) -> TopicLog:
+    """Return the process-wide ``TopicLog`` for ``directory`` so concurrent writers share one offset sequence.
+
+    Other processes opening the same directory coordinate through the log's file lock.
+    """
+    path = Path(directory).resolve()
+    with _open_logs_lock:
+        if path not in _open_logs:
+            _open_logs[path] = TopicLog(path, **options)
+        return _open_logs[path]
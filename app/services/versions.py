@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..models import TableVersion
+
+# Logical tables whose content the web pages and API collections render.
+ORDERS = "orders"
+CUSTOMERS = "customers"
+PRODUCTS = "products"
+TRACKED_TABLES = (ORDERS, CUSTOMERS, PRODUCTS)
+
+# Session.info key holding the tables bumped by the current transaction.
+_PENDING = "pending_table_versions"
+
+
+class TableVersions:
+    """Per-table change counters stored in ``table_versions`` and bumped by the writing transaction.
+
+    Because the counters live in the database, every worker process sees a bump as soon as the
+    write commits, which makes them safe cache keys for rendered fragments and collection ETags.
+    ``OrderService`` commands bump what they change; code that writes these tables another way
+    (bulk loads, manual SQL) must call ``bump`` as well.
+
+    ``bump`` only records the table on the session. The counters are updated once per table, in
+    name order, just before the session commits, so each counter row stays locked only for the
+    commit itself and concurrent transactions always lock them in the same order.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    @staticmethod
+    def ensure(engine: Engine) -> None:
+        """Create the counter rows that are missing so ``bump`` is a single UPDATE."""
+        with engine.begin() as conn:
+            existing = set(conn.scalars(select(TableVersion.name)))
+            missing = [{"name": name, "version": 0} for name in TRACKED_TABLES if name not in existing]
+            if missing:
+                conn.execute(insert(TableVersion), missing)
+
+    def bump(self, *tables: str) -> None:
+        """Mark ``tables`` as changed; their counters go up by one when the transaction commits."""
+        self.session.info.setdefault(_PENDING, set()).update(tables)
+
+    @staticmethod
+    def _apply(session: Session) -> None:
+        pending = session.info.pop(_PENDING, None)
+        if not pending:
+            return
+        missing = []
+        for name in sorted(pending):
+            result = session.execute(
+                update(TableVersion)
+                .where(TableVersion.name == name)
+                .values(version=TableVersion.version + 1)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:  # counter not created yet (``ensure`` not run on this database)
+                missing.append({"name": name, "version": 1})
+        if missing:
+            session.execute(insert(TableVersion), missing)
+
+    def current(self, tables: Iterable[str]) -> tuple[int, ...]:
+        """Versions of ``tables`` in the order given (0 for a table never bumped), in one query."""
+        names = list(tables)
+        query = select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(names))
+        rows = dict(self.session.execute(query).all())
+        return tuple(rows.get(name, 0) for name in names)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_pending(session: Session) -> None:
+    TableVersions._apply(session)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session: Session, transaction) -> None:
+    if transaction.parent is None:  # the outermost transaction rolled back (commits applied the bumps)
+        session.info.pop(_PENDING, None)
@@ -1,20 +1,47 @@
 from __future__ import annotations
 
 from decimal import Decimal, InvalidOperation
+from typing import Any, Callable
 
-from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask import Blueprint, Response, flash, make_response, redirect, render_template, request, session, url_for
 
+from .container import get_services
 from .database import db_session
-from .services import CreditLimitExceededError, DomainError, KafkaService, OrderService
-from .services.credit import CreditService
+from .http_cache import make_etag, not_modified, template_stamp, with_etag
+from .read_routing import replica_reads
+from .services import CreditLimitExceededError, DomainError, OrderService, TableVersions
+from .services.versions import CUSTOMERS, ORDERS, PRODUCTS
 
 web_bp = Blueprint("web", __name__)
 
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
 
 def _service_factory(session) -> OrderService:
-    credit = CreditService(session)
-    kafka = KafkaService(topic="order_shipping")
-    return OrderService(session, credit, kafka)
+    return get_services().order_service(session)
+
+
+def _cached_listing(
+    page: str, fragment: str, tables: tuple[str, ...], params: tuple, load: Callable[[OrderService], dict[str, Any]]
+) -> Response:
+    """Render ``page`` around a cached table ``fragment`` and answer 304 when the browser is current.
+
+    The fragment key and the page ETag combine the ``TableVersions`` counters of ``tables`` with
+    the page parameters, so a hit costs one small query and no rendering. Pages carrying flash
+    messages are personal and are neither validated nor sent with an ETag.
+    """
+    personal = "_flashes" in session
+    with db_session(replica=replica_reads()) as db:
+        versions = TableVersions(db).current(tables)
+        etag = make_etag(request.endpoint, versions, params, template_stamp("base.html", page, fragment))
+        if not personal and (cached := not_modified(etag)):
+            return cached
+        table = get_services().fragments.get_or_render(
+            (fragment, versions, params), lambda: render_template(fragment, **load(_service_factory(db)))
+        )
+    response = make_response(render_template(page, table=table))
+    return response if personal else with_etag(response, etag)
 
 
 @web_bp.route("/")
@@ -24,21 +51,15 @@ def index():
 
 @web_bp.route("/customers")
 def list_customers():
-    with db_session() as session:
-        service = _service_factory(session)
-        customers = service.list_customers()
-        credit = service.credit_service
-        enriched = []
-        for customer in customers:
-            balance = credit.balance(customer.id)
-            enriched.append(
-                {
-                    "base": customer,
-                    "balance": balance,
-                    "available_credit": customer.credit_limit - balance,
-                }
-            )
-        return render_template("customers.html", customers=enriched)
+    after_id = request.args.get("after_id", type=int)
+    limit = min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+
+    def load(service: OrderService) -> dict[str, Any]:
+        page = service.credit_service.list_customers_with_balances(after_id=after_id, limit=limit)
+        next_after_id = page[-1].customer.id if len(page) == limit else None
+        return {"customers": page, "next_after_id": next_after_id, "limit": limit}
+
+    return _cached_listing("customers.html", "partials/customers_table.html", (CUSTOMERS,), (after_id, limit), load)
 
 
 @web_bp.route("/customers/new", methods=["GET", "POST"])
@@ -66,10 +87,13 @@ def create_customer():
 
 @web_bp.route("/products")
 def list_products():
-    with db_session() as session:
-        service = _service_factory(session)
-        products = service.list_products()
-        return render_template("products.html", products=products)
+    return _cached_listing(
+        "products.html",
+        "partials/products_table.html",
+        (PRODUCTS,),
+        (),
+        lambda service: {"products": service.list_products()},
+    )
 
 
 @web_bp.route("/products/new", methods=["GET", "POST"])
@@ -98,15 +122,19 @@ def create_product():
 
 @web_bp.route("/orders")
 def list_orders():
-    with db_session() as session:
-        service = _service_factory(session)
-        orders = service.list_orders()
-        return render_template("orders.html", orders=orders)
+    # Rows show customer names, which change only through customer creation (a new row, not an edit).
+    return _cached_listing(
+        "orders.html",
+        "partials/orders_table.html",
+        (ORDERS,),
+        (),
+        lambda service: {"orders": service.list_orders()},
+    )
 
 
 @web_bp.route("/orders/<int:order_id>")
 def order_detail(order_id: int):
-    with db_session() as session:
+    with db_session(replica=replica_reads()) as session:
         service = _service_factory(session)
         order = service.get_order(order_id)
         return render_template("order_detail.html", order=order)
@@ -121,6 +149,22 @@ def ship_order(order_id: int):
     return redirect(url_for("web.order_detail", order_id=order_id))
 
 
+@web_bp.route("/orders/<int:order_id>/items/<int:item_id>", methods=["POST"])
+def update_order_item(order_id: int, item_id: int):
+    try:
+        with db_session() as session:
+            service = _service_factory(session)
+            if request.form.get("action") == "remove":
+                service.remove_item(order_id, item_id)
+                flash("Item removed.", "success")
+            else:
+                service.update_item(order_id, item_id, request.form.get("quantity", ""))
+                flash("Item updated.", "success")
+    except DomainError as exc:
+        flash(str(exc), "error")
+    return redirect(url_for("web.order_detail", order_id=order_id))
+
+
 @web_bp.route("/orders/new", methods=["GET", "POST"])
 def create_order():
     if request.method == "POST":
@@ -0,0 +1,25 @@
+"""Production WSGI entry point.
+
+    gunicorn -c python:app.gunicorn_conf app.wsgi:app
+
+``python -m app.wsgi`` serves the same app with waitress (``pip install waitress``), which is
+handy on platforms gunicorn does not support.
+"""
+
+from __future__ import annotations
+
+import os
+
+from . import create_app
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    from waitress import serve
+
+    from .gunicorn_conf import threads, workers
+
+    host, _, port = os.getenv("BIND", "0.0.0.0:8000").rpartition(":")
+    # waitress is single-process, so give it the thread budget of every gunicorn worker.
+    serve(app, host=host, port=int(port), threads=workers * threads)
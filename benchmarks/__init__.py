@@ -0,0 +1 @@
+"""Performance benchmarks for the order management app; run modules with ``python -m benchmarks.<name>``."""
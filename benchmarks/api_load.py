@@ -0,0 +1,276 @@
+"""Load test for the REST API: latency percentiles, throughput and SQL statements per endpoint.
+
+Seeds a synthetic dataset (``--scale 1`` is 100k customers, 10k products, 1M orders / 5M items),
+then drives each endpoint from a thread pool through the Flask test client and, with ``--server``,
+through a real threaded HTTP server. Results are written as JSON so runs can be compared:
+
+    python -m benchmarks.api_load --scale 0.05 --output before.json
+    python -m benchmarks.api_load --scale 0.05 --output after.json --compare before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+ENDPOINTS = ("create_order", "get_order", "list_orders", "list_customers", "ship_order")
+
+
+@dataclass
+class Call:
+    method: str
+    path: str
+    body: dict[str, Any] | None = None
+
+
+@dataclass
+class EndpointResult:
+    endpoint: str
+    transport: str
+    requests: int
+    errors: int
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    statements_per_request: float | None
+
+
+class StatementCounter:
+    """Count statements per thread; the test client runs each request on the calling thread."""
+
+    def __init__(self, engine):
+        self._local = threading.local()
+        from sqlalchemy import event
+
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args, **kwargs) -> None:
+        self._local.count = getattr(self._local, "count", 0) + 1
+
+    def take(self) -> int:
+        count = getattr(self._local, "count", 0)
+        self._local.count = 0
+        return count
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def plan_calls(endpoint: str, count: int, customers: int, products: int, orders: list[int], rng: random.Random) -> list[Call]:
+    if endpoint == "create_order":
+        return [
+            Call(
+                "POST",
+                "/api/orders",
+                {
+                    "customer_id": rng.randint(1, customers),
+                    "items": [
+                        {"product_id": rng.randint(1, products), "quantity": rng.randint(1, 5)}
+                        for _ in range(rng.randint(1, 5))
+                    ],
+                },
+            )
+            for _ in range(count)
+        ]
+    if endpoint == "get_order":
+        return [Call("GET", f"/api/orders/{rng.choice(orders)}") for _ in range(count)]
+    if endpoint == "list_orders":
+        return [Call("GET", "/api/orders?limit=100") for _ in range(count)]
+    if endpoint == "list_customers":
+        return [Call("GET", f"/api/customers?after_id={rng.randint(0, customers)}&limit=100") for _ in range(count)]
+    if endpoint == "ship_order":
+        # Every ship targets a distinct open order so each request does real work.
+        return [Call("POST", f"/api/orders/{order_id}/ship") for order_id in orders[:count]]
+    raise ValueError(endpoint)
+
+
+def run_calls(
+    calls: list[Call], concurrency: int, send: Callable[[Call], int], counter: StatementCounter | None
+) -> tuple[list[float], int, float, list[int]]:
+    latencies: list[float] = []
+    statements: list[int] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(call: Call) -> None:
+        nonlocal errors
+        if counter:
+            counter.take()
+        started = time.perf_counter()
+        status = send(call)
+        elapsed = (time.perf_counter() - started) * 1000
+        issued = counter.take() if counter else 0
+        with lock:
+            latencies.append(elapsed)
+            statements.append(issued)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, calls))
+    return latencies, errors, time.perf_counter() - started, statements
+
+
+def summarize(endpoint: str, transport: str, latencies, errors, wall, statements, counted: bool) -> EndpointResult:
+    return EndpointResult(
+        endpoint=endpoint,
+        transport=transport,
+        requests=len(latencies),
+        errors=errors,
+        throughput_rps=round(len(latencies) / wall, 1) if wall else 0.0,
+        p50_ms=round(percentile(latencies, 50), 2),
+        p95_ms=round(percentile(latencies, 95), 2),
+        p99_ms=round(percentile(latencies, 99), 2),
+        statements_per_request=round(statistics.mean(statements), 2) if counted and statements else None,
+    )
+
+
+def test_client_sender(client) -> Callable[[Call], int]:
+    def send(call: Call) -> int:
+        return client.open(call.path, method=call.method, json=call.body).status_code
+
+    return send
+
+
+def http_sender(base_url: str) -> Callable[[Call], int]:
+    def send(call: Call) -> int:
+        data = json.dumps(call.body).encode() if call.body is not None else None
+        request = urllib.request.Request(base_url + call.path, data=data, method=call.method)
+        request.add_header("Content-Type", "application/json")
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+    return send
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: list[dict], baseline_path: Path) -> None:
+    baseline = {(row["endpoint"], row["transport"]): row for row in json.loads(baseline_path.read_text())["results"]}
+    print(f"\nvs {baseline_path}:")
+    for row in current:
+        before = baseline.get((row["endpoint"], row["transport"]))
+        if not before or not before["p95_ms"]:
+            continue
+        change = (row["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        print(f"  {row['endpoint']:<15} {row['transport']:<11} p95 {before['p95_ms']:>8} -> {row['p95_ms']:>8} ms ({change:+.1f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=0.01, help="dataset size; 1.0 = 100k customers / 5M items")
+    parser.add_argument("--database-url", help="benchmark an existing, already seeded database instead")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint and transport")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--server", action="store_true", help="also drive a real threaded HTTP server")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--compare", type=Path, help="print p95 changes against an earlier JSON result")
+    args = parser.parse_args()
+
+    output = args.output.resolve() if args.output else None
+    baseline = args.compare.resolve() if args.compare else None
+
+    # The engine reads DATABASE_URL at import time, so point it at the benchmark database first.
+    workdir = tempfile.mkdtemp(prefix="bench-api-")
+    os.chdir(workdir)
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(workdir) / 'bench.db'}"
+
+    from sqlalchemy import func, select
+    from werkzeug.serving import make_server
+
+    from app import create_app
+    from app.database import engine
+    from app.models import Customer, Order, Product
+
+    from .dataset import DatasetSize, populate
+
+    app = create_app()
+    size = DatasetSize.scaled(args.scale)
+    if not args.database_url:
+        started = time.perf_counter()
+        populate(engine, size, seed=args.seed)
+        print(f"seeded {size} in {time.perf_counter() - started:.1f}s")
+
+    with engine.connect() as conn:
+        customers = conn.execute(select(func.max(Customer.id))).scalar_one()
+        products = conn.execute(select(func.max(Product.id))).scalar_one()
+        open_orders = list(conn.execute(select(Order.id).where(Order.date_shipped.is_(None)).limit(args.requests * 2)).scalars())
+
+    rng = random.Random(args.seed)
+    rng.shuffle(open_orders)
+    counter = StatementCounter(engine)
+    transports: list[tuple[str, Callable[[Call], int], bool]] = [("test_client", test_client_sender(app.test_client()), True)]
+    server = None
+    if args.server:
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        transports.append(("http", http_sender(f"http://127.0.0.1:{server.server_port}"), False))
+
+    results: list[EndpointResult] = []
+    for transport, send, counted in transports:
+        ship_pool = open_orders[: args.requests] if transport == "test_client" else open_orders[args.requests :]
+        for endpoint in args.endpoints:
+            calls = plan_calls(endpoint, args.requests, customers, products, ship_pool, rng)
+            outcome = run_calls(calls, args.concurrency, send, counter if counted else None)
+            results.append(summarize(endpoint, transport, *outcome, counted=counted))
+    if server:
+        server.shutdown()
+
+    print(f"{'endpoint':<15} {'transport':<11} {'req':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'sql/req':>8}")
+    for r in results:
+        sql = "-" if r.statements_per_request is None else r.statements_per_request
+        print(
+            f"{r.endpoint:<15} {r.transport:<11} {r.requests:>6} {r.errors:>4} {r.throughput_rps:>8} "
+            f"{r.p50_ms:>8} {r.p95_ms:>8} {r.p99_ms:>8} {sql:>8}"
+        )
+
+    rows = [asdict(result) for result in results]
+    if output:
+        report = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "dataset": asdict(size) if not args.database_url else None,
+            "concurrency": args.concurrency,
+            "results": rows,
+        }
+        output.write_text(json.dumps(report, indent=2))
+        print(f"wrote {output}")
+    if baseline:
+        compare(rows, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Sync (gunicorn gthread + Flask) vs. async (uvicorn + Starlette/AsyncSession) API at high concurrency.
+
+Seeds one synthetic dataset and gives each stack its own copy, then starts each stack as a
+single-process server and drives it with the same asyncio load generator: ``--concurrency``
+clients, one request per connection, ``--requests`` calls per endpoint. ``--latency-ms`` adds
+a sleep before every SQL statement (``time.sleep`` in the sync worker, ``asyncio.sleep`` in the
+async one) to stand in for the network round trip to a remote database; SQLite answers in
+microseconds, which hides what a thread-per-request server spends waiting.
+
+    python -m benchmarks.async_stack --concurrency 256 --latency-ms 2
+    python -m benchmarks.async_stack --concurrency 256 --latency-ms 0 --threads 16
+
+Needs gunicorn, uvicorn, starlette, aiosqlite and greenlet.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from .api_load import Call, EndpointResult, plan_calls, summarize
+
+STACKS = ("sync", "async")
+ENDPOINTS = ("get_order", "list_orders", "list_customers", "create_order", "ship_order")
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+# -------- Servers (run in the child process) ---------
+def add_statement_latency(engine, sleep, seconds: float) -> None:
+    """Call ``sleep(seconds)`` before every statement ``engine`` executes."""
+    from sqlalchemy import event
+
+    event.listen(engine, "before_cursor_execute", lambda *_args: sleep(seconds))
+
+
+def serve_sync(port: int, threads: int, latency: float) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self) -> None:
+            options = {
+                "bind": f"127.0.0.1:{port}",
+                "workers": 1,
+                "threads": threads,
+                "worker_class": "gthread",
+                "backlog": 4096,
+                "timeout": 120,
+                "loglevel": "warning",
+                "accesslog": None,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Loaded in the worker after the fork, like ``preload_app = False`` in app.gunicorn_conf.
+            from app.database import engine
+            from app.wsgi import app
+
+            if latency:
+                add_statement_latency(engine, time.sleep, latency)
+            return app
+
+    Server().run()
+
+
+def serve_async(port: int, latency: float) -> None:
+    import uvicorn
+    from sqlalchemy.util import await_only
+
+    from app.asgi import app
+    from app.async_database import async_engine
+
+    if latency:
+        add_statement_latency(async_engine.sync_engine, lambda seconds: await_only(asyncio.sleep(seconds)), latency)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False, backlog=4096)
+
+
+# -------- Load generator ---------
+async def send(port: int, call: Call) -> int:
+    body = json.dumps(call.body).encode() if call.body is not None else b""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        head = (
+            f"{call.method} {call.path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nConnection: close\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        )
+        writer.write(head.encode("ascii") + body)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b" ", 2)[1]) if response else 599
+
+
+async def run_calls(port: int, calls: list[Call], concurrency: int) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+    pending = iter(calls)
+
+    async def client() -> None:
+        nonlocal errors
+        for call in pending:
+            started = time.perf_counter()
+            try:
+                status = await send(port, call)
+            except OSError:
+                status = 599
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += status >= 400
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(stack: str, database: Path, args: argparse.Namespace) -> tuple[subprocess.Popen, int]:
+    port = free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])),
+        "DATABASE_URL": f"sqlite:///{database}",
+        "DB_POOL_SIZE": str(args.pool_size),
+        "DB_MAX_OVERFLOW": "0",
+        "KAFKA_STORAGE_DIR": str(database.parent / f"{stack}-data"),
+    }
+    command = [sys.executable, "-m", "benchmarks.async_stack", "--serve", stack, "--port", str(port)]
+    command += ["--threads", str(args.threads), "--latency-ms", str(args.latency_ms)]
+    process = subprocess.Popen(command, env=env, cwd=database.parent)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{stack} server exited with status {process.returncode}")
+        try:
+            if asyncio.run(send(port, Call("GET", "/api/customers?limit=1"))) == 200:
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{stack} server did not start")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=0.01, help="dataset size; 1.0 = 100k customers / 5M items")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint and stack")
+    parser.add_argument("--concurrency", type=int, default=256, help="simultaneous client connections")
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads for the sync worker")
+    parser.add_argument("--pool-size", type=int, default=32, help="DB_POOL_SIZE for both stacks")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated database round trip per statement")
+    parser.add_argument("--stacks", nargs="+", choices=STACKS, default=list(STACKS))
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--serve", choices=STACKS, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve == "sync":
+        serve_sync(args.port, args.threads, args.latency_ms / 1000)
+        return
+    if args.serve == "async":
+        serve_async(args.port, args.latency_ms / 1000)
+        return
+
+    output = args.output.resolve() if args.output else None
+    workdir = Path(tempfile.mkdtemp(prefix="bench-async-"))
+    from sqlalchemy import create_engine, func, select
+
+    from app.database import Base
+    from app.models import Customer, Order, Product
+
+    from .dataset import DatasetSize, populate
+
+    seeded = workdir / "seed.db"
+    engine = create_engine(f"sqlite:///{seeded}")
+    Base.metadata.create_all(engine)
+    size = DatasetSize.scaled(args.scale)
+    started = time.perf_counter()
+    populate(engine, size, seed=args.seed)
+    with engine.connect() as conn:
+        customers = conn.execute(select(func.max(Customer.id))).scalar_one()
+        products = conn.execute(select(func.max(Product.id))).scalar_one()
+        open_orders = list(conn.execute(select(Order.id).where(Order.date_shipped.is_(None)).limit(args.requests)).scalars())
+    engine.dispose()
+    print(f"seeded {size} in {time.perf_counter() - started:.1f}s")
+
+    results: list[EndpointResult] = []
+    for stack in args.stacks:
+        database = workdir / f"{stack}.db"
+        shutil.copy(seeded, database)
+        # Both stacks replay the same calls against identical copies of the data.
+        rng = random.Random(args.seed)
+        ship_pool = list(open_orders)
+        rng.shuffle(ship_pool)
+        process, port = start_server(stack, database, args)
+        try:
+            for endpoint in args.endpoints:
+                calls = plan_calls(endpoint, args.requests, customers, products, ship_pool, rng)
+                latencies, errors, wall = asyncio.run(run_calls(port, calls, args.concurrency))
+                results.append(summarize(endpoint, stack, latencies, errors, wall, [], counted=False))
+        finally:
+            stop_server(process)
+
+    print(
+        f"\nconcurrency {args.concurrency}, {args.threads} sync threads, "
+        f"{args.latency_ms:g} ms simulated latency per statement"
+    )
+    print(f"{'endpoint':<15} {'stack':<6} {'req':>6} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for r in results:
+        print(
+            f"{r.endpoint:<15} {r.transport:<6} {r.requests:>6} {r.errors:>5} {r.throughput_rps:>8} "
+            f"{r.p50_ms:>8} {r.p95_ms:>8} {r.p99_ms:>8}"
+        )
+    by_key = {(r.endpoint, r.transport): r for r in results}
+    for endpoint in args.endpoints:
+        sync, async_ = by_key.get((endpoint, "sync")), by_key.get((endpoint, "async"))
+        if sync and async_ and sync.throughput_rps:
+            print(f"  {endpoint:<15} async/sync throughput {async_.throughput_rps / sync.throughput_rps:.2f}x")
+
+    if output:
+        report: dict[str, Any] = {
+            "dataset": asdict(size),
+            "concurrency": args.concurrency,
+            "threads": args.threads,
+            "latency_ms": args.latency_ms,
+            "results": [asdict(result) for result in results],
+        }
+        output.write_text(json.dumps(report, indent=2))
+        print(f"wrote {output}")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
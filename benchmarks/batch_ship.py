@@ -0,0 +1,93 @@
+"""Ship a batch of open orders one ``ship_order`` call at a time vs. one ``ship_orders`` call.
+
+Builds a throwaway SQLite dataset, then ships the same ``--batch`` open orders on two identical
+copies of it, reporting wall time, SQL statements and the outbox events written by each path.
+
+    python -m benchmarks.batch_ship --orders 100000 --batch 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Order, OutboxEvent
+from app.services import CreditService, FakeProducer, KafkaService, OrderService
+
+from .dataset import DatasetSize, populate
+
+
+def measure(database: Path, work: Callable[[OrderService, list[int]], None], order_ids: list[int]) -> dict[str, Any]:
+    engine = create_engine(f"sqlite:///{database}")
+    statements = 0
+
+    def count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    with Session(engine) as session:
+        # Events only go to the outbox; the producer is never called.
+        service = OrderService(session, CreditService(session), KafkaService("order_shipping", producer=FakeProducer()))
+        event.listen(engine, "before_cursor_execute", count)
+        started = time.perf_counter()
+        work(service, order_ids)
+        session.commit()
+        elapsed = time.perf_counter() - started
+        event.remove(engine, "before_cursor_execute", count)
+        events = session.execute(select(func.count()).select_from(OutboxEvent)).scalar_one()
+    engine.dispose()
+    return {"seconds": round(elapsed, 4), "statements": statements, "events": events}
+
+
+def ship_each(service: OrderService, order_ids: list[int]) -> None:
+    for order_id in order_ids:
+        service.ship_order(order_id)
+
+
+def ship_batch(service: OrderService, order_ids: list[int]) -> None:
+    service.ship_orders(order_ids)
+
+
+def run(orders: int, batch: int, seed: int) -> list[dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as workdir:
+        seeded = Path(workdir) / "seed.db"
+        engine = create_engine(f"sqlite:///{seeded}")
+        Base.metadata.create_all(engine)
+        populate(engine, DatasetSize(customers=max(orders // 100, 1), products=500, orders=orders), seed)
+        with engine.connect() as conn:
+            open_ids = list(conn.scalars(select(Order.id).where(Order.date_shipped.is_(None))))
+        engine.dispose()
+        order_ids = random.Random(seed).sample(open_ids, min(batch, len(open_ids)))
+
+        results = []
+        for strategy, work in (("ship_order x N (before)", ship_each), ("ship_orders (after)", ship_batch)):
+            database = Path(workdir) / f"{work.__name__}.db"
+            shutil.copy(seeded, database)
+            results.append({"strategy": strategy, "orders": len(order_ids), **measure(database, work, order_ids)})
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=5000, help="open orders to ship")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = run(args.orders, args.batch, args.seed)
+    print(f"{'strategy':<24} {'orders':>7} {'seconds':>9} {'statements':>10} {'events':>7}")
+    for row in results:
+        print(f"{row['strategy']:<24} {row['orders']:>7} {row['seconds']:>9} {row['statements']:>10} {row['events']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Concurrent order placement against one customer's credit limit: correctness and throughput.
+
+A thread pool places orders for the same customer until the credit limit is exhausted. The
+"guarded" strategy is the current ``OrderService.create_order`` (locked or version-checked credit
+reservation with retries). The "unguarded" strategy replays the former check-then-write flow for
+comparison. After each run the customer's balance must equal its open order total and stay within
+the credit limit; the command exits non-zero if the guarded strategy breaks either invariant.
+
+    python -m benchmarks.credit_contention --threads 16 --orders 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+
+from .api_load import percentile
+
+PRICE = Decimal("10.00")
+
+
+def run(strategy: str, database_url: str, threads: int, orders: int, customers: int) -> bool:
+    from sqlalchemy import func, select
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import Session, sessionmaker
+
+    from app.database import Base, _create_engine
+    from app.models import Customer, Order, Product
+    from app.services import (
+        ConcurrentUpdateError,
+        CreditLimitExceededError,
+        CreditService,
+        OrderService,
+    )
+
+    class UnguardedOrderService(OrderService):
+        """The pre-reservation flow: read the balance, check it, then write."""
+
+        def _reserve_credit(self, customer_id: int, amount: Decimal) -> None:
+            self.credit_service.ensure_credit(customer_id, amount)
+            self.credit_service.adjust_balance(customer_id, amount)
+
+    service_class = OrderService if strategy == "guarded" else UnguardedOrderService
+    engine = _create_engine(database_url)
+    Base.metadata.create_all(engine)
+    # Same session settings as app.database.SessionLocal.
+    session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    # Room for half of the attempted orders, so roughly half must be rejected.
+    credit_limit = PRICE * orders / 2 / customers
+    with Session(engine) as session:
+        session.add_all(
+            Customer(name=f"Contended {i}", email=f"contended{i}@bench.example", credit_limit=credit_limit)
+            for i in range(customers)
+        )
+        session.add(Product(sku="CONTENDED", name="Contended product", unit_price=PRICE))
+        session.commit()
+        customer_ids = session.scalars(select(Customer.id).order_by(Customer.id)).all()
+        product_id = session.scalars(select(Product.id)).one()
+
+    def place(index: int) -> tuple[str, float]:
+        started = time.perf_counter()
+        with session_factory() as session:
+            service = service_class(session, CreditService(session))
+            try:
+                service.create_order(customer_ids[index % customers], [{"product_id": product_id, "quantity": 1}])
+                session.commit()
+                outcome = "accepted"
+            except CreditLimitExceededError:
+                session.rollback()
+                outcome = "rejected"
+            except ConcurrentUpdateError:
+                session.rollback()
+                outcome = "conflict"
+            except OperationalError:
+                session.rollback()
+                outcome = "db error"
+        return outcome, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(place, range(orders)))
+    elapsed = time.perf_counter() - started
+    outcomes = Counter(outcome for outcome, _ in results)
+    latencies = [latency for _, latency in results]
+
+    with Session(engine) as session:
+        rows = session.execute(select(Customer.id, Customer.balance, Customer.credit_limit)).all()
+        open_totals = dict(
+            session.execute(
+                select(Order.customer_id, func.sum(Order.amount_total))
+                .where(Order.date_shipped.is_(None))
+                .group_by(Order.customer_id)
+            ).all()
+        )
+    engine.dispose()
+    consistent = all(balance == (open_totals.get(customer_id) or 0) for customer_id, balance, _ in rows)
+    within_limit = all(balance <= limit for _, balance, limit in rows)
+    overdrawn = sum(max(balance - limit, 0) for _, balance, limit in rows)
+
+    print(
+        f"{strategy:<10} {orders / elapsed:>9.0f} {percentile(latencies, 95):>9.2f} "
+        f"{outcomes['accepted']:>9} {outcomes['rejected']:>9} {outcomes['conflict']:>9} {outcomes['db error']:>9} "
+        f"{'yes' if consistent else 'NO':>11} {overdrawn:>10}"
+    )
+    return consistent and within_limit
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--orders", type=int, default=2000, help="orders attempted per strategy")
+    parser.add_argument("--customers", type=int, default=1, help="spread the orders across this many customers")
+    parser.add_argument("--strategy", choices=("guarded", "unguarded", "both"), default="both")
+    args = parser.parse_args()
+
+    # The engine reads DATABASE_URL at import time, so point it at a scratch directory first.
+    workdir = Path(tempfile.mkdtemp(prefix="bench-credit-"))
+    os.chdir(workdir)
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'unused.db'}"
+
+    strategies = ("unguarded", "guarded") if args.strategy == "both" else (args.strategy,)
+    print(
+        f"{'strategy':<10} {'orders/s':>9} {'p95 ms':>9} {'accepted':>9} {'rejected':>9} {'conflict':>9} "
+        f"{'db error':>9} {'consistent':>11} {'overdrawn':>10}"
+    )
+    ok = {}
+    for strategy in strategies:
+        database_url = f"sqlite:///{workdir / f'{strategy}.db'}"
+        ok[strategy] = run(strategy, database_url, args.threads, args.orders, args.customers)
+    if not ok.get("guarded", True):
+        sys.exit("guarded order placement violated the credit invariant")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Synthetic dataset shared by the benchmarks; rows come from the ``scripts.seed`` generator."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import Customer
+from app.services.credit_summary import CreditSummaryService
+from scripts.seed import SeedConfig, generate
+
+
+@dataclass
+class DatasetSize:
+    customers: int
+    products: int
+    orders: int
+    items_per_order: int = 5
+    shipped_ratio: float = 0.5
+
+    @classmethod
+    def scaled(cls, scale: float) -> "DatasetSize":
+        """``scale=1`` is 100k customers, 10k products and 1M orders with 5 items each (5M items)."""
+        return cls(
+            customers=max(int(100_000 * scale), 1),
+            products=max(int(10_000 * scale), 1),
+            orders=max(int(1_000_000 * scale), 1),
+        )
+
+
+def populate(engine: Engine, size: DatasetSize, seed: int = 42, chunk: int = 10_000, workers: int = 1) -> None:
+    """Insert a reproducible dataset with consistent item amounts, order totals and customer balances."""
+    config = SeedConfig(
+        customers=size.customers,
+        products=size.products,
+        orders=size.orders,
+        items_per_order=f"fixed:{size.items_per_order}",
+        shipped_ratio=size.shipped_ratio,
+        seed=seed,
+        chunk_size=chunk,
+        workers=workers,
+    )
+    generate(engine, config)
+    # Benchmarks place orders freely, so keep the credit check out of the measurements.
+    with Session(engine) as session, session.begin():
+        session.execute(update(Customer.__table__).values(credit_limit=Decimal("100000000")))
+        CreditSummaryService(session).rebuild()
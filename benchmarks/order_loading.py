@@ -0,0 +1,124 @@
+"""Compare the former joined-eager order loading with the OrderService load plans.
+
+Builds a throwaway SQLite dataset, then times the orders list page and the order detail page
+under both strategies and reports wall time plus the number of rows the database returned.
+
+    python -m benchmarks.order_loading --orders 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, joinedload
+
+from app.database import Base
+from app.models import Order, OrderItem
+from app.services import CreditService, OrderService
+
+from .dataset import DatasetSize, populate
+
+# The loader configuration Order/OrderItem used to declare with lazy="joined".
+LEGACY_JOINED = (joinedload(Order.customer), joinedload(Order.items).joinedload(OrderItem.product))
+
+
+class StatementRecorder:
+    """Capture every SELECT issued on an engine so its result size can be measured afterwards."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: list[tuple[str, Any]] = []
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append((statement, parameters))
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+    def rows_fetched(self) -> int:
+        captured = list(self.statements)
+        total = 0
+        with self.engine.connect() as conn:
+            for statement, parameters in captured:
+                total += conn.exec_driver_sql(f"SELECT count(*) FROM ({statement})", parameters).scalar_one()
+        self.reset()
+        return total
+
+
+def measure(engine: Engine, recorder: StatementRecorder, work: Callable[[Session], None]) -> dict[str, float]:
+    recorder.reset()
+    with Session(engine) as session:
+        started = time.perf_counter()
+        work(session)
+        elapsed = time.perf_counter() - started
+    statements = len(recorder.statements)
+    return {"seconds": round(elapsed, 4), "statements": statements, "rows": recorder.rows_fetched()}
+
+
+def run(orders: int, items_per_order: int, detail_lookups: int, seed: int) -> list[dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_engine(f"sqlite:///{Path(workdir) / 'bench.db'}")
+        Base.metadata.create_all(engine)
+        size = DatasetSize(customers=max(orders // 100, 1), products=500, orders=orders, items_per_order=items_per_order)
+        populate(engine, size, seed)
+        recorder = StatementRecorder(engine)
+        rng = random.Random(seed)
+        detail_ids = [rng.randint(1, orders) for _ in range(detail_lookups)]
+
+        def legacy_list(session: Session) -> None:
+            query = select(Order).order_by(Order.date_created.desc(), Order.id.desc()).options(*LEGACY_JOINED)
+            [order.customer.name for order in session.scalars(query).unique()]
+
+        def planned_list(session: Session) -> None:
+            [order.customer.name for order in OrderService(session, CreditService(session)).list_orders()]
+
+        def legacy_detail(session: Session) -> None:
+            for order_id in detail_ids:
+                query = select(Order).where(Order.id == order_id).options(*LEGACY_JOINED)
+                order = session.scalars(query).unique().one()
+                [item.product.name for item in order.items]
+                session.expunge_all()
+
+        def planned_detail(session: Session) -> None:
+            service = OrderService(session, CreditService(session))
+            for order_id in detail_ids:
+                order = service.get_order(order_id, load="full")
+                [item.product.name for item in order.items]
+                session.expunge_all()
+
+        results = []
+        for scenario, legacy, planned in (
+            ("orders list page", legacy_list, planned_list),
+            (f"order detail x{detail_lookups}", legacy_detail, planned_detail),
+        ):
+            results.append({"scenario": scenario, "strategy": "joined (before)", **measure(engine, recorder, legacy)})
+            results.append({"scenario": scenario, "strategy": "load plan (after)", **measure(engine, recorder, planned)})
+        engine.dispose()
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--items-per-order", type=int, default=5)
+    parser.add_argument("--detail-lookups", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = run(args.orders, args.items_per_order, args.detail_lookups, args.seed)
+    print(f"{'scenario':<22} {'strategy':<18} {'seconds':>9} {'statements':>10} {'rows':>10}")
+    for row in results:
+        print(f"{row['scenario']:<22} {row['strategy']:<18} {row['seconds']:>9} {row['statements']:>10} {row['rows']:>10}")
+
+
+if __name__ == "__main__":
+    main()
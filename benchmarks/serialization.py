@@ -0,0 +1,148 @@
+"""Time the orders list payload: fetching, building dicts and encoding JSON.
+
+Builds a throwaway SQLite dataset, then serializes every order (with its items) under the former
+path (ORM objects, per-field string formatting, Flask's default ``jsonify`` encoder) and under
+the combinations of ORM objects or Core rows with the stdlib or orjson encoder of
+``FastJSONProvider``. Each strategy runs ``--repeat`` times and the fastest run is reported.
+
+    python -m benchmarks.serialization --orders 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.api import _serialize_order, _serialize_order_row
+from app.database import Base
+from app.json_provider import FastJSONProvider, orjson
+from app.models import Order
+from app.services import CreditService, OrderService
+
+from .dataset import DatasetSize, populate
+
+
+def _legacy_decimal(value: Decimal | None) -> str | None:
+    return format(value, "f") if value is not None else None
+
+
+def legacy_serialize(order: Order) -> dict[str, Any]:
+    """The payload builder the API used before the JSON provider handled decimals and datetimes."""
+    return {
+        "id": order.id,
+        "customer_id": order.customer_id,
+        "amount_total": _legacy_decimal(order.amount_total),
+        "notes": order.notes,
+        "date_created": order.date_created.isoformat() if order.date_created else None,
+        "date_shipped": order.date_shipped.isoformat() if order.date_shipped else None,
+        "items": [
+            {
+                "id": item.id,
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "unit_price": _legacy_decimal(item.unit_price),
+                "amount": _legacy_decimal(item.amount),
+            }
+            for item in order.items
+        ],
+    }
+
+
+def measure(
+    session: Session, fetch: Callable[[OrderService], list], build: Callable[[Any], dict], encode: Callable[[Any], Any]
+) -> dict[str, Any]:
+    service = OrderService(session, CreditService(session))
+    started = time.perf_counter()
+    records = fetch(service)
+    fetched = time.perf_counter()
+    payload = [build(record) for record in records]
+    built = time.perf_counter()
+    body = encode(payload)
+    encoded = time.perf_counter()
+    session.expunge_all()
+    return {
+        "fetch_ms": (fetched - started) * 1000,
+        "build_ms": (built - fetched) * 1000,
+        "encode_ms": (encoded - built) * 1000,
+        "total_ms": (encoded - started) * 1000,
+        "bytes": len(body),
+    }
+
+
+def run(orders: int, items_per_order: int, repeat: int, seed: int) -> list[dict[str, Any]]:
+    flask_app = Flask(__name__)
+    default_json = DefaultJSONProvider(flask_app)
+    stdlib_json = FastJSONProvider(flask_app, encoder="stdlib")
+    fast_json = FastJSONProvider(flask_app)
+
+    def orm_orders(service: OrderService) -> list:
+        return list(service.list_orders(load="items"))
+
+    def order_rows(service: OrderService) -> list:
+        return service.list_order_rows()
+
+    def row_payload(record: tuple) -> dict:
+        return _serialize_order_row(*record)
+
+    # Encoding goes through ``response`` (what ``jsonify`` calls) so every strategy pays for the same
+    # Response object and compact separators.
+    def encoder(provider) -> Callable[[Any], bytes]:
+        return lambda payload: provider.response(payload).get_data()
+
+    strategies = [
+        ("orm + jsonify (before)", orm_orders, legacy_serialize, encoder(default_json)),
+        ("orm + stdlib", orm_orders, _serialize_order, encoder(stdlib_json)),
+        ("rows + stdlib", order_rows, row_payload, encoder(stdlib_json)),
+    ]
+    if orjson is not None:
+        strategies += [
+            ("orm + orjson", orm_orders, _serialize_order, encoder(fast_json)),
+            ("rows + orjson (after)", order_rows, row_payload, encoder(fast_json)),
+        ]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_engine(f"sqlite:///{Path(workdir) / 'bench.db'}")
+        Base.metadata.create_all(engine)
+        size = DatasetSize(customers=max(orders // 100, 1), products=500, orders=orders, items_per_order=items_per_order)
+        populate(engine, size, seed)
+
+        results = []
+        with Session(engine) as session:
+            for name, fetch, build, encode in strategies:
+                runs = [measure(session, fetch, build, encode) for _ in range(repeat)]
+                results.append({"strategy": name, **min(runs, key=lambda result: result["total_ms"])})
+        engine.dispose()
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--items-per-order", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = run(args.orders, args.items_per_order, args.repeat, args.seed)
+    if orjson is None:
+        print("orjson is not installed; only the standard library encoder is measured")
+    baseline = results[0]["total_ms"]
+    print(f"{'strategy':<24} {'fetch ms':>9} {'build ms':>9} {'encode ms':>10} {'total ms':>9} {'speedup':>8} {'bytes':>10}")
+    for row in results:
+        print(
+            f"{row['strategy']:<24} {row['fetch_ms']:>9.1f} {row['build_ms']:>9.1f} {row['encode_ms']:>10.1f} "
+            f"{row['total_ms']:>9.1f} {baseline / row['total_ms']:>7.1f}x {row['bytes']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
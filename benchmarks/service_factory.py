@@ -0,0 +1,85 @@
+"""Per-request cost of building services: rebuilt every request vs. bound from the ServiceRegistry.
+
+Times the factories in isolation, then drives GET /api/customers through the Flask test client
+from a thread pool with each factory installed and reports requests per second.
+
+    python -m benchmarks.service_factory --requests 5000 --threads 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+
+def rebuilt_factory(session: Session):
+    """The factory api/web used before the registry, including the per-instance storage mkdir."""
+    from app.services import CreditService, KafkaService, OrderService
+
+    kafka = KafkaService(topic="order_shipping")
+    kafka.storage_dir.mkdir(parents=True, exist_ok=True)
+    return OrderService(session, CreditService(session), kafka)
+
+
+def drive(client, requests: int, threads: int) -> float:
+    def hit(_: int) -> int:
+        return client.get("/api/customers?limit=1").status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        statuses = list(pool.map(hit, range(requests)))
+    elapsed = time.perf_counter() - started
+    assert all(status == 200 for status in statuses), "benchmark requests failed"
+    return requests / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--factory-calls", type=int, default=50_000)
+    args = parser.parse_args()
+
+    # The engine reads DATABASE_URL at import time, so point it at a scratch database first.
+    workdir = tempfile.mkdtemp(prefix="bench-services-")
+    os.chdir(workdir)
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(workdir) / 'bench.db'}"
+
+    from app import api, create_app
+    from app.container import get_services
+    from app.services import OrderService
+
+    app = create_app()
+    client = app.test_client()
+    client.post("/api/orders", json={})  # warm up routing and the engine
+
+    with app.app_context():
+        registry = get_services()
+        factories: dict[str, Callable[[Session], OrderService]] = {
+            "rebuilt per request": rebuilt_factory,
+            "service registry": registry.order_service,
+        }
+        session = Session()
+        print(f"{'factory':<22} {'us/call':>9} {'req/s':>9}")
+        for name, factory in factories.items():
+            per_call = timeit.timeit(lambda: factory(session), number=args.factory_calls) / args.factory_calls
+            original = api._service_factory
+            api._service_factory = factory
+            try:
+                throughput = drive(client, args.requests, args.threads)
+            finally:
+                api._service_factory = original
+            print(f"{name:<22} {per_call * 1e6:>9.2f} {throughput:>9.0f}")
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Bring a database created before the migrations up to the schema the services rely on.
+
+On an empty database it first creates the prototype's ``customers``, ``products``, ``orders``
+and ``order_items`` tables, so ``alembic upgrade head`` also builds a fresh database. It then
+adds the maintained ``customers.balance`` (backfilled from open orders), the ``customers.version``
+and ``orders.version`` row versions, and the ``outbox`` and ``table_versions`` tables. Columns
+and tables that already exist (databases created by ``init_db()``) are left unchanged.
+
+Revision ID: 0000_baseline_schema
+Revises:
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0000_baseline_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _columns(table: str) -> set[str]:
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _create_prototype_tables() -> None:
+    """The tables as the prototype's ``init_db()`` created them, for databases that have none yet."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if "customers" not in existing:
+        op.create_table(
+            "customers",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("email", sa.String(255), nullable=False, unique=True),
+            sa.Column("credit_limit", sa.Numeric(12, 2), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+    if "products" not in existing:
+        op.create_table(
+            "products",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("sku", sa.String(64), nullable=False, unique=True),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("unit_price", sa.Numeric(12, 2), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+    if "orders" not in existing:
+        op.create_table(
+            "orders",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("customer_id", sa.Integer(), sa.ForeignKey("customers.id"), nullable=False),
+            sa.Column("amount_total", sa.Numeric(12, 2), nullable=False),
+            sa.Column("notes", sa.Text()),
+            sa.Column("date_created", sa.DateTime(), nullable=False),
+            sa.Column("date_shipped", sa.DateTime()),
+        )
+    if "order_items" not in existing:
+        op.create_table(
+            "order_items",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id"), nullable=False),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+            sa.Column("quantity", sa.Integer(), nullable=False),
+            sa.Column("unit_price", sa.Numeric(12, 2), nullable=False),
+            sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        )
+
+
+def upgrade() -> None:
+    _create_prototype_tables()
+    customers = _columns("customers")
+    if "balance" not in customers:
+        with op.batch_alter_table("customers") as batch:
+            batch.add_column(sa.Column("balance", sa.Numeric(12, 2), server_default="0", nullable=False))
+        op.execute(
+            "UPDATE customers SET balance = ("
+            "SELECT COALESCE(SUM(orders.amount_total), 0) FROM orders "
+            "WHERE orders.customer_id = customers.id AND orders.date_shipped IS NULL)"
+        )
+    if "version" not in customers:
+        with op.batch_alter_table("customers") as batch:
+            batch.add_column(sa.Column("version", sa.Integer(), server_default="0", nullable=False))
+    if "version" not in _columns("orders"):
+        with op.batch_alter_table("orders") as batch:
+            batch.add_column(sa.Column("version", sa.Integer(), server_default="0", nullable=False))
+
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("table_versions"):
+        op.create_table(
+            "table_versions",
+            sa.Column("name", sa.String(64), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False),
+        )
+    if not inspector.has_table("outbox"):
+        op.create_table(
+            "outbox",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("topic", sa.String(255), nullable=False),
+            sa.Column("payload", sa.JSON(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("sent_at", sa.DateTime()),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("last_error", sa.Text()),
+        )
+
+
+def downgrade() -> None:
+    # The prototype tables are kept: they may predate this migration and hold the only copy of the data.
+    op.drop_table("outbox")
+    op.drop_table("table_versions")
+    with op.batch_alter_table("orders") as batch:
+        batch.drop_column("version")
+    with op.batch_alter_table("customers") as batch:
+        batch.drop_column("version")
+        batch.drop_column("balance")
@@ -0,0 +1,53 @@
+"""Add indexes for the order listing, open-order and product listing predicates.
+
+Databases created by ``init_db()`` already have these indexes (they are declared on the
+models), so each one is created only if it is missing and ``upgrade`` is safe on both.
+
+Revision ID: 0001_query_indexes
+Revises: 0000_baseline_schema
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_query_indexes"
+down_revision = "0000_baseline_schema"
+branch_labels = None
+depends_on = None
+
+OPEN_ORDERS = sa.text("date_shipped IS NULL")
+
+# (name, table, columns, dialect options)
+INDEXES = (
+    ("ix_orders_created", "orders", ["date_created", "id"], {}),
+    ("ix_orders_customer_created", "orders", ["customer_id", "date_created", "id"], {}),
+    # Partial on SQLite and PostgreSQL; other dialects ignore the predicate and index every row.
+    (
+        "ix_orders_open_customer",
+        "orders",
+        ["customer_id", "amount_total"],
+        {"sqlite_where": OPEN_ORDERS, "postgresql_where": OPEN_ORDERS},
+    ),
+    ("ix_order_items_order_id", "order_items", ["order_id"], {}),
+    ("ix_order_items_product_id", "order_items", ["product_id"], {}),
+    ("ix_products_active_name", "products", ["is_active", "name"], {}),
+)
+
+
+def _existing(table: str) -> set[str]:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns, options in INDEXES:
+        if name not in _existing(table):
+            op.create_index(name, table, columns, **options)
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        if name in _existing(table):
+            op.drop_index(name, table_name=table)
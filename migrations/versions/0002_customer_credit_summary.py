@@ -0,0 +1,40 @@
+"""Add the customer_credit_summary table.
+
+The table is created empty; fill it with ``python -m scripts.rebuild_credit_summary``.
+Databases on which ``init_db()`` already created it are left unchanged.
+
+Revision ID: 0002_customer_credit_summary
+Revises: 0001_query_indexes
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_customer_credit_summary"
+down_revision = "0001_query_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("customer_credit_summary"):
+        return
+    op.create_table(
+        "customer_credit_summary",
+        sa.Column("customer_id", sa.Integer(), sa.ForeignKey("customers.id"), primary_key=True),
+        sa.Column("credit_limit", sa.Numeric(12, 2), nullable=False),
+        sa.Column("open_balance", sa.Numeric(12, 2), nullable=False),
+        sa.Column("open_orders", sa.Integer(), nullable=False),
+        sa.Column("oldest_open_order_at", sa.DateTime()),
+        sa.Column("utilisation", sa.Float()),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_customer_credit_summary_utilisation", "customer_credit_summary", ["utilisation"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_customer_credit_summary_utilisation", table_name="customer_credit_summary")
+    op.drop_table("customer_credit_summary")
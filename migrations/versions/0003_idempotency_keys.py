@@ -0,0 +1,38 @@
+"""Add the idempotency_keys table.
+
+Databases on which ``init_db()`` already created it are left unchanged.
+
+Revision ID: 0003_idempotency_keys
+Revises: 0002_customer_credit_summary
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_idempotency_keys"
+down_revision = "0002_customer_credit_summary"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("idempotency_keys"):
+        return
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("status_code", sa.Integer()),
+        sa.Column("response_body", sa.LargeBinary()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_expires_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
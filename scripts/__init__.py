@@ -0,0 +1 @@
+"""Operational command-line scripts; run them with ``python -m scripts.<name>``."""
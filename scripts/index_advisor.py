@@ -0,0 +1,163 @@
+"""Replay the SQL captured by ``SQL_QUERY_LOG`` through the database's query planner and report full table scans.
+
+Capture a log by running the app (or a benchmark) with ``SQL_QUERY_LOG=queries.jsonl``, then:
+
+    python -m scripts.index_advisor queries.jsonl --database-url sqlite:///app.db
+
+Each distinct statement is explained with its captured parameters (``EXPLAIN QUERY PLAN`` on
+SQLite, ``EXPLAIN`` elsewhere). Statements whose plan reads a whole table are listed with the
+table's row count and the plan, largest tables first.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+@dataclass
+class PlanReport:
+    statement: str
+    plan: list[str] = field(default_factory=list)
+    scans: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+def load_log(path: str) -> list[tuple[str, Any]]:
+    """Distinct statements in the order first seen, each with the first parameters captured for it."""
+    entries: dict[str, Any] = {}
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            entries.setdefault(record["statement"], record.get("parameters"))
+    return list(entries.items())
+
+
+def explain(conn: Connection, statement: str, parameters: Any) -> list[str]:
+    if isinstance(parameters, list):
+        parameters = tuple(parameters)
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters or ())]
+    result = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters or ())
+    if dialect == "mysql":
+        return [f"{row['table']}: type={row['type']} key={row['key']}" for row in result.mappings()]
+    return [row[0] for row in result]
+
+
+def full_scans(dialect: str, plan: list[str], statement: str = "") -> list[str]:
+    words = f" {' '.join(statement.upper().split())} "
+    if (
+        dialect == "sqlite"
+        and " LIMIT " in words
+        and " WHERE " not in words
+        and not any("TEMP B-TREE" in line for line in plan)
+    ):
+        # An unfiltered scan that already yields rows in ORDER BY order stops after LIMIT rows.
+        return []
+    tables = []
+    for line in plan:
+        if dialect == "sqlite":
+            match = _SQLITE_SCAN.match(line.strip())
+        elif dialect == "mysql":
+            match = re.match(r"^(\w+): type=ALL\b", line)
+        else:
+            match = _POSTGRES_SCAN.search(line)
+        if match:
+            tables.append(match.group(1))
+    return tables
+
+
+def analyse(conn: Connection, entries: Iterable[tuple[str, Any]]) -> list[PlanReport]:
+    reports = []
+    for statement, parameters in entries:
+        report = PlanReport(statement)
+        try:
+            report.plan = explain(conn, statement, parameters)
+        except Exception as exc:  # statements for tables or columns this database does not have
+            conn.rollback()
+            report.error = str(exc).splitlines()[0]
+        else:
+            report.scans = full_scans(conn.dialect.name, report.plan, statement)
+        reports.append(report)
+    return reports
+
+
+def row_counts(conn: Connection, tables: Iterable[str]) -> dict[str, int]:
+    counts = {}
+    for table in sorted(set(tables)):
+        try:
+            counts[table] = conn.execute(text(f'SELECT count(*) FROM "{table}"')).scalar_one()
+        except Exception:
+            conn.rollback()
+            counts[table] = -1
+    return counts
+
+
+def _oneline(statement: str, width: int = 160) -> str:
+    collapsed = " ".join(statement.split())
+    return collapsed if len(collapsed) <= width else collapsed[: width - 3] + "..."
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log", help="JSON Lines file written by SQL_QUERY_LOG")
+    parser.add_argument("--database-url", default=None, help="database to explain against (default: DATABASE_URL)")
+    parser.add_argument("--min-rows", type=int, default=0, help="ignore scans of tables with fewer rows")
+    parser.add_argument("--verbose", action="store_true", help="print the plan of every statement")
+    parser.add_argument("--strict", action="store_true", help="exit non-zero when a full scan is reported")
+    args = parser.parse_args()
+
+    if args.database_url is None:
+        from app.database import DATABASE_URL
+
+        args.database_url = DATABASE_URL
+    engine = create_engine(args.database_url)
+    entries = load_log(args.log)
+    with engine.connect() as conn:
+        reports = analyse(conn, entries)
+        counts = row_counts(conn, (table for report in reports for table in report.scans))
+    engine.dispose()
+
+    flagged = []
+    for report in reports:
+        scans = [table for table in report.scans if counts.get(table, 0) >= args.min_rows]
+        if scans:
+            flagged.append((max(counts.get(table, 0) for table in scans), scans, report))
+    flagged.sort(key=lambda entry: entry[0], reverse=True)
+
+    for _, scans, report in flagged:
+        tables = ", ".join(f"{table} ({counts[table]} rows)" for table in scans)
+        print(f"FULL SCAN of {tables}\n  {_oneline(report.statement)}")
+        for line in report.plan:
+            print(f"    {line}")
+    if args.verbose:
+        for report in reports:
+            if not report.scans and report.error is None:
+                print(f"ok\n  {_oneline(report.statement)}")
+                for line in report.plan:
+                    print(f"    {line}")
+    for report in reports:
+        if report.error is not None:
+            print(f"NOT EXPLAINED: {report.error}\n  {_oneline(report.statement)}")
+
+    errors = sum(report.error is not None for report in reports)
+    print(f"\n{len(reports)} statements, {len(flagged)} with full scans, {errors} not explained")
+    if args.strict and flagged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import argparse
+import logging
+
+from app.container import ServiceRegistry
+from app.database import db_session, init_db
+from app.services.outbox import MAX_ATTEMPTS, OutboxRelay
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Publish committed outbox events to Kafka (or the file fallback).")
+    parser.add_argument("--batch-size", type=int, default=500, help="events claimed per poll")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds to sleep when the outbox is drained")
+    parser.add_argument("--max-per-second", type=float, default=None, help="throttle the average publish rate")
+    parser.add_argument(
+        "--max-attempts", type=int, default=MAX_ATTEMPTS, help="failed deliveries before an event is parked"
+    )
+    parser.add_argument("--once", action="store_true", help="relay a single batch and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    # Same publisher settings as the web app (KAFKA_STORAGE_DIR), so both use one topic log.
+    services = ServiceRegistry.from_env()
+    relay = OutboxRelay(
+        db_session,
+        publisher_for=services.relay_publisher,
+        batch_size=args.batch_size,
+        max_per_second=args.max_per_second,
+        max_attempts=args.max_attempts,
+    )
+    try:
+        if args.once:
+            print(f"Relayed {relay.run_once()} events")
+        else:
+            relay.run_forever(poll_interval=args.poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        relay.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import argparse
+
+from app.database import db_session, init_db
+from app.services.idempotency import IdempotencyService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete expired Idempotency-Key responses.")
+    parser.parse_args()
+
+    init_db()
+    with db_session() as session:
+        purged = IdempotencyService(session).purge_expired()
+    print(f"Purged {purged} expired idempotency keys")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.database import db_session, init_db
+from app.services.credit_summary import CreditSummaryService
+from app.services.versions import CUSTOMERS, TableVersions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Recompute customer_credit_summary from open orders in one set-based statement."
+    )
+    parser.parse_args()
+
+    init_db()
+    started = time.perf_counter()
+    with db_session() as session:
+        rows = CreditSummaryService(session).rebuild()
+        TableVersions(session).bump(CUSTOMERS)
+    print(f"Rebuilt {rows} customer credit summaries in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
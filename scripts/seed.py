@@ -1,13 +1,36 @@
+"""Database seeding: the small demo dataset, or a scalable synthetic generator.
+
+    python -m scripts.seed                       # demo customers, products and two sample orders
+    python -m scripts.seed --customers 100000 --products 10000 --orders 2000000 \\
+        --items-per-order uniform:1-5 --workers 4 --seed 7
+
+The generator writes with chunked Core executemany inserts. Orders are produced in fixed-size
+shards, each with its own RNG derived from ``--seed`` and the shard number, so the dataset is
+identical for any ``--workers`` count. Item amounts, order totals, customer balances and credit
+limits are computed while generating, so the result is consistent without a reconcile pass.
+"""
+
 from __future__ import annotations
 
+import argparse
+import math
+import multiprocessing
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from decimal import Decimal
-from datetime import datetime
+from typing import Callable, Iterator
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, func, insert, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
 
-from app.database import db_session, init_db
+from app.database import Base, _create_engine, db_session, engine as default_engine, init_db
 from app.models import Customer, Order, OrderItem, Product
 from app.services.credit import CreditService
+from app.services.credit_summary import CreditSummaryService
+from app.services.versions import TRACKED_TABLES, TableVersions
 
 
 CUSTOMERS = [
@@ -22,7 +45,7 @@ PRODUCTS = [
 ]
 
 
-def main() -> None:
+def seed_demo() -> None:
     init_db()
     with db_session() as session:
         if session.execute(select(Customer)).first() is None:
@@ -62,9 +85,295 @@ def main() -> None:
             session.add(order)
 
         session.flush()
-        credit_service = CreditService(session)
-        for customer in session.execute(select(Customer)).scalars():
-            credit_service.balance(customer.id)  # Warm cache / ensure logic executes
+        CreditService(session).reconcile_balances()  # Seed rows bypass OrderService, so rebuild balances
+        CreditSummaryService(session).rebuild()
+        TableVersions(session).bump(*TRACKED_TABLES)
+
+
+# -------- Synthetic generator ---------
+@dataclass(frozen=True)
+class SeedConfig:
+    customers: int
+    products: int
+    orders: int
+    items_per_order: str = "uniform:1-5"
+    shipped_ratio: float = 0.5
+    seed: int = 42
+    chunk_size: int = 10_000
+    workers: int = 1
+
+    def check(self) -> None:
+        """Raise ValueError for sizes the generator cannot produce."""
+        if min(self.customers, self.products, self.orders) < 0:
+            raise ValueError("--customers, --products and --orders must not be negative")
+        if self.orders and not (self.customers and self.products):
+            raise ValueError("generating orders needs at least one customer and one product")
+        if self.chunk_size < 1 or self.workers < 1:
+            raise ValueError("--chunk-size and --workers must be at least 1")
+
+
+@dataclass
+class SeedStats:
+    customers: int = 0
+    products: int = 0
+    orders: int = 0
+    items: int = 0
+    seconds: float = 0.0
+
+
+def parse_distribution(spec: str) -> Callable[[random.Random], int]:
+    """``fixed:N``, ``uniform:A-B`` or ``poisson:MEAN`` (at least one item per order)."""
+    kind, _, value = spec.partition(":")
+    try:
+        if kind == "fixed":
+            count = int(value)
+            return lambda rng: count
+        if kind == "uniform":
+            low, high = (int(part) for part in value.split("-"))
+            return lambda rng: rng.randint(low, high)
+        if kind == "poisson":
+            mean = float(value)
+            limit = math.exp(-mean)
+
+            def poisson(rng: random.Random) -> int:
+                # Knuth's method; adequate for the small means used for basket sizes.
+                count, product = 0, rng.random()
+                while product > limit:
+                    count += 1
+                    product *= rng.random()
+                return max(count, 1)
+
+            return poisson
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"invalid item distribution {spec!r}; use fixed:N, uniform:A-B or poisson:MEAN")
+
+
+def _distribution_arg(spec: str) -> str:
+    parse_distribution(spec)
+    return spec
+
+
+def _cents(rng: random.Random) -> int:
+    return rng.randint(100, 10_000)
+
+
+def _product_prices(config: SeedConfig) -> list[int]:
+    rng = random.Random(f"{config.seed}:products")
+    return [_cents(rng) for _ in range(config.products)]
+
+
+@dataclass(frozen=True)
+class _Shard:
+    number: int
+    first_order_id: int
+    count: int
+    first_customer_id: int
+    first_product_id: int
+
+
+_worker_state: dict[str, object] = {}
+
+
+def _init_worker(config: SeedConfig, prices: list[int]) -> None:
+    _worker_state.update(config=config, prices=prices)
+
+
+def _generate_shard(shard: _Shard) -> tuple[list[dict], list[dict], dict[int, int]]:
+    config: SeedConfig = _worker_state["config"]  # type: ignore[assignment]
+    prices: list[int] = _worker_state["prices"]  # type: ignore[assignment]
+    rng = random.Random(f"{config.seed}:orders:{shard.number}")
+    item_count = parse_distribution(config.items_per_order)
+    epoch = datetime(2024, 1, 1)
+    orders, items, open_cents = [], [], {}
+    for order_id in range(shard.first_order_id, shard.first_order_id + shard.count):
+        total = 0
+        for _ in range(item_count(rng)):
+            product_index = rng.randrange(config.products)
+            quantity = rng.randint(1, 5)
+            amount = prices[product_index] * quantity
+            total += amount
+            items.append(
+                {
+                    "order_id": order_id,
+                    "product_id": shard.first_product_id + product_index,
+                    "quantity": quantity,
+                    "unit_price": Decimal(prices[product_index]).scaleb(-2),
+                    "amount": Decimal(amount).scaleb(-2),
+                }
+            )
+        customer_id = shard.first_customer_id + rng.randrange(config.customers)
+        created = epoch + timedelta(seconds=order_id * 30)
+        shipped = created + timedelta(hours=rng.randint(1, 72)) if rng.random() < config.shipped_ratio else None
+        if shipped is None:
+            open_cents[customer_id] = open_cents.get(customer_id, 0) + total
+        orders.append(
+            {
+                "id": order_id,
+                "customer_id": customer_id,
+                "amount_total": Decimal(total).scaleb(-2),
+                "date_created": created,
+                "date_shipped": shipped,
+            }
+        )
+    return orders, items, open_cents
+
+
+def _shards(config: SeedConfig, first_order_id: int, first_customer_id: int, first_product_id: int) -> list[_Shard]:
+    return [
+        _Shard(number, first_order_id + start, min(config.chunk_size, config.orders - start), first_customer_id, first_product_id)
+        for number, start in enumerate(range(0, config.orders, config.chunk_size))
+    ]
+
+
+def _chunks(start: int, stop: int, size: int) -> Iterator[range]:
+    for begin in range(start, stop, size):
+        yield range(begin, min(begin + size, stop))
+
+
+def generate(target: Engine, config: SeedConfig, progress: Callable[[str], None] | None = None) -> SeedStats:
+    """Append a synthetic dataset to ``target``; ids continue after any existing rows."""
+    config.check()
+    started = time.perf_counter()
+    Base.metadata.create_all(bind=target)
+    stats = SeedStats()
+    with target.connect() as conn:
+        first_customer_id = (conn.execute(select(func.max(Customer.id))).scalar() or 0) + 1
+        first_product_id = (conn.execute(select(func.max(Product.id))).scalar() or 0) + 1
+        first_order_id = (conn.execute(select(func.max(Order.id))).scalar() or 0) + 1
+
+    customer_rng = random.Random(f"{config.seed}:customers")
+    with target.begin() as conn:
+        for ids in _chunks(first_customer_id, first_customer_id + config.customers, config.chunk_size):
+            conn.execute(
+                insert(Customer),
+                [
+                    {
+                        "id": i,
+                        "name": f"Customer {i}",
+                        "email": f"customer{i}@seed.example",
+                        "credit_limit": Decimal(customer_rng.randint(50, 500) * 100),
+                    }
+                    for i in ids
+                ],
+            )
+            stats.customers += len(ids)
+        prices = _product_prices(config)
+        for ids in _chunks(first_product_id, first_product_id + config.products, config.chunk_size):
+            conn.execute(
+                insert(Product),
+                [
+                    {
+                        "id": i,
+                        "sku": f"SEED-{i:08d}",
+                        "name": f"Product {i}",
+                        "unit_price": Decimal(prices[i - first_product_id]).scaleb(-2),
+                    }
+                    for i in ids
+                ],
+            )
+            stats.products += len(ids)
+
+    shards = _shards(config, first_order_id, first_customer_id, first_product_id)
+    open_cents: dict[int, int] = {}
+
+    def consume(results: Iterator[tuple[list[dict], list[dict], dict[int, int]]]) -> None:
+        for orders, items, shard_open in results:
+            with target.begin() as conn:
+                conn.execute(insert(Order), orders)
+                if items:
+                    conn.execute(insert(OrderItem), items)
+            stats.orders += len(orders)
+            stats.items += len(items)
+            for customer_id, cents in shard_open.items():
+                open_cents[customer_id] = open_cents.get(customer_id, 0) + cents
+            if progress:
+                progress(f"{stats.orders}/{config.orders} orders, {stats.items} items")
+
+    if config.workers > 1:
+        with multiprocessing.Pool(config.workers, initializer=_init_worker, initargs=(config, prices)) as pool:
+            consume(pool.imap(_generate_shard, shards))
+    else:
+        _init_worker(config, prices)
+        consume(map(_generate_shard, shards))
+
+    # Balances are the open order totals; credit limits are raised where needed so the data
+    # satisfies the credit rule (balance <= credit_limit) the application enforces.
+    customers = Customer.__table__
+    with target.begin() as conn:
+        if open_cents:
+            conn.execute(
+                update(customers)
+                .where(customers.c.id == bindparam("customer_id"))
+                .values(balance=bindparam("balance")),
+                [{"customer_id": i, "balance": Decimal(cents).scaleb(-2)} for i, cents in open_cents.items()],
+            )
+        conn.execute(
+            update(customers)
+            .where(customers.c.id >= first_customer_id)
+            .where(customers.c.balance > customers.c.credit_limit)
+            .values(credit_limit=customers.c.balance * 2)
+        )
+    if target.dialect.name == "postgresql":
+        with target.begin() as conn:
+            _reset_sequences(conn, (Customer, Product, Order))
+    with Session(target) as session, session.begin():
+        CreditSummaryService(session).rebuild()
+        TableVersions(session).bump(*TRACKED_TABLES)  # invalidate caches of any running app
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def _reset_sequences(conn, models) -> None:
+    """Move PostgreSQL id sequences past the explicit ids the generator inserted."""
+    for model in models:
+        table = model.__tablename__
+        conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence(:table, 'id'), max(id)) FROM {table} "
+                "HAVING max(id) IS NOT NULL"
+            ),
+            {"table": table},
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the database with demo or synthetic data.")
+    parser.add_argument("--customers", type=int, help="generate this many synthetic customers")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=0)
+    parser.add_argument("--items-per-order", default="uniform:1-5", type=_distribution_arg, help="fixed:N, uniform:A-B or poisson:MEAN")
+    parser.add_argument("--shipped-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="rows per insert batch and orders per shard")
+    parser.add_argument("--workers", type=int, default=1, help="processes generating order shards")
+    parser.add_argument("--database-url", help="seed this database instead of DATABASE_URL")
+    args = parser.parse_args()
+
+    if args.customers is None:
+        seed_demo()
+        return
+
+    config = SeedConfig(
+        customers=args.customers,
+        products=args.products,
+        orders=args.orders,
+        items_per_order=args.items_per_order,
+        shipped_ratio=args.shipped_ratio,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+    )
+    try:
+        config.check()
+    except ValueError as exc:
+        parser.error(str(exc))
+    target = _create_engine(args.database_url) if args.database_url else default_engine
+    stats = generate(target, config, progress=lambda message: print(message, end="\r", flush=True))
+    print(
+        f"\nSeeded {stats.customers} customers, {stats.products} products, {stats.orders} orders "
+        f"and {stats.items} items in {stats.seconds:.1f}s"
+    )
 
 
 if __name__ == "__main__":
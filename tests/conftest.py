@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Keep anything that falls back to the default engine off the working-tree app.db.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{Path(tempfile.mkdtemp(prefix='app-tests-')) / 'app.db'}")
+
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base, _create_engine  # noqa: E402
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Engine:
+    """A file-backed SQLite database with the app's pragmas (WAL, busy timeout) and every table."""
+    created = _create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(created)
+    yield created
+    created.dispose()
+
+
+@pytest.fixture
+def session_factory(engine: Engine) -> sessionmaker:
+    # Same session settings as app.database.SessionLocal.
+    return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
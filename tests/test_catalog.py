@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+
+from app.models import Product
+from app.services import CreditService, OrderService, ProductCatalog
+
+
+@pytest.fixture
+def product_id(session_factory) -> int:
+    with session_factory() as session, session.begin():
+        product = Product(sku="P", name="Product", unit_price=Decimal("10.00"))
+        session.add(product)
+        session.flush()
+        return product.id
+
+
+def test_uncommitted_price_is_read_but_not_cached(session_factory, product_id):
+    catalog = ProductCatalog()
+    with session_factory() as writer:
+        OrderService(writer, CreditService(writer), catalog=catalog).update_product(product_id, Decimal("12.00"))
+        assert catalog.get(writer, product_id).unit_price == Decimal("12.00")
+        assert len(catalog) == 0
+        writer.rollback()
+
+    with session_factory() as reader:
+        assert catalog.get(reader, product_id).unit_price == Decimal("10.00")
+
+
+def test_rolled_back_invalidations_do_not_fire_on_a_later_commit(session_factory, product_id):
+    catalog = ProductCatalog()
+    with session_factory() as session:
+        OrderService(session, CreditService(session), catalog=catalog).update_product(product_id, Decimal("12.00"))
+        session.rollback()
+
+        catalog.get(session, product_id)  # cached again from the committed row
+        session.commit()
+        assert len(catalog) == 1
+        assert catalog.get(session, product_id).unit_price == Decimal("10.00")
+
+
+def test_commit_invalidates_the_written_product(session_factory, product_id):
+    catalog = ProductCatalog()
+    with session_factory() as reader:
+        catalog.get(reader, product_id)
+    with session_factory() as writer, writer.begin():
+        OrderService(writer, CreditService(writer), catalog=catalog).update_product(product_id, Decimal("12.00"))
+        with session_factory() as reader:
+            catalog.get(reader, product_id)  # a concurrent miss re-caches the committed price
+        assert len(catalog) == 1
+    assert len(catalog) == 0
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import threading
+from decimal import Decimal
+
+import pytest
+
+from app.models import Customer
+from app.services import CreditService
+from app.services.exceptions import ConcurrentUpdateError, CreditLimitExceededError
+
+THREADS = 16
+ATTEMPTS = 200
+
+
+@pytest.fixture
+def customer_id(session_factory) -> int:
+    with session_factory() as session, session.begin():
+        customer = Customer(name="Race Co", email="race@example.test", credit_limit=Decimal("100.00"))
+        session.add(customer)
+        session.flush()
+        return customer.id
+
+
+def test_concurrent_reservations_never_overdraw_the_limit(session_factory, customer_id):
+    amount = Decimal("15.00")
+    start = threading.Barrier(THREADS)
+    outcomes: list[str] = []
+    outcomes_lock = threading.Lock()
+
+    def reserve() -> None:
+        start.wait()
+        outcome = "gave up"
+        for _ in range(ATTEMPTS):
+            try:
+                with session_factory() as session, session.begin():
+                    CreditService(session).reserve_credit(customer_id, amount)
+            except ConcurrentUpdateError:
+                continue
+            except CreditLimitExceededError:
+                outcome = "rejected"
+            else:
+                outcome = "reserved"
+            break
+        with outcomes_lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=reserve) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+
+    with session_factory() as session:
+        balance = session.get(Customer, customer_id).balance
+    reserved = outcomes.count("reserved")
+    assert len(outcomes) == THREADS and "gave up" not in outcomes
+    assert reserved == 6  # floor(100 / 15)
+    assert balance == amount * reserved
+    assert balance <= Decimal("100.00")
+
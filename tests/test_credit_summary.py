@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select, update
+
+from app.models import CustomerCreditSummary, Order, Product
+from app.services import CreditService, CreditSummaryService, OrderService
+
+SUMMARY_COLUMNS = ("customer_id", "credit_limit", "open_balance", "open_orders", "oldest_open_order_at", "utilisation")
+
+
+def summary_rows(session) -> dict[int, tuple]:
+    columns = [getattr(CustomerCreditSummary, name) for name in SUMMARY_COLUMNS]
+    return {row[0]: tuple(row) for row in session.execute(select(*columns))}
+
+
+def test_delta_maintenance_matches_a_full_rebuild(session_factory):
+    rng = random.Random(7)
+    with session_factory() as session, session.begin():
+        session.add_all(Product(sku=f"P{i}", name=f"Product {i}", unit_price=Decimal(f"{i}.25")) for i in range(1, 6))
+        service = OrderService(session, CreditService(session))
+        customers = [service.create_customer(f"C{i}", f"c{i}@example.test", Decimal("100000")).id for i in range(4)]
+
+    def items():
+        return [{"product_id": rng.randint(1, 5), "quantity": rng.randint(1, 3)} for _ in range(rng.randint(1, 3))]
+
+    for step in range(60):
+        with session_factory() as session, session.begin():
+            service = OrderService(session, CreditService(session))
+            open_ids = list(session.scalars(select(Order.id).where(Order.date_shipped.is_(None))))
+            action = rng.choice(("create", "bulk", "edit", "add", "ship", "ship_many") if open_ids else ("create",))
+            if action == "create":
+                order = service.create_order(rng.choice(customers), items())
+                # Spread creation times so the oldest open order is not simply the lowest id.
+                created = datetime(2024, 1, 1) + timedelta(hours=rng.randint(0, 1000))
+                session.execute(update(Order).where(Order.id == order.id).values(date_created=created))
+                CreditSummaryService(session).refresh([order.customer_id])
+            elif action == "bulk":
+                service.create_orders_bulk([{"customer_id": rng.choice(customers), "items": items()} for _ in range(3)])
+            elif action == "edit":
+                order = service.get_order(rng.choice(open_ids), load="items")
+                item = order.items[0]
+                service.update_item(order.id, item.id, item.quantity + 1)
+            elif action == "add":
+                service.add_items(rng.choice(open_ids), items())
+            elif action == "ship":
+                service.ship_order(rng.choice(open_ids))
+            else:
+                service.ship_orders(rng.sample(open_ids, min(3, len(open_ids))))
+
+        with session_factory() as session:
+            maintained = summary_rows(session)
+            CreditSummaryService(session).rebuild()
+            assert maintained == summary_rows(session), f"step {step}: {action}"
+            session.rollback()
+
+
+def test_shipping_the_oldest_open_order_moves_the_oldest_date(session_factory):
+    with session_factory() as session, session.begin():
+        session.add(Product(sku="P", name="Product", unit_price=Decimal("10.00")))
+        service = OrderService(session, CreditService(session))
+        customer_id = service.create_customer("C", "c@example.test", Decimal("1000")).id
+        first, second = (service.create_order(customer_id, [{"product_id": 1, "quantity": 1}]) for _ in range(2))
+
+    with session_factory() as session, session.begin():
+        OrderService(session, CreditService(session)).ship_order(first.id)
+        row = session.get(CustomerCreditSummary, customer_id)
+        assert (row.open_orders, row.open_balance) == (1, Decimal("10.00"))
+        assert row.oldest_open_order_at == second.date_created
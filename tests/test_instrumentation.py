@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.instrumentation import SqlInstrumentation, end_request, start_request
+
+
+def test_failed_statements_leave_no_timing_state_on_the_connection(engine):
+    SqlInstrumentation.instrument(engine)
+    stats, token = start_request()
+    try:
+        with engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM no_such_table"))
+            conn.execute(text("SELECT 1"))
+            info = dict(conn.info)
+    finally:
+        end_request(token)
+
+    assert stats.statements == 1
+    assert stats.slowest_statement == "SELECT 1"
+    assert info == {}
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+
+from app.json_provider import ENCODERS, FastJSONProvider, dumps_bytes
+
+PAYLOAD = {"total": Decimal("12.50"), "customer": {"name": "Zoë", "id": 7}, "at": datetime(2024, 1, 2, 3, 4, 5)}
+EXPECTED = b'{"at":"2024-01-02T03:04:05","customer":{"id":7,"name":"Zo\xc3\xab"},"total":"12.50"}'
+
+
+@pytest.mark.parametrize("encoder", ENCODERS)
+def test_encoders_sort_keys_and_agree(encoder):
+    assert dumps_bytes(PAYLOAD, encoder) == EXPECTED
+    provider = FastJSONProvider(Flask(__name__), encoder=encoder)
+    assert provider.dumps_bytes(PAYLOAD) == EXPECTED
+    assert list(provider.loads(provider.dumps(PAYLOAD))) == ["at", "customer", "total"]
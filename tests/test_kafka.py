@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from app.services import FakeProducer, KafkaService, PublishQueueFullError
+
+
+class BlockingProducer(FakeProducer):
+    """Holds the first ``produce`` call until released, so the background worker stays busy."""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def produce(self, topic, value, on_delivery=None):
+        self.entered.set()
+        assert self.release.wait(5)
+        super().produce(topic, value, on_delivery)
+
+
+def test_sync_publish_batch_flushes_once():
+    producer = FakeProducer()
+    service = KafkaService("orders", producer=producer)
+
+    service.publish_batch([{"n": 1}, {"n": 2}, {"n": 3}])
+
+    assert [json.loads(value) for _, value in producer.messages] == [{"n": 1}, {"n": 2}, {"n": 3}]
+    assert producer.flushes == 1
+
+
+def test_background_queue_full_raises_and_counts_drop():
+    producer = BlockingProducer()
+    service = KafkaService("orders", producer=producer, background=True, max_queue=1, linger_ms=0, enqueue_timeout=0.05)
+    try:
+        service.publish({"n": 1})
+        assert producer.entered.wait(5)  # the worker holds message 1 inside produce
+        service.publish({"n": 2})  # fills the one-slot queue
+
+        with pytest.raises(PublishQueueFullError):
+            service.publish({"n": 3})
+
+        assert service.metrics.enqueued == 2
+        assert service.metrics.dropped == 1
+    finally:
+        producer.release.set()
+        service.close(timeout=5)
+    assert [json.loads(value)["n"] for _, value in producer.messages] == [1, 2]
+
+
+def test_background_close_drains_queue():
+    producer = FakeProducer(latency=0.01)
+    service = KafkaService("orders", producer=producer, background=True, batch_size=10, linger_ms=5)
+
+    for n in range(55):
+        service.publish({"n": n})
+    service.close(timeout=5)
+
+    assert sorted(json.loads(value)["n"] for _, value in producer.messages) == list(range(55))
+    assert service.metrics.enqueued == 55
+    assert service.metrics.delivered == 55
+    assert service.metrics.failed == 0
+    assert 6 <= service.metrics.batches <= 55
+
+
+def test_background_delivery_failures_are_counted():
+    producer = FakeProducer(fail=lambda value: json.loads(value)["n"] % 3 == 0)
+    service = KafkaService("orders", producer=producer, background=True, linger_ms=5)
+
+    for n in range(12):
+        service.publish({"n": n})
+    service.close(timeout=5)
+
+    assert service.metrics.failed == 4
+    assert service.metrics.delivered == 8
+    assert service.metrics.last_error == "delivery failed"
+    assert sorted(json.loads(value)["n"] for _, value in producer.messages) == [1, 2, 4, 5, 7, 8, 10, 11]
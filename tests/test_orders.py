@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import Customer, CustomerCreditSummary, OutboxEvent, Product
+from app.services import CreditService, FakeProducer, KafkaService, OrderService
+from app.services.exceptions import ConcurrentUpdateError
+
+
+def order_service(session) -> OrderService:
+    return OrderService(session, CreditService(session), KafkaService("order_shipping", producer=FakeProducer()))
+
+
+@pytest.fixture
+def open_order(session_factory) -> tuple[int, int]:
+    with session_factory() as session, session.begin():
+        session.add(Product(sku="P", name="Product", unit_price=Decimal("25.00")))
+        service = order_service(session)
+        customer = service.create_customer("C", "c@example.test", Decimal("1000"))
+        order = service.create_order(customer.id, [{"product_id": 1, "quantity": 2}])
+        return customer.id, order.id
+
+
+def shipping_events(session) -> int:
+    return session.execute(select(func.count()).select_from(OutboxEvent)).scalar_one()
+
+
+def test_racing_ships_move_the_balance_once(session_factory, open_order):
+    customer_id, order_id = open_order
+    with session_factory() as first, session_factory() as second:
+        first_service, second_service = order_service(first), order_service(second)
+        first_service.get_order(order_id)
+        second_service.get_order(order_id)  # both sessions have loaded the order while it is open
+        first_service.ship_order(order_id)
+        first.commit()
+        assert second_service.ship_order(order_id).date_shipped is not None
+        second.commit()
+
+    with session_factory() as session:
+        assert session.get(Customer, customer_id).balance == Decimal("0.00")
+        summary = session.get(CustomerCreditSummary, customer_id)
+        assert (summary.open_balance, summary.open_orders) == (Decimal("0.00"), 0)
+        assert shipping_events(session) == 1
+
+
+def test_shipping_a_shipped_order_is_a_no_op(session_factory, open_order):
+    customer_id, order_id = open_order
+    with session_factory() as session, session.begin():
+        shipped_at = order_service(session).ship_order(order_id).date_shipped
+    with session_factory() as session, session.begin():
+        order = order_service(session).ship_order(order_id)
+        assert order.date_shipped == shipped_at
+    with session_factory() as session:
+        assert session.get(Customer, customer_id).balance == Decimal("0.00")
+        assert shipping_events(session) == 1
+
+
+def test_item_edit_loses_to_a_concurrent_ship(session_factory, open_order):
+    customer_id, order_id = open_order
+    with session_factory() as editor, session_factory() as shipper:
+        service = order_service(editor)
+        order = service.get_order(order_id, load="items")  # still open in this session's identity map
+        item = order.items[0]
+        order_service(shipper).ship_order(order_id)
+        shipper.commit()
+        with pytest.raises(ConcurrentUpdateError):
+            service.update_item(order_id, item.id, item.quantity + 1)
+        editor.rollback()
+
+    with session_factory() as session:
+        assert session.get(Customer, customer_id).balance == Decimal("0.00")
+        assert session.get(CustomerCreditSummary, customer_id).open_balance == Decimal("0.00")
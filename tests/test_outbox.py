@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+from contextlib import contextmanager
+
+from sqlalchemy import select
+
+from app.models import OutboxEvent
+from app.services import FakeProducer, KafkaService
+from app.services.outbox import OutboxRelay, OutboxService
+
+
+class SilentProducer(FakeProducer):
+    """Accepts messages but never fires delivery callbacks, like a flush that timed out."""
+
+    def flush(self, timeout=None):
+        with self._lock:
+            remaining, self._pending = len(self._pending), []
+        return remaining
+
+
+def make_relay(session_factory, producer, **options):
+    @contextmanager
+    def transaction():
+        with session_factory() as session, session.begin():
+            yield session
+
+    return OutboxRelay(transaction, publisher_for=lambda topic: KafkaService(topic, producer=producer), **options)
+
+
+def enqueue(session_factory, *numbers):
+    with session_factory() as session, session.begin():
+        OutboxService(session).enqueue_many("orders", [{"n": n} for n in numbers])
+
+
+def outbox_rows(session_factory):
+    with session_factory() as session:
+        return {
+            event.payload["n"]: event
+            for event in session.scalars(select(OutboxEvent).order_by(OutboxEvent.id))
+        }
+
+
+def test_relay_marks_only_confirmed_rows_sent(session_factory):
+    enqueue(session_factory, 1, 2, 3)
+    producer = FakeProducer(fail=lambda value: json.loads(value)["n"] == 2)
+
+    assert make_relay(session_factory, producer).run_once() == 2
+
+    rows = outbox_rows(session_factory)
+    assert rows[1].sent_at is not None and rows[3].sent_at is not None
+    assert rows[2].sent_at is None
+    assert rows[2].attempts == 1
+    assert rows[2].last_error == "delivery failed"
+
+
+def test_relay_leaves_unacknowledged_rows_pending(session_factory):
+    enqueue(session_factory, 1, 2)
+    relay = make_relay(session_factory, SilentProducer())
+
+    assert relay.run_once() == 0
+
+    rows = outbox_rows(session_factory)
+    assert all(row.sent_at is None and row.attempts == 1 for row in rows.values())
+    assert rows[1].last_error == "not acknowledged by the producer"
+
+
+def test_relay_retries_failed_rows(session_factory):
+    enqueue(session_factory, 1)
+    failing = True
+    producer = FakeProducer(fail=lambda value: failing)
+    relay = make_relay(session_factory, producer)
+
+    assert relay.run_once() == 0
+    failing = False
+    assert relay.run_once() == 1
+
+    row = outbox_rows(session_factory)[1]
+    assert row.sent_at is not None
+    assert row.attempts == 2
+
+
+def test_failing_events_are_parked_and_do_not_block_later_ones(session_factory):
+    enqueue(session_factory, 1, 2, 3)
+    producer = FakeProducer(fail=lambda value: json.loads(value)["n"] < 3)
+    relay = make_relay(session_factory, producer, batch_size=2, max_attempts=2)
+
+    assert relay.run_once() == 0  # the batch holds only the two failing events
+    assert relay.run_once() == 1  # untried events go before retries
+    assert relay.run_once() == 0
+    assert relay.run_once() == 0  # both failing events are parked now
+
+    rows = outbox_rows(session_factory)
+    assert rows[3].sent_at is not None
+    assert [rows[n].attempts for n in (1, 2)] == [2, 2]
+    with session_factory() as session:
+        assert OutboxService(session).parked_count(max_attempts=2) == 2
+    assert producer.flushes == 3
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import multiprocessing
+
+from app.services.topic_log import TopicLog
+
+
+def write_records(directory: str, writer: int, count: int, results=None) -> None:
+    log = TopicLog(directory, segment_bytes=4096)
+    offsets = {log.append(f"{writer}-{n}"): f"{writer}-{n}".encode() for n in range(count)}
+    log.close()
+    if results is not None:
+        results.put(offsets)
+
+
+def test_writers_in_separate_processes_share_one_offset_sequence(tmp_path):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    writers = [
+        context.Process(target=write_records, args=(str(tmp_path), writer, 200, results)) for writer in range(4)
+    ]
+    for process in writers:
+        process.start()
+    assigned: dict[int, bytes] = {}
+    for _ in writers:
+        offsets = results.get(timeout=30)
+        assert not assigned.keys() & offsets.keys()
+        assigned.update(offsets)
+    for process in writers:
+        process.join(30)
+        assert process.exitcode == 0
+
+    log = TopicLog(tmp_path, segment_bytes=4096)
+    assert {record.offset: record.value for record in log.read_from(0)} == assigned
+    assert sorted(assigned) == list(range(800))
+    assert log.next_offset == 800
+
+
+def test_reader_sees_records_appended_by_another_process(tmp_path):
+    log = TopicLog(tmp_path)
+    log.append("first")
+
+    process = multiprocessing.get_context("fork").Process(target=write_records, args=(str(tmp_path), 1, 3))
+    process.start()
+    process.join(30)
+
+    assert [record.value for record in log.read_from(0)] == [b"first", b"1-0", b"1-1", b"1-2"]
+    assert log.append("last") == 4
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import event
+
+from app.services.versions import CUSTOMERS, ORDERS, PRODUCTS, TableVersions
+
+
+def test_bumps_apply_once_per_table_in_name_order_at_commit(engine, session_factory):
+    TableVersions.ensure(engine)
+    updates: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.startswith("UPDATE table_versions"):
+            updates.append(parameters[1])
+
+    event.listen(engine, "before_cursor_execute", record)
+    with session_factory() as session:
+        versions = TableVersions(session)
+        versions.bump(PRODUCTS, ORDERS)
+        versions.bump(ORDERS, CUSTOMERS)
+        assert updates == []
+        session.commit()
+        assert updates == [CUSTOMERS, ORDERS, PRODUCTS]
+        assert versions.current([CUSTOMERS, ORDERS, PRODUCTS]) == (1, 1, 1)
+
+
+def test_rolled_back_bumps_are_discarded(engine, session_factory):
+    TableVersions.ensure(engine)
+    with session_factory() as session:
+        versions = TableVersions(session)
+        with pytest.raises(RuntimeError), session.begin():
+            versions.bump(ORDERS)
+            raise RuntimeError("command failed")
+        with session.begin():
+            pass
+        assert versions.current([ORDERS]) == (0,)